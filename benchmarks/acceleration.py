@@ -0,0 +1,81 @@
+"""
+Build and traverse acceleration structures over a cloud of random transformed spheres.
+
+    python -m benchmarks.acceleration --spheres 10000 --resolution 256
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.grid import Point, VectorGrid
+from src.light import Ray
+from src.matrix import Rotation, Scaling, Translation
+from src.shape import Sphere
+from src.world import BVH, UniformGrid, World
+
+STRUCTURES = {"bvh": BVH, "grid": UniformGrid}
+
+
+def random_spheres(count, seed=0):
+    rng = np.random.RandomState(seed)
+    return [
+        Sphere(
+            Translation(*rng.uniform(-20, 20, 3))
+            @ Rotation(*rng.uniform(0, np.pi, 3))
+            @ Scaling(*rng.uniform(0.05, 0.5, 3))
+        )
+        for _ in range(count)
+    ]
+
+
+def camera_rays(resolution):
+    xs = np.linspace(-1, 1, resolution)
+    return Ray(Point(0, 0, -40), VectorGrid(xs, xs, 1).normalize())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--spheres", type=int, default=10000)
+    parser.add_argument("--resolution", type=int, default=256)
+    parser.add_argument(
+        "--structure", choices=[*STRUCTURES, "all"], default="all", help="what to build"
+    )
+    parser.add_argument(
+        "--check", type=int, default=0, help="compare against brute force on N rays"
+    )
+    args = parser.parse_args()
+
+    shapes = random_spheres(args.spheres)
+    ray = camera_rays(args.resolution)
+    names = list(STRUCTURES) if args.structure == "all" else [args.structure]
+
+    if args.check:
+        sample = ray[np.arange(min(args.check, len(ray.direction)))]
+        start = time.perf_counter()
+        expected = World(shapes).intersect(sample)
+        elapsed = time.perf_counter() - start
+        print(f"brute force     {elapsed:.3f} s on {len(sample.direction)} rays")
+
+    for name in names:
+        structure = STRUCTURES[name](shapes)
+        hit = structure.intersect(ray)
+
+        print(f"{repr(structure)}")
+        print(f"  build time    {structure.build_time:.3f} s")
+        print(f"  traversal     {structure.stats['time']:.3f} s")
+        print(f"  rays/s        {structure.stats['rays_per_second']:.0f}")
+        print(f"  hits          {hit.count} of {structure.stats['rays']}")
+
+        if args.check:
+            got = structure.intersect(sample)
+            same = (
+                np.array_equal(expected.mask, got.mask)
+                and np.array_equal(expected.hit, got.hit)
+                and np.array_equal(expected.index, got.index)
+            )
+            print(f"  matches       {same}")
+
+
+if __name__ == "__main__":
+    main()
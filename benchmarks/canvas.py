@@ -0,0 +1,88 @@
+"""
+Compare the old string based Canvas.to_ppm with the streaming P3, binary P6 and PNG
+writers, the PNG one also from a float32 memory-mapped canvas.
+
+    python -m benchmarks.canvas --sizes 640x360 1920x1080 3840x2160
+"""
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import textwrap
+import time
+
+import numpy as np
+
+from src.canvas import Canvas
+
+
+def legacy_to_ppm(canvas):
+    header = "P3\n" f"{canvas.rows} {canvas.cols}\n" "255\n"
+    raw_body = (
+        np.ceil((np.flipud(canvas) * 255).clip(0, 255))
+        .astype(int)
+        .astype(str)
+        .reshape(canvas.cols, -1)
+    )
+    raw_lines = [" ".join(["".join(cell) for cell in row]) for row in raw_body]
+    body = "\n".join(["\n".join(textwrap.wrap(line)) for line in raw_lines])
+    return header + body + "\n"
+
+
+def write(canvas, binary):
+    buffer = io.BytesIO()
+    canvas.write_ppm(buffer, binary=binary)
+    return buffer
+
+
+def write_png(canvas):
+    buffer = io.BytesIO()
+    canvas.write_png(buffer)
+    return buffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", default=["640x360", "1920x1080"])
+    parser.add_argument(
+        "--legacy-limit",
+        type=int,
+        default=1920 * 1080,
+        help="skip the old to_ppm above this many pixels",
+    )
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    print(f"{'size':>10} {'writer':>8} {'time (s)':>10} {'MB/s':>10}")
+    for size in args.sizes:
+        width, height = map(int, size.split("x"))
+        canvas = Canvas(width, height)
+        canvas[...] = np.random.RandomState(0).uniform(0, 1, canvas.shape)
+        mapped = Canvas.memmap(os.path.join(directory, f"{size}.raw"), width, height)
+        mapped[...] = canvas
+
+        writers = [
+            ("P6", lambda: write(canvas, True)),
+            ("P3", lambda: write(canvas, False)),
+            ("PNG", lambda: write_png(canvas)),
+            ("PNG mmap", lambda: write_png(mapped)),
+        ]
+        if width * height <= args.legacy_limit:
+            writers.append(("to_ppm", lambda: legacy_to_ppm(canvas)))
+
+        for name, writer in writers:
+            start = time.perf_counter()
+            out = writer()
+            elapsed = time.perf_counter() - start
+            nbytes = len(out) if isinstance(out, str) else out.getbuffer().nbytes
+            print(
+                f"{size:>10} {name:>8} {elapsed:>10.3f} {nbytes / 2 ** 20 / elapsed:>10.1f}"
+            )
+        del mapped
+
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
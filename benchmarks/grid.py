@@ -0,0 +1,58 @@
+"""
+Compare VectorGrid construction through the broadcast mesh with the old
+itertools.product path, timing each and tracing its peak memory.
+
+    python -m benchmarks.grid --sizes 1024 4096 8192 --legacy-limit 1024
+"""
+import argparse
+import time
+import tracemalloc
+from itertools import product
+
+import numpy as np
+
+from src.grid import Grid, VectorGrid
+
+
+def legacy_mesh(xs, ys, zs, ws):
+    return np.array(list(product(xs, ys, zs, ws)))
+
+
+def measure(build, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 4096, 8192])
+    parser.add_argument(
+        "--legacy-limit",
+        type=int,
+        default=1024,
+        help="skip the product path above this size, it needs tens of GB at 8k",
+    )
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'path':>8} {'time (s)':>10} {'peak (MB)':>10}")
+    for size in args.sizes:
+        xs = np.linspace(-1, 1, size)
+        axes = (xs, xs, [1.0], [0])
+
+        paths = [("mesh", Grid.mesh), ("grid", lambda *a: VectorGrid(*a[:3]))]
+        if size <= args.legacy_limit:
+            paths.append(("product", legacy_mesh))
+
+        for name, build in paths:
+            elapsed, peak = measure(build, *axes)
+            print(f"{size:>6} {name:>8} {elapsed:>10.3f} {peak / 2 ** 20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
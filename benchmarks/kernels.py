@@ -0,0 +1,133 @@
+"""
+Time the typed Grid path of one tile against the plain ndarray kernels it now runs
+on, per call and at small ray counts, where the subclass overhead dominates.
+
+    python -m benchmarks.kernels --rays 64 256 4096
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from src import kernels
+from src.camera import Camera
+from src.grid import Color, ColorGrid, Point, PointGrid, Vector, VectorGrid
+from src.light import Light
+from src.material import Material
+from src.matrix import Scaling, Translation, ViewTransform
+from src.shape import Sphere
+from src.world import World
+
+
+def legacy_rays(camera, xs, ys):
+    world_xs = camera.half_width - (xs + 0.5) * camera.pixel_size
+    world_ys = camera.half_height - (ys + 0.5) * camera.pixel_size
+    pixel = camera.inverse @ PointGrid(world_xs, world_ys, np.full(len(xs), -1), False)
+    origin = camera.inverse @ Point(0, 0, 0)
+    return origin, (pixel - origin).normalize()
+
+
+def legacy_intersect(inverses, origin, direction):
+    origins = np.einsum("kij,nj->kni", inverses, origin)[..., :3]
+    directions = np.einsum("kij,nj->kni", inverses, direction)[..., :3]
+    return kernels.solve(np.moveaxis(origins, -1, 0), np.moveaxis(directions, -1, 0))
+
+
+def legacy_normals(inverses, index, points):
+    obj_normals = np.einsum("mij,mj->mi", inverses[index], points)
+    obj_normals[:, 3] = 0
+    world_normals = np.einsum("mji,mj->mi", inverses[index], obj_normals)
+    return VectorGrid(*world_normals.T[:-1], False).normalize()
+
+
+def legacy_get_color(light, material, position, eyev, normalv):
+    effective_color = material.color * light.intensity
+    lightv = (light.position - position).normalize()
+    ambient = effective_color * material.ambient
+
+    light_dot_normal = lightv @ normalv
+    light_mask = (light_dot_normal >= 0).flatten()
+    reflectv = (-lightv).reflect(normalv)
+    reflect_dot_eye = reflectv @ eyev
+    reflect_mask = (reflect_dot_eye > 0).flatten() & light_mask
+
+    diffuse = ColorGrid(*np.zeros((3, len(light_dot_normal))))
+    specular = ColorGrid(*np.zeros((3, len(reflect_dot_eye))))
+    diffuse[light_mask] = (
+        effective_color * material.diffuse * light_dot_normal[light_mask]
+    )
+    factor = reflect_dot_eye[reflect_mask] ** material.shininess
+    specular[reflect_mask] = light.intensity * material.specular * factor
+    return ambient + diffuse + specular
+
+
+def scene(side):
+    shapes = [
+        Sphere(Translation(-1, 0, 0), Material(Color(0.8, 1.0, 0.6))),
+        Sphere(Translation(1, 0, 0) @ Scaling(0.5, 0.5, 0.5)),
+        Sphere(Translation(0, -101, 0) @ Scaling(100, 100, 100)),
+    ]
+    light = Light(Point(-10, 10, -10), Color(1, 1, 1))
+    view = ViewTransform(Point(0, 1, -5), Point(0, 0, 0), Vector(0, 1, 0))
+    return Camera(side, side, np.pi / 2, view), World(shapes, light)
+
+
+def cases(rays):
+    side = int(np.sqrt(rays))
+    camera, world = scene(side)
+    xs, ys = camera.pixels((0, side, 0, side))
+    origin, direction = legacy_rays(camera, xs, ys)
+    plain_origin, plain_direction = np.asarray(origin), np.asarray(direction)
+
+    hit = world.intersect(camera.ray_for_pixels(xs, ys))
+    points = origin + direction[hit.mask] * hit.hit[:, np.newaxis]
+    normals = legacy_normals(world.inverses, hit.index, points)
+    eyes = -direction[hit.mask]
+    material = world.shapes[0].material
+    plain = [np.asarray(array) for array in (points, eyes, normals)]
+    position = np.asarray(world.light.position)
+    intensity = np.asarray(world.light.intensity)
+
+    return {
+        "rays": (
+            lambda: legacy_rays(camera, xs, ys),
+            lambda: camera.ray_for_pixels(xs, ys),
+        ),
+        "intersect": (
+            lambda: legacy_intersect(world.inverses, origin, direction),
+            lambda: kernels.intersect(world.inverses, plain_origin, plain_direction),
+        ),
+        "normals": (
+            lambda: legacy_normals(world.inverses, hit.index, points),
+            lambda: kernels.normals(world.inverses, hit.index, plain[0]),
+        ),
+        "shade": (
+            lambda: legacy_get_color(world.light, material, points, eyes, normals),
+            lambda: kernels.phong(material, position, intensity, *plain),
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rays", type=int, nargs="+", default=[64, 256, 4096])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'rays':>6} {'step':>10} {'typed (us)':>11} {'kernel (us)':>12} {'x':>6}")
+    for rays in args.rays:
+        for name, (typed, kernel) in cases(rays).items():
+            times = [
+                min(timeit.repeat(call, number=args.number, repeat=3)) / args.number
+                for call in (typed, kernel)
+            ]
+            print(
+                f"{rays:>6} {name:>10} {times[0] * 1e6:>11.1f} "
+                f"{times[1] * 1e6:>12.1f} {times[0] / times[1]:>6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Shade the hits of one frame split over M distinct materials, once per material as
+World.shade_hit used to, picking each material's hits apart and calling
+Light.get_color for them, and once with the materials gathered per hit from the
+World's Materials table into a single call.
+
+    python -m benchmarks.materials --materials 1 16 256 --rays 4096
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from src.grid import Color, Point, PointGrid, VectorGrid
+from src.kernels import Workspace
+from src.light import Light
+from src.material import Material
+from src.matrix import Translation
+from src.shape import Sphere
+from src.world import World
+
+
+def scene(count, rays, seed=0):
+    rng = np.random.RandomState(seed)
+    shapes = [
+        Sphere(
+            Translation(*rng.uniform(-5, 5, 3)),
+            Material(Color(*rng.uniform(0, 1, 3)), shininess=rng.uniform(5, 200)),
+        )
+        for _ in range(count)
+    ]
+    world = World(shapes, Light(Point(-10, 10, -10), Color(1, 1, 1)))
+    points = np.asarray(PointGrid(*rng.uniform(-1, 1, (3, rays)), False))
+    normals = np.asarray(VectorGrid(*rng.normal(size=(3, rays)), False).normalize())
+    eyes = np.asarray(VectorGrid(*rng.normal(size=(3, rays)), False).normalize())
+    index = rng.randint(count, size=rays)
+    return world, points, eyes, normals, index
+
+
+def per_material(world, points, eyes, normals, index, workspace):
+    out = np.empty((len(index), 3))
+    in_shadow = np.zeros(len(index), dtype=bool)
+    for k in np.unique(index):
+        selected = index == k
+        out[selected] = world.light.get_color(
+            world.shapes[k].material,
+            points[selected],
+            eyes[selected],
+            normals[selected],
+            in_shadow[selected],
+            workspace=workspace,
+        )
+    return out
+
+
+def gathered(world, points, eyes, normals, index, workspace):
+    in_shadow = np.zeros(len(index), dtype=bool)
+    return world.shade_hit(points, eyes, normals, index, in_shadow, None, workspace)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--materials", type=int, nargs="+", default=[1, 16, 256])
+    parser.add_argument("--rays", type=int, default=4096)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'materials':>9} {'per material (ms)':>18} {'gathered (ms)':>14} {'x':>6}")
+    for count in args.materials:
+        data = scene(count, args.rays)
+        assert np.allclose(per_material(*data, None), gathered(*data, None))
+
+        times = []
+        for shade in (per_material, gathered):
+            workspace = Workspace()
+            elapsed = timeit.timeit(lambda: shade(*data, workspace), number=args.number)
+            times.append(elapsed / args.number)
+        print(
+            f"{count:>9} {times[0] * 1e3:>18.2f} {times[1] * 1e3:>14.2f} "
+            f"{times[0] / times[1]:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Render the same scene with the process and thread renderers on 1 to N workers.
+
+    python -m benchmarks.parallel --size 512 --workers 1 2 4 8 --tile-size 64
+"""
+import argparse
+import os
+
+import numpy as np
+
+from src.camera import Camera
+from src.grid import Color, Point, Vector
+from src.light import Light
+from src.material import Material
+from src.matrix import Scaling, Translation, ViewTransform
+from src.render import ProcessRenderer, ThreadRenderer
+from src.shape import Sphere
+from src.world import World
+
+RENDERERS = {"process": ProcessRenderer, "thread": ThreadRenderer}
+
+
+def scene(size, spheres=50, seed=0):
+    rng = np.random.RandomState(seed)
+    shapes = [
+        Sphere(
+            Translation(*rng.uniform(-4, 4, 2), rng.uniform(0, 6))
+            @ Scaling(*[rng.uniform(0.2, 0.8)] * 3),
+            Material(Color(*rng.uniform(0, 1, 3))),
+        )
+        for _ in range(spheres)
+    ]
+    light = Light(Point(-10, 10, -10), Color(1, 1, 1))
+    transform = ViewTransform(Point(0, 0, -8), Point(0, 0, 0), Vector(0, 1, 0))
+    return Camera(size, size, np.pi / 2, transform), World(shapes, light)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--spheres", type=int, default=50)
+    parser.add_argument("--tile-size", type=int, default=64)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count()})
+    )
+    parser.add_argument(
+        "--renderer", choices=[*RENDERERS, "all"], default="all", help="what to run"
+    )
+    args = parser.parse_args()
+
+    camera, world = scene(args.size, args.spheres)
+    names = list(RENDERERS) if args.renderer == "all" else [args.renderer]
+
+    print(
+        f"{'renderer':>8} {'workers':>8} {'time (s)':>10} {'pixels/s':>12} {'speedup':>8}"
+    )
+    for name in names:
+        baseline = None
+        for workers in args.workers:
+            renderer = RENDERERS[name](workers, args.tile_size)
+            renderer.render(camera, world)
+            elapsed = renderer.stats["time"]
+            baseline = elapsed if baseline is None else baseline
+            print(
+                f"{name:>8} {workers:>8} {elapsed:>10.3f} "
+                f"{renderer.stats['pixels_per_second']:>12.0f} "
+                f"{baseline / elapsed:>8.2f}"
+            )
+            for i, thread in enumerate(renderer.stats.get("threads", [])):
+                print(
+                    f"{'':>17} thread {i}: busy {thread['busy']:.3f} s, "
+                    f"idle {thread['idle']:.3f} s, {thread['tiles']} tiles"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Render the same scene in float64 and float32 and report time, peak memory, the
+bytes of one tile's ray batch and how far the float32 image is from float64.
+
+    python -m benchmarks.precision --sizes 256 512 1024
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.camera import Camera
+from src.grid import Color, Point, Vector
+from src.light import Light
+from src.material import Material
+from src.matrix import Scaling, Translation, ViewTransform
+from src.precision import PRECISION
+from src.shape import Sphere
+from src.world import World
+
+
+def scene(side):
+    # made inside PRECISION.using, so every matrix and grid takes its dtype
+    rng = np.random.RandomState(0)
+    shapes = [Sphere(Translation(0, -101, 0) @ Scaling(100, 100, 100))]
+    for x, z, radius in rng.uniform((-4, -2, 0.2), (4, 6, 0.8), (40, 3)):
+        color = Color(*rng.uniform(0.2, 1, 3))
+        shapes.append(
+            Sphere(
+                Translation(x, radius - 1, z) @ Scaling(radius, radius, radius),
+                Material(color),
+            )
+        )
+    light = Light(Point(-10, 10, -10), Color(1, 1, 1))
+    view = ViewTransform(Point(0, 2, -8), Point(0, 0, 2), Vector(0, 1, 0))
+    return Camera(side, side, np.pi / 3, view), World(shapes, light)
+
+
+def render(side, dtype, tile_size):
+    with PRECISION.using(dtype):
+        camera, world = scene(side)
+        ray, _ = camera.ray_for_tile(next(camera.tiles(tile_size)))
+        ray_bytes = ray.direction.nbytes
+
+        start = time.perf_counter()
+        image = camera.render(world, tile_size)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        camera.render(world, tile_size)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return image, elapsed, peak, ray_bytes
+
+
+def difference(image, reference):
+    # absolute error, PSNR and the share of pixels whose 8-bit value changes
+    error = np.abs(np.asarray(image, float) - reference)
+    mse = (error ** 2).mean()
+    psnr = 10 * np.log10(1 / mse) if mse else np.inf
+
+    def quantize(pixels):
+        return np.ceil((np.asarray(pixels, float) * 255).clip(0, 255)).astype(int)
+
+    changed = (quantize(image) != quantize(reference)).any(axis=-1).mean()
+    return error.max(), error.mean(), psnr, changed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 512])
+    parser.add_argument("--tile-size", type=int, default=64)
+    args = parser.parse_args()
+
+    print(
+        f"{'side':>6} {'dtype':>8} {'time (s)':>10} {'peak (MB)':>10} "
+        f"{'ray (KB)':>9} {'max err':>9} {'mean err':>9} {'PSNR':>7} {'8-bit':>7}"
+    )
+    for side in args.sizes:
+        reference = None
+        for dtype in (np.float64, np.float32):
+            image, elapsed, peak, ray_bytes = render(side, dtype, args.tile_size)
+            if reference is None:
+                reference = np.asarray(image)
+            worst, mean, psnr, changed = difference(image, reference)
+            print(
+                f"{side:>6} {np.dtype(dtype).name:>8} {elapsed:>10.3f} "
+                f"{peak / 2 ** 20:>10.1f} {ray_bytes / 2 ** 10:>9.0f} "
+                f"{worst:>9.2e} {mean:>9.2e} {psnr:>7.1f} {changed:>7.2%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
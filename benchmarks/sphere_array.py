@@ -0,0 +1,82 @@
+"""
+Build K random spheres as a list of Sphere objects and as a SphereArray, and report
+per representation the build time including the stacked inverses, the bytes per
+sphere that tracemalloc sees once built, and the time and size of pickling the
+scene, which is what sending a World to worker processes costs.
+
+    python -m benchmarks.sphere_array --counts 1000 10000 100000
+"""
+import argparse
+import pickle
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.grid import Color
+from src.material import Material
+from src.matrix import Matrix
+from src.shape import Sphere, SphereArray
+
+
+def arrays(count, seed=0):
+    rng = np.random.RandomState(seed)
+    transforms = np.zeros((count, 4, 4))
+    transforms[:, [0, 1, 2], [0, 1, 2]] = rng.uniform(0.1, 1, (count, 1))
+    transforms[:, :3, 3] = rng.uniform(-50, 50, (count, 3))
+    transforms[:, 3, 3] = 1
+    return transforms, rng.uniform(0, 1, (count, 3)), rng.uniform(0, 1, count)
+
+
+def objects(transforms, colors, diffuse):
+    shapes = [
+        Sphere(Matrix(transform), Material(Color(*color), diffuse=d))
+        for transform, color, d in zip(transforms, colors, diffuse)
+    ]
+    Sphere.inverse_stack(shapes)
+    return shapes
+
+
+def soa(transforms, colors, diffuse):
+    return SphereArray(transforms, colors, diffuse=diffuse)
+
+
+def measure(build, data):
+    start = time.perf_counter()
+    build(*data)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    scene = build(*data)
+    nbytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    pickled = pickle.dumps(scene, pickle.HIGHEST_PROTOCOL)
+    pickle.loads(pickled)
+    return elapsed, nbytes, time.perf_counter() - start, len(pickled)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print(
+        f"{'spheres':>8} {'scene':>12} {'build (ms)':>11} {'B/sphere':>9} "
+        f"{'pickle (ms)':>12} {'pickled (MB)':>13}"
+    )
+    for count in args.counts:
+        data = arrays(count)
+        for name, build in (("list", objects), ("SphereArray", soa)):
+            elapsed, nbytes, pickling, size = measure(build, data)
+            print(
+                f"{count:>8} {name:>12} {elapsed * 1e3:>11.1f} {nbytes / count:>9.0f} "
+                f"{pickling * 1e3:>12.1f} {size / 2 ** 20:>13.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Time every hot path of the renderer at realistic ray counts, report rays/s and
+peak memory, write the results as JSON and compare them with a stored baseline.
+
+    python -m benchmarks.suite --sizes 256 1024 4096 --output results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.25
+
+The exit status is 1 when a case got slower than the baseline by more than the
+threshold, so the suite can gate a change in CI.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.camera import Camera
+from src.canvas import Canvas
+from src.grid import Color, Point, Vector, VectorGrid
+from src.light import Light, LightSet, Ray
+from src.material import Material
+from src.matrix import Rotation, Scaling, Translation, ViewTransform
+from src.shape import Sphere
+from src.world import World
+
+CASES = {}
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+def demo_sphere():
+    transformation = (
+        Rotation(0.5, 0.5, np.pi / 6) @ Scaling(1.5, 0.8, 0.3) @ Translation(0.1, 0, 0)
+    )
+    return Sphere(transformation, Material(Color(1, 0.5, 0.2)))
+
+
+def demo_rays(side):
+    xs = np.linspace(-0.7, 0.7, side)
+    return Ray(Point(0, 0, -5), VectorGrid(xs, xs, 1).normalize())
+
+
+def demo_hits(side):
+    sphere, ray = demo_sphere(), demo_rays(side)
+    xs = sphere.intersect(ray)
+    points = ray.after(xs.hit, xs.mask)
+    return sphere, ray, xs, points
+
+
+# every setup takes the side of a square batch and returns (run, rays)
+
+
+@case("grid")
+def grid_case(side):
+    xs = np.linspace(-1, 1, side)
+    return lambda: VectorGrid(xs, xs, 1), side * side
+
+
+@case("sphere.intersect")
+def intersect_case(side):
+    sphere, ray = demo_sphere(), demo_rays(side)
+    return lambda: sphere.intersect(ray), side * side
+
+
+@case("sphere.normal_at")
+def normal_case(side):
+    sphere, _, _, points = demo_hits(side)
+    return lambda: sphere.normal_at(points), len(points)
+
+
+@case("ray.after")
+def after_case(side):
+    _, ray, xs, _ = demo_hits(side)
+    return lambda: ray.after(xs.hit, xs.mask), xs.count
+
+
+@case("light.get_color")
+def color_case(side):
+    sphere, ray, xs, points = demo_hits(side)
+    normals = sphere.normal_at(points)
+    eyes = -ray.direction[xs.mask]
+    light = Light(Point(-10, 10, 0), Color(1, 1, 1))
+    return (
+        lambda: light.get_color(sphere.material, points, eyes, normals),
+        len(points),
+    )
+
+
+@case("lights.get_color")
+def lights_case(side):
+    sphere, ray, xs, points = demo_hits(side)
+    normals = sphere.normal_at(points)
+    eyes = -ray.direction[xs.mask]
+    rng = np.random.RandomState(0)
+    lights = LightSet(rng.uniform(-10, 10, (16, 3)), rng.uniform(0, 0.2, (16, 3)))
+    return (
+        lambda: lights.get_color(sphere.material, points, eyes, normals),
+        len(points) * len(lights),
+    )
+
+
+@case("canvas.to_ppm")
+def ppm_case(side):
+    canvas = Canvas(side, side)
+    canvas[...] = np.random.RandomState(0).uniform(0, 1, canvas.shape)
+    return canvas.to_ppm, side * side
+
+
+@case("demo")
+def demo_case(side):
+    world = World([demo_sphere()], Light(Point(-10, 10, 0), Color(1, 1, 1)))
+    view = ViewTransform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+    camera = Camera(side, side, 2 * np.arctan(0.7), view)
+    return lambda: camera.render(world, tile_size=256), side * side
+
+
+def measure(name, side, repeat, min_time=0.1):
+    run, rays = CASES[name](side)
+
+    # like timeit, small cases are looped until a round lasts min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        times.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    seconds = min(times)
+    return {
+        "name": name,
+        "side": side,
+        "rays": rays,
+        "seconds": seconds,
+        "rays_per_second": rays / seconds if seconds else float("inf"),
+        "peak_bytes": peak,
+    }
+
+
+def compare(results, baseline, threshold):
+    # a case regresses when it is slower than its baseline by more than threshold
+    previous = {(r["name"], r["side"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["name"], result["side"]))
+        if before is None:
+            result["change"] = None
+            continue
+        result["change"] = result["seconds"] / before["seconds"] - 1
+        if result["change"] > threshold:
+            regressions.append(result)
+    return regressions
+
+
+def report(results):
+    print(
+        f"{'case':>18} {'side':>6} {'rays':>10} {'time (s)':>10} "
+        f"{'rays/s':>12} {'peak (MB)':>10} {'change':>8}"
+    )
+    for r in results:
+        change = r.get("change")
+        change = "" if change is None else f"{change:+.0%}"
+        print(
+            f"{r['name']:>18} {r['side']:>6} {r['rays']:>10} {r['seconds']:>10.4f} "
+            f"{r['rays_per_second']:>12.0f} {r['peak_bytes'] / 2 ** 20:>10.1f} "
+            f"{change:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024, 4096])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = [
+        measure(name, side, args.repeat) for side in args.sizes for name in args.cases
+    ]
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    report(results)
+
+    if args.output:
+        meta = {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+        }
+        with open(args.output, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+
+    for r in regressions:
+        print(
+            f"regression: {r['name']} at {r['side']}^2 is {r['change']:.0%} slower",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
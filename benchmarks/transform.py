@@ -0,0 +1,87 @@
+"""
+Compare moving a ray batch into K object spaces one Ray.transform at a time with
+kernels.transform over chunk_size matrices at a time, as World.intersect runs it,
+and inverting K composed transforms one np.linalg.inv at a time with the
+closed-form batched inverse behind Sphere.inverse_stack.
+
+    python -m benchmarks.transform --counts 16 256 4096 --rays 1024
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src import kernels
+from src.grid import Point, VectorGrid
+from src.kernels import Workspace
+from src.light import Ray
+from src.matrix import Rotation, Scaling, Translation
+
+
+def transforms(count, seed=0):
+    rng = np.random.RandomState(seed)
+    return [
+        Translation(*rng.uniform(-5, 5, 3))
+        @ Rotation(*rng.uniform(0, np.pi, 3))
+        @ Scaling(*rng.uniform(0.1, 2, 3))
+        for _ in range(count)
+    ]
+
+
+def transform_chunks(matrices, ray, chunk_size, workspace):
+    origin, direction = np.asarray(ray.origin), np.asarray(ray.direction)
+    for start in range(0, len(matrices), chunk_size):
+        chunk = matrices[start : start + chunk_size]
+        kernels.transform(chunk, origin, None, workspace)
+        kernels.transform(chunk, direction, None, workspace)
+
+
+def timed(function, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--counts", type=int, nargs="+", default=[16, 256, 4096])
+    parser.add_argument("--rays", type=int, default=1024)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args()
+
+    side = int(np.sqrt(args.rays))
+    xs = np.linspace(-0.5, 0.5, side)
+    ray = Ray(Point(0, 0, -5), VectorGrid(xs, xs, 1).normalize())
+    workspace = Workspace()
+
+    print(
+        f"{'K':>6} {'step':>10} {'one by one (ms)':>16} {'stacked (ms)':>13} {'x':>6}"
+    )
+    for count in args.counts:
+        matrices = transforms(count)
+        stack = np.stack(matrices)
+        cases = {
+            "transform": (
+                lambda: [ray.transform(matrix) for matrix in matrices],
+                lambda: transform_chunks(stack, ray, args.chunk_size, workspace),
+            ),
+            "inverse": (
+                lambda: [np.linalg.inv(matrix) for matrix in matrices],
+                lambda: kernels.inverse(stack),
+            ),
+        }
+        for name, (single, stacked) in cases.items():
+            times = timed(single), timed(stacked)
+            print(
+                f"{count:>6} {name:>10} {times[0] * 1e3:>16.2f} "
+                f"{times[1] * 1e3:>13.2f} {times[0] / times[1]:>6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Render tiles with and without a Workspace and report per tile the time and the
+peak of temporary bytes that tracemalloc sees, plus the size of the arena and the
+Workspace.allocations per tile: those of a new Workspace for every tile, which is
+how many buffers the hot path takes, and those of one workspace once every tile
+has been through it, which should be none. What tracemalloc still sees with a
+workspace are numpy's own fixed-size ufunc buffers and small index arrays.
+
+    python -m benchmarks.workspace --tile-sizes 16 32 64 --side 256
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.precision import scene
+from src.canvas import Canvas
+from src.kernels import Workspace
+
+
+def allocations(camera, world, canvas, tiles, workspace=None):
+    # mean Workspace.allocations per tile, of workspace or of a new one every tile
+    counts = []
+    for tile in tiles:
+        arena = Workspace() if workspace is None else workspace
+        before = arena.allocations
+        camera.render_tile(world, canvas, tile, arena)
+        counts.append(arena.allocations - before)
+    return np.mean(counts)
+
+
+def measure(camera, world, tiles, workspace):
+    canvas = Canvas(camera.hsize, camera.vsize)
+    for tile in tiles:
+        camera.render_tile(world, canvas, tile, workspace)
+
+    start = time.perf_counter()
+    for tile in tiles:
+        camera.render_tile(world, canvas, tile, workspace)
+    elapsed = (time.perf_counter() - start) / len(tiles)
+
+    peaks = []
+    tracemalloc.start()
+    for tile in tiles:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        camera.render_tile(world, canvas, tile, workspace)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    if workspace is None:
+        return elapsed, np.mean(peaks), 0, None
+    reused = allocations(camera, world, canvas, tiles, workspace)
+    return elapsed, np.mean(peaks), workspace.nbytes, reused
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--tile-sizes", type=int, nargs="+", default=[16, 32, 64])
+    parser.add_argument("--side", type=int, default=256)
+    args = parser.parse_args()
+
+    camera, world = scene(args.side)
+    print(
+        f"{'tile':>5} {'workspace':>9} {'time (ms)':>10} {'peak (KB)':>10} "
+        f"{'arena (KB)':>11} {'fresh allocs':>13} {'allocs':>7}"
+    )
+    for tile_size in args.tile_sizes:
+        tiles = list(camera.tiles(tile_size))[:16]
+        canvas = Canvas(camera.hsize, camera.vsize)
+        fresh = allocations(camera, world, canvas, tiles)
+        for workspace in (None, Workspace()):
+            elapsed, peak, arena, reused = measure(camera, world, tiles, workspace)
+            reused = "-" if reused is None else f"{reused:.1f}"
+            print(
+                f"{tile_size:>5} {str(workspace is not None):>9} "
+                f"{elapsed * 1e3:>10.2f} {peak / 2 ** 10:>10.1f} "
+                f"{arena / 2 ** 10:>11.0f} {fresh:>13.1f} {reused:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
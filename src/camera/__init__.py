@@ -0,0 +1 @@
+from .camera import Camera
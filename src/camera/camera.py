@@ -0,0 +1,127 @@
+import numpy as np
+
+from src.canvas import Canvas
+from src.grid import Point, VectorGrid
+from src.kernels import FRESH, Workspace
+from src.light import Ray
+from src.matrix import Matrix
+from src.profiler import PROFILER
+
+
+class Camera:
+    """
+    Camera maps the pixels of a (hsize, vsize) canvas to rays in the world.
+    Rays are made lazily, one tile at a time, together with the canvas indices
+    of the pixels they belong to, so memory depends on the tile size only.
+    """
+
+    def __init__(self, hsize, vsize, field_of_view, transform=None):
+        self.hsize = hsize
+        self.vsize = vsize
+        self.field_of_view = field_of_view
+        self.transform = Matrix() if transform is None else transform
+        self.inverse = self.transform.inv
+
+        half_view = np.tan(field_of_view / 2)
+        aspect = hsize / vsize
+        if aspect >= 1:
+            self.half_width, self.half_height = half_view, half_view / aspect
+        else:
+            self.half_width, self.half_height = half_view * aspect, half_view
+        self.pixel_size = self.half_width * 2 / hsize
+
+    def __repr__(self):
+        return (
+            f"Camera({self.hsize}, {self.vsize}, {repr(self.field_of_view)}, "
+            f"{repr(self.transform)})"
+        )
+
+    def set_transform(self, transform):
+        return Camera(self.hsize, self.vsize, self.field_of_view, transform)
+
+    def tiles(self, tile_size=64):
+        # (top, bottom, left, right) pixel bounds, rows counted from the top
+        for top in range(0, self.vsize, tile_size):
+            for left in range(0, self.hsize, tile_size):
+                yield (
+                    top,
+                    min(top + tile_size, self.vsize),
+                    left,
+                    min(left + tile_size, self.hsize),
+                )
+
+    def pixels(self, tile):
+        top, bottom, left, right = tile
+        ys, xs = np.mgrid[top:bottom, left:right]
+        return xs.ravel(), ys.ravel()
+
+    def to_canvas_index(self, xs, ys):
+        # Canvas is stored bottom row first, see Canvas.to_ppm
+        return self.vsize - 1 - ys, xs
+
+    def canvas_tile(self, canvas, tile):
+        # the (rows, cols, 3) view of canvas a tile covers, rows flipped as above
+        top, bottom, left, right = tile
+        return canvas[self.vsize - bottom : self.vsize - top, left:right][::-1]
+
+    def ray_for_pixels(self, xs, ys, dx=0.5, dy=0.5, workspace=None):
+        # dx and dy pick the point inside each pixel, 0.5 being its center
+        with PROFILER.stage("camera.rays", len(xs)):
+            workspace = FRESH if workspace is None else workspace
+            inv = np.asarray(self.inverse)
+            pixels = workspace.take("camera.pixels", (len(xs), 4), inv.dtype)
+            directions = workspace.take("camera.directions", (len(xs), 4), inv.dtype)
+            lengths = workspace.take("camera.lengths", (len(xs),), inv.dtype)
+
+            # world x and y of the pixels, then rows times the transpose are inv @ p.
+            # ufuncs over (N, 2) or (N, 4) views loop 2 or 4 wide, so columns go one
+            # by one, in the order the sum over the last axis would add them
+            for column, coordinates, delta, half in (
+                (pixels[:, 0], xs, dx, self.half_width),
+                (pixels[:, 1], ys, dy, self.half_height),
+            ):
+                np.add(coordinates, delta, out=column)
+                column *= -self.pixel_size
+                column += half
+            pixels[:, 2:] = (-1, 1)
+            np.matmul(pixels, inv.T, out=directions)
+            origin = inv[np.newaxis, :, 3].copy()
+
+            directions -= origin
+            np.multiply(directions, directions, out=pixels)
+            np.add(pixels[:, 0], pixels[:, 1], out=lengths)
+            lengths += pixels[:, 2]
+            lengths += pixels[:, 3]
+            directions /= np.sqrt(lengths, out=lengths)[:, np.newaxis]
+            return Ray(origin.view(Point), directions.view(VectorGrid))
+
+    def ray_for_tile(self, tile, workspace=None):
+        xs, ys = self.pixels(tile)
+        ray = self.ray_for_pixels(xs, ys, workspace=workspace)
+        return ray, self.to_canvas_index(xs, ys)
+
+    def rays(self, tile_size=64):
+        for tile in self.tiles(tile_size):
+            yield self.ray_for_tile(tile)
+
+    def render(self, world, tile_size=64, canvas=None):
+        # canvas may be given, e.g. a Canvas.memmap that tiles are written straight to
+        if canvas is None:
+            canvas = Canvas(self.hsize, self.vsize)
+        workspace = Workspace()
+        with PROFILER.stage("frame", self.hsize * self.vsize):
+            for tile in self.tiles(tile_size):
+                self.render_tile(world, canvas, tile, workspace)
+        return canvas
+
+    def render_tile(self, world, canvas, tile, workspace=None):
+        # a workspace kept from tile to tile saves allocating the temporaries
+        top, bottom, left, right = tile
+        with PROFILER.stage("tile", (bottom - top) * (right - left), tile=tile):
+            xs, ys = self.pixels(tile)
+            ray = self.ray_for_pixels(xs, ys, workspace=workspace)
+            colors = np.asarray(world.color_at(ray, workspace))
+            # a tile is a block of the canvas, so it is written as one slice
+            view = self.canvas_tile(canvas, tile)
+            with PROFILER.stage("canvas.write", len(colors)):
+                view[...] = colors.reshape(view.shape)
@@ -1,37 +1,139 @@
-import textwrap
+import io
+import os
+import struct
+import zlib
 
 import matplotlib.pyplot as plt
 import numpy as np
 
+from src.precision import PRECISION
+from src.profiler import PROFILER
+
+# ascii digits of 0..255, left aligned in 3 bytes, and how many of them are used
+_DIGITS = np.array([list(f"{v:<3}".encode()) for v in range(256)], dtype=np.uint8)
+_LENGTHS = np.array([len(str(v)) for v in range(256)])
+
 
 class Canvas(np.ndarray):
     """
     Canvas holds (cols, rows, 3) ndarray for drawing various formats.
+    When buffer is given, e.g. a shared memory block, the pixels live in it.
+    Canvas.memmap keeps the pixels in a file instead, for images larger than memory.
     """
 
-    def __new__(cls, rows, cols):
-        obj = np.zeros((cols, rows, 3)).view(Canvas)
+    def __new__(cls, rows, cols, buffer=None, dtype=None):
+        dtype = PRECISION.dtype if dtype is None else dtype
+        if buffer is None:
+            obj = np.zeros((cols, rows, 3), dtype).view(Canvas)
+        else:
+            obj = np.ndarray((cols, rows, 3), dtype, buffer=buffer).view(Canvas)
+        obj.rows = rows
+        obj.cols = cols
+        return obj
+
+    @staticmethod
+    def memmap(path, rows, cols, dtype=np.float32, mode="w+"):
+        # pages are only read or written as tiles touch them; "r+" reopens a file
+        mapped = np.memmap(path, dtype, mode, shape=(cols, rows, 3))
+        obj = mapped.view(Canvas)
         obj.rows = rows
         obj.cols = cols
+        obj._mapped = mapped
         return obj
 
+    def flush(self):
+        mapped = getattr(self, "_mapped", None)
+        if mapped is not None:
+            mapped.flush()
+
     def to_matplotlib(self, figsize=(10, 10)):
         fig, ax = plt.subplots(figsize=figsize)
         ax.imshow(np.flipud(self.clip(0, 1)))
         return fig, ax
 
     def to_ppm(self):
-        header = "P3\n" f"{self.rows} {self.cols}\n" "255\n"
+        buffer = io.BytesIO()
+        self.write_ppm(buffer, binary=False)
+        return buffer.getvalue().decode()
+
+    def write_ppm(self, path_or_file, binary=True, chunk_rows=256):
+        """
+        Write the canvas as binary P6 or plain P3, a chunk of image rows at a time.
+        Plain lines are wrapped at 70 columns like textwrap would do.
+        """
+        if isinstance(path_or_file, (str, os.PathLike)):
+            with open(path_or_file, "wb") as f:
+                return self.write_ppm(f, binary, chunk_rows)
+
+        magic = "P6" if binary else "P3"
+        with PROFILER.stage("canvas.write_ppm", self.rows * self.cols):
+            path_or_file.write(f"{magic}\n{self.rows} {self.cols}\n255\n".encode())
+            for chunk in self._chunks(chunk_rows):
+                if binary:
+                    path_or_file.write(chunk.tobytes())
+                else:
+                    path_or_file.write(self._plain(chunk))
+
+    def write_png(self, path_or_file, chunk_rows=256, level=6):
+        """
+        Write the canvas as 8-bit RGB PNG, compressing a chunk of image rows at a time.
+        """
+        if isinstance(path_or_file, (str, os.PathLike)):
+            with open(path_or_file, "wb") as f:
+                return self.write_png(f, chunk_rows, level)
+
+        def chunk(kind, data):
+            path_or_file.write(struct.pack(">I", len(data)) + kind + data)
+            path_or_file.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+        with PROFILER.stage("canvas.write_png", self.rows * self.cols):
+            path_or_file.write(b"\x89PNG\r\n\x1a\n")
+            chunk(b"IHDR", struct.pack(">IIBBBBB", self.rows, self.cols, 8, 2, 0, 0, 0))
+
+            # every scanline starts with its filter type, 0 being none
+            compressor = zlib.compressobj(level)
+            for block in self._chunks(chunk_rows):
+                lines = np.zeros((len(block), 1 + self.rows * 3), dtype=np.uint8)
+                lines[:, 1:] = block.reshape(len(block), -1)
+                data = compressor.compress(lines.tobytes())
+                if data:
+                    chunk(b"IDAT", data)
+            chunk(b"IDAT", compressor.flush())
+            chunk(b"IEND", b"")
+
+    def _chunks(self, chunk_rows):
+        # uint8 blocks of image rows from the top, the canvas being stored bottom first.
+        # rows are converted to float64 a chunk at a time, whatever the canvas dtype.
+        for stop in range(self.cols, 0, -chunk_rows):
+            rows = np.asarray(self[max(stop - chunk_rows, 0) : stop][::-1], float)
+            yield np.ceil((rows * 255).clip(0, 255)).astype(np.uint8)
+
+    @staticmethod
+    def _plain(chunk):
+        values = chunk.reshape(len(chunk), -1)
+        count, width = values.shape
+        lengths = _LENGTHS[values]
+
+        # greedy wrap: ends[i] = first token after the current line of row i.
+        # tokens s..e-1 fit when the offset of e minus the offset of s is at most 71.
+        offsets = np.zeros((count, width + 1), dtype=int)
+        offsets[:, 1:] = np.cumsum(lengths + 1, axis=1)
+        shift = np.arange(count)[:, np.newaxis] * (offsets[:, -1].max() + 72)
+        flat = (offsets + shift).ravel()
 
-        raw_body = (
-            np.ceil((np.flipud(self) * 255).clip(0, 255))
-            .astype(int)
-            .astype(str)
-            .reshape(self.cols, -1)
-        )
-        raw_lines = [" ".join(["".join(cell) for cell in row]) for row in raw_body]
-        body = "\n".join(["\n".join(textwrap.wrap(line)) for line in raw_lines])
+        line_ends = np.zeros((count, width), dtype=bool)
+        rows, starts = np.arange(count), np.zeros(count, dtype=int)
+        while rows.size:
+            limit = offsets[rows, starts] + 71 + shift[rows, 0]
+            ends = np.searchsorted(flat, limit, "right") - rows * (width + 1) - 1
+            line_ends[rows, ends - 1] = True
+            alive = ends < width
+            rows, starts = rows[alive], ends[alive]
 
-        ppm = header + body + "\n"
+        text = np.empty((count, width, 4), dtype=np.uint8)
+        text[..., :3] = _DIGITS[values]
+        text[..., 3] = np.where(line_ends, ord("\n"), ord(" "))
 
-        return ppm
+        used = np.ones((count, width, 4), dtype=bool)
+        used[..., :3] = np.arange(3) < lengths[..., np.newaxis]
+        return text[used].tobytes()
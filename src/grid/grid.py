@@ -1,14 +1,16 @@
 from collections.abc import Iterable
-from itertools import product
 
 import numpy as np
 
+from src.precision import PRECISION
+
 
 class Grid(np.ndarray):
     """
     Grid holds the list of vectors.
     When to_mesh is True, the list will be the cartesian product.
     For the convenience, you can pass the scalar.
+    Grids are made in the dtype of PRECISION.
     """
 
     def __new__(cls, xs, ys, zs, ws, to_mesh=True):
@@ -16,14 +18,32 @@ class Grid(np.ndarray):
             return x if isinstance(x, Iterable) else [x]
 
         if to_mesh:
-            obj = np.array(list(product(_l(xs), _l(ys), _l(zs), _l(ws)))).view(cls)
+            obj = Grid.mesh(_l(xs), _l(ys), _l(zs), _l(ws), PRECISION.dtype).view(cls)
         else:
-            obj = np.vstack([xs, ys, zs, ws * len(xs)]).T.view(cls)
+            obj = np.vstack([xs, ys, zs, ws * len(xs)]).T
+            obj = obj.astype(PRECISION.dtype, copy=False).view(cls)
         return obj
 
     def __eq__(self, other):
         return np.allclose(self, other)
 
+    @staticmethod
+    def mesh(xs, ys, zs, ws, dtype=None):
+        # same rows and order as `np.array(list(itertools.product(xs, ys, zs, ws)))`,
+        # broadcast column by column into one preallocated (N, 4) buffer.
+        # generators and other iterators are read into a list first, as product does
+        axes = [
+            np.asarray(axis if hasattr(axis, "__len__") else list(axis)).ravel()
+            for axis in (xs, ys, zs, ws)
+        ]
+        shape = [len(axis) for axis in axes]
+
+        dtype = np.result_type(*axes) if dtype is None else dtype
+        mesh = np.empty((*shape, 4), dtype=dtype)
+        for i, axis in enumerate(axes):
+            mesh[..., i] = axis.reshape([-1 if i == j else 1 for j in range(4)])
+        return mesh.reshape(-1, 4)
+
     def __matmul__(self, other):
         # __matmul__ of grid return the row-wise dot product
         # this is equivalent to `(self.T * other.T).sum(0)[:,np.newaxis]` but this is three times faster
@@ -114,7 +134,8 @@ class Point(PointGrid):
 
 class ColorGrid(np.ndarray):
     def __new__(cls, reds=0, greens=0, blues=0):
-        return np.vstack([reds, greens, blues]).T.view(cls)
+        colors = np.vstack([reds, greens, blues]).T
+        return colors.astype(PRECISION.dtype, copy=False).view(cls)
 
     def __repr__(self):
         return f"ColorGrid({', '.join(map(repr, self.T.tolist()))})"
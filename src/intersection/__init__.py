@@ -1 +1,2 @@
+from .hit import Hit
 from .intersection import Intersection
@@ -0,0 +1,27 @@
+import numpy as np
+
+
+class Hit(np.ndarray):
+    """
+    Hit holds the nearest non-negative t of every ray that hits one of many objects.
+    Like Intersection, only the rays selected by mask are kept,
+    and index tells which of objs each of them hit.
+    """
+
+    def __new__(cls, ts, mask, index, objs):
+        self = np.asarray(ts).view(cls)
+        self.mask = mask
+        self.index = index
+        self.objs = objs
+        return self
+
+    def __eq__(self, other):
+        return np.allclose(self, other)
+
+    @property
+    def count(self):
+        return self.shape[0]
+
+    @property
+    def hit(self):
+        return self.view(np.ndarray)
@@ -0,0 +1,13 @@
+from .kernels import (
+    after,
+    facing,
+    intersect,
+    intersect_pairs,
+    inverse,
+    nearest,
+    normals,
+    phong,
+    solve,
+    transform,
+)
+from .workspace import FRESH, Workspace
@@ -0,0 +1,311 @@
+"""
+Plain ndarray kernels of the per-tile hot path: intersect, transform, nearest,
+after, normals, facing and phong. They take and return bare ndarrays, so no
+subclass views, __array_wrap__ or type checks run inside them. Grid, Matrix, Ray,
+Light and World keep their typed API and call these underneath.
+Points and vectors are (N, 4) rows, (1, 4) when shared; matrices are (K, 4, 4).
+Every temporary comes from workspace, see Workspace. The results go to out when it
+is given, else to the workspace as well, so they are only valid until the same
+kernel runs again with it. Without a workspace everything is freshly allocated.
+"""
+import numpy as np
+
+from .workspace import FRESH
+
+
+def intersect(inverses, origins, directions, out=None, workspace=None):
+    # t1 and t2 of every (shape, ray) pair as (K, N) arrays, nan where a ray misses.
+    workspace = FRESH if workspace is None else workspace
+    count = max(len(origins), len(directions))
+    dtype = np.result_type(inverses, origins, directions)
+
+    shape = (len(inverses), 3, len(directions))
+    planes = transform(
+        inverses, directions, workspace.take("intersect.directions", shape, dtype)
+    )
+    shape = (len(inverses), 3, len(origins))
+    origin_planes = transform(
+        inverses, origins, workspace.take("intersect.origins", shape, dtype)
+    )
+
+    if out is None:
+        out = (
+            workspace.take("intersect.t1", (len(inverses), count), dtype),
+            workspace.take("intersect.t2", (len(inverses), count), dtype),
+        )
+    return solve(origin_planes, planes, out, workspace)
+
+
+def intersect_pairs(inverses, origins, directions, out=None, workspace=None):
+    # t1 and t2 of the i-th ray against the i-th shape only, as (P,) arrays.
+    # the products are summed in the order matmul uses, so a pair gives the same
+    # roots here as in intersect.
+    workspace = FRESH if workspace is None else workspace
+    linear = inverses[:, :3]
+    origins = (linear * origins[:, np.newaxis]).sum(-1).T
+    directions = (linear * directions[:, np.newaxis]).sum(-1).T
+
+    if out is None:
+        shape, dtype = (len(inverses),), np.result_type(origins, directions)
+        out = (
+            workspace.take("intersect_pairs.t1", shape, dtype),
+            workspace.take("intersect_pairs.t2", shape, dtype),
+        )
+    return solve(origins, directions, out, workspace)
+
+
+def solve(origins, directions, out=None, workspace=None):
+    # roots of |origin + t direction| = 1, for object-space x, y and z planes
+    workspace = FRESH if workspace is None else workspace
+    ox, oy, oz = origins
+    dx, dy, dz = directions
+    shape = np.broadcast_shapes(ox.shape, dx.shape)
+    origin_shape = np.broadcast_shapes(ox.shape, oy.shape, oz.shape)
+    dtype = np.result_type(ox, dx)
+
+    a = workspace.take("solve.a", shape, dtype)
+    b = workspace.take("solve.b", shape, dtype)
+    c = workspace.take("solve.c", origin_shape, dtype)
+    scratch = workspace.take("solve.scratch", shape, dtype)
+    origin_scratch = workspace.take("solve.origin_scratch", origin_shape, dtype)
+    if out is None:
+        out = (
+            workspace.take("solve.t1", shape, dtype),
+            workspace.take("solve.t2", shape, dtype),
+        )
+    t1, t2 = out
+
+    # a = d.d, b = 2 d.o and c = o.o - 1
+    np.multiply(dx, dx, out=a)
+    a += np.multiply(dy, dy, out=scratch)
+    a += np.multiply(dz, dz, out=scratch)
+    np.multiply(dx, ox, out=b)
+    b += np.multiply(dy, oy, out=scratch)
+    b += np.multiply(dz, oz, out=scratch)
+    b *= 2
+    np.multiply(ox, ox, out=c)
+    c += np.multiply(oy, oy, out=origin_scratch)
+    c += np.multiply(oz, oz, out=origin_scratch)
+    c -= 1
+
+    # the root of a negative discriminant is nan, which is how misses come out
+    np.multiply(a, 4, out=t2)
+    t2 *= c
+    np.subtract(np.multiply(b, b, out=scratch), t2, out=t2)
+    with np.errstate(invalid="ignore"):
+        np.sqrt(t2, out=t2)
+
+    a *= 2
+    np.negative(b, out=b)
+    np.subtract(b, t2, out=t1)
+    t1 /= a
+    t2 += b
+    t2 /= a
+    return t1, t2
+
+
+def transform(matrices, rows, out=None, workspace=None):
+    # x, y and z of rows under each of K (K, 4, 4) matrices as (3, K, N) planes,
+    # so solve adds whole planes instead of reducing over a short last axis.
+    # out is the (K, 3, N) buffer the planes are a transposed view of.
+    workspace = FRESH if workspace is None else workspace
+    linear = matrices[:, :3]
+    if out is None:
+        shape = (len(matrices), 3, len(rows))
+        dtype = np.result_type(matrices, rows)
+        out = workspace.take("transform.planes", shape, dtype)
+    if len(rows) == 1:
+        # a shared row is only K products, summed like intersect_pairs does
+        np.sum(linear * rows[0], axis=-1, out=out[..., 0])
+    else:
+        np.matmul(linear, rows.T, out=out)
+    return out.transpose(1, 0, 2)
+
+
+def inverse(matrices, out=None):
+    # closed-form inverses of (K, 4, 4) matrices: the adjugate from the 2x2 minors
+    # of the top and bottom row pairs over the determinant, for all K at once
+    rows = np.moveaxis(matrices, 0, -1)
+    (a00, a01, a02, a03), (a10, a11, a12, a13) = rows[:2]
+    (a20, a21, a22, a23), (a30, a31, a32, a33) = rows[2:]
+
+    s0, s1, s2 = a00 * a11 - a10 * a01, a00 * a12 - a10 * a02, a00 * a13 - a10 * a03
+    s3, s4, s5 = a01 * a12 - a11 * a02, a01 * a13 - a11 * a03, a02 * a13 - a12 * a03
+    c0, c1, c2 = a20 * a31 - a30 * a21, a20 * a32 - a30 * a22, a20 * a33 - a30 * a23
+    c3, c4, c5 = a21 * a32 - a31 * a22, a21 * a33 - a31 * a23, a22 * a33 - a32 * a23
+
+    det = s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0
+    if not np.all(det):
+        raise np.linalg.LinAlgError("Singular matrix")
+
+    adjugate = [
+        [
+            a11 * c5 - a12 * c4 + a13 * c3,
+            -a01 * c5 + a02 * c4 - a03 * c3,
+            a31 * s5 - a32 * s4 + a33 * s3,
+            -a21 * s5 + a22 * s4 - a23 * s3,
+        ],
+        [
+            -a10 * c5 + a12 * c2 - a13 * c1,
+            a00 * c5 - a02 * c2 + a03 * c1,
+            -a30 * s5 + a32 * s2 - a33 * s1,
+            a20 * s5 - a22 * s2 + a23 * s1,
+        ],
+        [
+            a10 * c4 - a11 * c2 + a13 * c0,
+            -a00 * c4 + a01 * c2 - a03 * c0,
+            a30 * s4 - a31 * s2 + a33 * s0,
+            -a20 * s4 + a21 * s2 - a23 * s0,
+        ],
+        [
+            -a10 * c3 + a11 * c1 - a12 * c0,
+            a00 * c3 - a01 * c1 + a02 * c0,
+            -a30 * s3 + a31 * s1 - a32 * s0,
+            a20 * s3 - a21 * s1 + a22 * s0,
+        ],
+    ]
+    if out is None:
+        # a float32 stack inverts to float32, anything not floating to float64
+        dtype = matrices.dtype
+        if not np.issubdtype(dtype, np.floating):
+            dtype = np.dtype(float)
+        out = np.empty(matrices.shape, dtype=dtype)
+    for i, row in enumerate(adjugate):
+        for j, entry in enumerate(row):
+            np.divide(entry, det, out=out[:, i, j])
+    return out
+
+
+def nearest(t1, t2, out=None, workspace=None):
+    # the smallest non-negative t over the shape axis of (K, N) arrays, inf if none
+    workspace = FRESH if workspace is None else workspace
+    # ts is stored ray by ray, so argmin over shapes needs no contiguous copy
+    ts = workspace.take("nearest.ts", t1.shape[::-1], t1.dtype).T
+    valid = workspace.take("nearest.valid", t1.shape, bool)
+
+    np.copyto(ts, t2)
+    np.copyto(ts, t1, where=np.greater_equal(t1, 0, out=valid))
+    np.greater_equal(ts, 0, out=valid)
+    np.copyto(ts, np.inf, where=np.logical_not(valid, out=valid))
+
+    if out is None:
+        out = (
+            workspace.take("nearest.depths", t1.shape[1:], t1.dtype),
+            workspace.take("nearest.index", t1.shape[1:], np.intp),
+        )
+    depths, index = out
+    ts.argmin(axis=0, out=index)
+    ts.min(axis=0, out=depths)
+    return depths, index
+
+
+def after(origins, directions, ts, out=None, workspace=None):
+    workspace = FRESH if workspace is None else workspace
+    if out is None:
+        dtype = np.result_type(origins, directions, ts)
+        out = workspace.take("after.points", directions.shape, dtype)
+    np.multiply(directions, ts[:, np.newaxis], out=out)
+    out += origins
+    return out
+
+
+def normals(inverses, index, points, out=None, workspace=None):
+    # normalized world-space normals, index picks the shape of every point
+    workspace = FRESH if workspace is None else workspace
+    shape, dtype = points.shape, np.result_type(inverses, points)
+    if len(inverses) == 1:
+        # one shape needs no per-point copy of its inverse, a broadcast view will do
+        inverse = np.broadcast_to(inverses, (len(index), 4, 4))
+    else:
+        # mode="clip" keeps np.take from buffering the whole gather before out
+        inverse = workspace.take("normals.inverse", (len(index), 4, 4), inverses.dtype)
+        np.take(inverses, index, axis=0, out=inverse, mode="clip")
+
+    obj_normals = workspace.take("normals.object", shape, dtype)
+    np.einsum("mij,mj->mi", inverse, points, out=obj_normals)
+    obj_normals[:, 3] = 0
+
+    if out is None:
+        out = workspace.take("normals.normals", shape, dtype)
+    np.einsum("mji,mj->mi", inverse, obj_normals, out=out)
+    out[:, 3] = 0
+    lengths = workspace.take("normals.lengths", shape[:1], dtype)
+    np.sqrt(np.einsum("mi,mi->m", out, out, out=lengths), out=lengths)
+    out /= lengths[:, np.newaxis]
+    return out
+
+
+def facing(light_position, points, normals, out=None, workspace=None):
+    # points whose surface faces the light, the only ones that can be lit
+    workspace = FRESH if workspace is None else workspace
+    dtype = np.result_type(light_position, points)
+    lightv = workspace.take("facing.lightv", points.shape, dtype)
+    along = workspace.take("facing.along", points.shape[:1], dtype)
+    np.subtract(light_position, points, out=lightv)
+    np.einsum("ij,ij->i", lightv, normals, out=along)
+
+    if out is None:
+        out = workspace.take("facing.facing", points.shape[:1], bool)
+    return np.greater_equal(along, 0, out=out)
+
+
+def phong(
+    material,
+    light_position,
+    intensity,
+    points,
+    eyes,
+    normals,
+    in_shadow=None,
+    out=None,
+    workspace=None,
+):
+    # (N, 3) Phong colors of points lit by one point light.
+    # material is one Material, or Materials with one row per point.
+    workspace = FRESH if workspace is None else workspace
+    count, dtype = len(points), np.result_type(points, intensity)
+    lightv = workspace.take("phong.lightv", points.shape, dtype)
+    reflectv = workspace.take("phong.reflectv", points.shape, dtype)
+    light_dot_normal = workspace.take("phong.light_dot_normal", (count,), dtype)
+    reflect_dot_eye = workspace.take("phong.reflect_dot_eye", (count,), dtype)
+    lit = workspace.take("phong.lit", (count,), bool)
+    shiny = workspace.take("phong.shiny", (count,), bool)
+    term = workspace.take("phong.term", (count, 3), dtype)
+
+    np.subtract(light_position, points, out=lightv)
+    lengths = np.einsum("ij,ij->i", lightv, lightv, out=reflect_dot_eye)
+    lightv /= np.sqrt(lengths, out=lengths)[:, np.newaxis]
+    np.einsum("ij,ij->i", lightv, normals, out=light_dot_normal)
+    np.greater_equal(light_dot_normal, 0, out=lit)
+    if in_shadow is not None:
+        lit &= np.logical_not(in_shadow, out=shiny)
+
+    # reflect(-lightv, normal) = 2 (lightv . normal) normal - lightv
+    np.multiply(normals, light_dot_normal[:, np.newaxis], out=reflectv)
+    reflectv *= 2
+    reflectv -= lightv
+    np.einsum("ij,ij->i", reflectv, eyes, out=reflect_dot_eye)
+    np.greater(reflect_dot_eye, 0, out=shiny)
+    shiny &= lit
+
+    # scalars of one Material broadcast as (1, ...) rows, gathered Materials per ray
+    color = np.reshape(material.color, (-1, 3))
+    effective = workspace.take("phong.effective", color.shape, dtype)
+    np.multiply(color, intensity.reshape(3), out=effective)
+    if out is None:
+        out = workspace.take("phong.colors", (count, 3), dtype)
+    np.multiply(effective, np.reshape(material.ambient, (-1, 1)), out=out)
+
+    # unlit points add a zero term, which leaves their ambient color as it is
+    np.copyto(light_dot_normal, 0, where=np.logical_not(lit, out=lit))
+    effective *= np.reshape(material.diffuse, (-1, 1))
+    out += np.multiply(light_dot_normal[:, np.newaxis], effective, out=term)
+
+    # the power is by far the most expensive step, so only where it counts
+    np.power(reflect_dot_eye, material.shininess, out=reflect_dot_eye, where=shiny)
+    np.copyto(reflect_dot_eye, 0, where=np.logical_not(shiny, out=shiny))
+    specular = np.reshape(material.specular, (-1, 1))
+    scaled = workspace.take("phong.specular", (len(specular), 3), dtype)
+    np.multiply(intensity.reshape(3), specular, out=scaled)
+    out += np.multiply(reflect_dot_eye[:, np.newaxis], scaled, out=term)
+    return out
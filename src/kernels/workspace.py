@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+
+from src.precision import PRECISION
+
+
+class Workspace:
+    """
+    Workspace is an arena of scratch arrays reused from tile to tile.
+    take hands out a view of the buffer called name in the asked shape and only
+    allocates when that buffer is new or too small, so once the largest tile has
+    been through, the same memory serves every later one.
+    Views stay valid until the next take of the same name, and a workspace belongs
+    to one worker: threads must not share one.
+    With reuse=False every take allocates, which is what FRESH does for callers
+    that pass no workspace.
+    """
+
+    def __init__(self, reuse=True):
+        self.reuse = reuse
+        self.allocations = 0
+        self._buffers = {}
+
+    def __repr__(self):
+        return f"Workspace(reuse={self.reuse})"
+
+    def __len__(self):
+        return len(self._buffers)
+
+    @property
+    def nbytes(self):
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def take(self, name, shape, dtype=None):
+        dtype = np.dtype(PRECISION.dtype if dtype is None else dtype)
+        if not self.reuse:
+            return np.empty(shape, dtype)
+
+        size = math.prod(shape)
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.dtype != dtype or buffer.size < size:
+            buffer = np.empty(size, dtype)
+            self._buffers[name] = buffer
+            self.allocations += 1
+        return buffer[:size].reshape(shape)
+
+    def compress(self, name, mask, array, count=None):
+        # array[mask] along the first axis, into the buffer called name
+        if count is None:
+            count = np.count_nonzero(mask)
+        out = self.take(name, (count, *array.shape[1:]), array.dtype)
+        return np.compress(mask, array, axis=0, out=out)
+
+    def clear(self):
+        self._buffers = {}
+
+
+FRESH = Workspace(reuse=False)
@@ -1,2 +1,3 @@
 from .light import Light
 from .ray import Ray
+from .light_set import LightSet
@@ -1,6 +1,8 @@
 import numpy as np
 
+from src import kernels
 from src.grid import ColorGrid
+from src.profiler import PROFILER
 
 
 class Light:
@@ -16,28 +18,51 @@ class Light:
     def intensity(self):
         return self._intensity
 
-    def get_color(self, material, position, eyev, normalv):
-        effective_color = material.color * self.intensity
-        lightv = (self.position - position).normalize()
-        ambient = effective_color * material.ambient
-
-        light_dot_normal = lightv @ normalv
-        light_mask = (light_dot_normal >= 0).flatten()
-
-        reflectv = (-lightv).reflect(normalv)
-        reflect_dot_eye = reflectv @ eyev
-        reflect_mask = (reflect_dot_eye > 0).flatten() & light_mask
-
-        diffuse = ColorGrid(*np.zeros((3, len(light_dot_normal))))
-        specular = ColorGrid(*np.zeros((3, len(reflect_dot_eye))))
+    def facing(self, position, normalv, workspace=None):
+        # points whose surface faces the light, the only ones that can be lit
+        return kernels.facing(
+            np.asarray(self.position),
+            np.asarray(position),
+            np.asarray(normalv),
+            workspace=workspace,
+        )
 
-        masked_light_dot_normal = light_dot_normal[light_mask]
-        masked_reflect_dot_eye = reflect_dot_eye[reflect_mask]
+    def get_color(
+        self,
+        material,
+        position,
+        eyev,
+        normalv,
+        in_shadow=None,
+        out=None,
+        workspace=None,
+    ):
+        # out, e.g. a slice of a tile's colors, takes the result when given.
+        # material is one Material, or Materials gathered with a row per point.
+        with PROFILER.stage("light.get_color", len(normalv)):
+            return self._get_color(
+                material, position, eyev, normalv, in_shadow, out, workspace
+            )
 
-        diffuse[light_mask] = (
-            effective_color * material.diffuse * masked_light_dot_normal
+    def _get_color(
+        self,
+        material,
+        position,
+        eyev,
+        normalv,
+        in_shadow=None,
+        out=None,
+        workspace=None,
+    ):
+        colors = kernels.phong(
+            material,
+            np.asarray(self.position),
+            np.asarray(self.intensity),
+            np.asarray(position),
+            np.asarray(eyev),
+            np.asarray(normalv),
+            in_shadow,
+            out,
+            workspace,
         )
-        factor = masked_reflect_dot_eye ** material.shininess
-        specular[reflect_mask] = self.intensity * material.specular * factor
-
-        return ambient + diffuse + specular
+        return colors.view(ColorGrid)
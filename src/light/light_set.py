@@ -0,0 +1,140 @@
+import numpy as np
+
+from src.grid import ColorGrid, PointGrid
+from src.kernels import FRESH
+from src.precision import PRECISION
+from src.profiler import PROFILER
+
+
+class LightSet:
+    """
+    LightSet holds many point lights as one array of positions and one of intensities.
+    Shading broadcasts over (points, lights), chunk_size lights at a time to bound
+    the temporaries, and sums the lights into one color per point, which is what
+    adding up Light.get_color of every light would give.
+    """
+
+    chunk_size = 8
+
+    def __init__(self, positions, intensities):
+        self._positions = PointGrid(*np.asarray(positions)[:, :3].T, False)
+        self._intensities = ColorGrid(*np.asarray(intensities).T)
+
+    def __repr__(self):
+        return f"LightSet({repr(self.positions)}, {repr(self.intensities)})"
+
+    def __len__(self):
+        return len(self._positions)
+
+    @staticmethod
+    def of(lights):
+        lights = list(lights)
+        return LightSet(
+            np.vstack([light.position for light in lights]),
+            np.vstack([light.intensity for light in lights]),
+        )
+
+    @property
+    def positions(self):
+        return self._positions
+
+    @property
+    def intensities(self):
+        return self._intensities
+
+    def facing(self, position, normalv, workspace=None):
+        # (points, lights) mask of surfaces facing each light, as in Light.facing
+        normals = np.asarray(normalv)
+        along = np.einsum("ij,ij->i", np.asarray(position), normals)[:, np.newaxis]
+        return normals @ np.asarray(self.positions).T - along >= 0
+
+    def get_color(
+        self,
+        material,
+        position,
+        eyev,
+        normalv,
+        in_shadow=None,
+        out=None,
+        workspace=None,
+    ):
+        # in_shadow is a (points, lights) mask, e.g. from World.is_shadowed.
+        # out and workspace are as in Light.get_color, the chunks bound the rest.
+        with PROFILER.stage("lights.get_color", len(normalv) * len(self)):
+            colors = self._get_color(
+                material, position, eyev, normalv, in_shadow, out, workspace
+            )
+            return colors.view(ColorGrid)
+
+    def _get_color(
+        self,
+        material,
+        position,
+        eyev,
+        normalv,
+        in_shadow=None,
+        out=None,
+        workspace=None,
+    ):
+        workspace = FRESH if workspace is None else workspace
+        points = np.asarray(position)[:, :3]
+        normals = np.asarray(normalv)[:, :3]
+        eyes = np.asarray(eyev)[:, :3]
+        positions = np.asarray(self.positions)[:, :3]
+        intensities = np.asarray(self.intensities)
+        count, dtype = len(points), PRECISION.dtype
+
+        # ambient adds up over lights like the other terms
+        diffuse = workspace.take("lights.diffuse", (count, 3), dtype)
+        specular = workspace.take("lights.specular", (count, 3), dtype)
+        term = workspace.take("lights.term", (count, 3), dtype)
+        diffuse[...] = 0
+        specular[...] = 0
+        for start in range(0, len(self), self.chunk_size):
+            chunk = slice(start, start + self.chunk_size)
+            shape = (count, len(positions[chunk]))
+            lightv = workspace.take("lights.lightv", (*shape, 3), dtype)
+            reflected = workspace.take("lights.reflected", (*shape, 3), dtype)
+            light_dot_normal = workspace.take("lights.light_dot_normal", shape, dtype)
+            reflect_dot_eye = workspace.take("lights.reflect_dot_eye", shape, dtype)
+            lit = workspace.take("lights.lit", shape, bool)
+            shiny = workspace.take("lights.shiny", shape, bool)
+
+            np.subtract(positions[chunk], points[:, np.newaxis], out=lightv)
+            lengths = np.einsum("nlj,nlj->nl", lightv, lightv, out=reflect_dot_eye)
+            lightv /= np.sqrt(lengths, out=lengths)[..., np.newaxis]
+            np.einsum("nlj,nj->nl", lightv, normals, out=light_dot_normal)
+            np.greater_equal(light_dot_normal, 0, out=lit)
+            if in_shadow is not None:
+                lit &= np.logical_not(in_shadow[:, chunk], out=shiny)
+
+            # reflect(-lightv, normal) = 2 (lightv . normal) normal - lightv
+            reflectv = np.multiply(
+                light_dot_normal[..., np.newaxis], normals[:, np.newaxis], out=reflected
+            )
+            reflectv *= 2
+            reflectv -= lightv
+            np.einsum("nlj,nj->nl", reflectv, eyes, out=reflect_dot_eye)
+            np.greater(reflect_dot_eye, 0, out=shiny)
+            shiny &= lit
+
+            np.copyto(light_dot_normal, 0, where=np.logical_not(lit, out=lit))
+            diffuse += np.matmul(light_dot_normal, intensities[chunk], out=term)
+
+            # the power is by far the most expensive step, so only where it counts.
+            # one Material, or Materials with one row per point
+            exponent = np.reshape(material.shininess, (-1, 1))
+            np.power(reflect_dot_eye, exponent, out=reflect_dot_eye, where=shiny)
+            np.copyto(reflect_dot_eye, 0, where=np.logical_not(shiny, out=shiny))
+            specular += np.matmul(reflect_dot_eye, intensities[chunk], out=term)
+
+        color = np.reshape(material.color, (-1, 3))
+        if out is None:
+            out = workspace.take("lights.colors", (count, 3), dtype)
+        np.multiply(color, intensities.sum(axis=0), out=out)
+        out *= np.reshape(material.ambient, (-1, 1))
+        diffuse *= np.multiply(color, np.reshape(material.diffuse, (-1, 1)), out=term)
+        out += diffuse
+        specular *= np.reshape(material.specular, (-1, 1))
+        out += specular
+        return out
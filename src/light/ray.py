@@ -2,6 +2,8 @@ from numbers import Number
 
 import numpy as np
 
+from src.profiler import PROFILER
+
 
 class Ray:
     def __init__(self, origin, direction):
@@ -11,7 +13,11 @@ class Ray:
         return f"Ray(origin={repr(self.origin)}, direction={repr(self.direction)})"
 
     def __getitem__(self, item):
-        return Ray(self.origin, self.direction[item])
+        return Ray(self._origin_of(item), self.direction[item])
+
+    def _origin_of(self, item):
+        # rays either share one origin or have one each
+        return self.origin if len(self.origin) == 1 else self.origin[item]
 
     def after(self, t, mask=None):
         if isinstance(t, Number):
@@ -20,17 +26,18 @@ class Ray:
             t = t[:, np.newaxis]
 
         if mask is not None:
-            direction = self.direction[mask]
+            origin, direction = self._origin_of(mask), self.direction[mask]
         else:
-            direction = self.direction
+            origin, direction = self.origin, self.direction
 
-        return self.origin + direction * t
+        return origin + direction * t
 
     def transform(self, transformation):
-        return Ray(
-            (transformation @ self.origin).view(self.origin.__class__),
-            (transformation @ self.direction).view(self.direction.__class__),
-        )
+        with PROFILER.stage("ray.transform", len(self.direction)):
+            return Ray(
+                (transformation @ self.origin).view(self.origin.__class__),
+                (transformation @ self.direction).view(self.direction.__class__),
+            )
 
     def project(self, intersection, pixel_size, canvas_size, magnitude, anchor=None):
         if anchor is None:
@@ -1 +1,2 @@
 from .material import Material
+from .materials import Materials
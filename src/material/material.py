@@ -3,18 +3,31 @@ from src.grid import Color
 
 class Material:
     def __init__(
-        self, color=None, ambient=0.1, diffuse=0.9, specular=0.9, shininess=200.0
+        self,
+        color=None,
+        ambient=0.1,
+        diffuse=0.9,
+        specular=0.9,
+        shininess=200.0,
+        reflective=0.0,
+        transparency=0.0,
+        refractive_index=1.0,
     ):
         self.color = Color(1, 1, 1) if color is None else color
         self.ambient = ambient
         self.diffuse = diffuse
         self.specular = specular
         self.shininess = shininess
+        self.reflective = reflective
+        self.transparency = transparency
+        self.refractive_index = refractive_index
 
     def __repr__(self):
         return (
             f"Material({repr(self.color)}, {repr(self.ambient)}, "
-            f"{repr(self.diffuse)}, {repr(self.specular)}, {repr(self.shininess)})"
+            f"{repr(self.diffuse)}, {repr(self.specular)}, {repr(self.shininess)}, "
+            f"{repr(self.reflective)}, {repr(self.transparency)}, "
+            f"{repr(self.refractive_index)})"
         )
 
     def __eq__(self, other):
@@ -24,4 +37,7 @@ class Material:
             and self.diffuse == other.diffuse
             and self.specular == other.specular
             and self.shininess == other.shininess
+            and self.reflective == other.reflective
+            and self.transparency == other.transparency
+            and self.refractive_index == other.refractive_index
         )
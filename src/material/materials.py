@@ -0,0 +1,96 @@
+import numpy as np
+
+from src.grid import Color
+from src.kernels import FRESH
+from src.precision import PRECISION
+
+from .material import Material
+
+
+class Materials:
+    """
+    Materials is a table of materials with one array per attribute of Material:
+    (K, 3) colors and (K,) scalars, row k being the material of shape k.
+    take gathers the rows of per-hit object ids, and Light.get_color and LightSet
+    accept the gathered table in place of one Material, so the hits of any number
+    of materials are shaded in one call.
+    """
+
+    # the attributes of Material, all of them columns here
+    fields = (
+        "color",
+        "ambient",
+        "diffuse",
+        "specular",
+        "shininess",
+        "reflective",
+        "transparency",
+        "refractive_index",
+    )
+
+    def __init__(
+        self,
+        color,
+        ambient,
+        diffuse,
+        specular,
+        shininess,
+        reflective,
+        transparency,
+        refractive_index,
+    ):
+        # the arrays are kept as given, so a SphereArray hands out views of its own
+        self.color = color
+        self.ambient = ambient
+        self.diffuse = diffuse
+        self.specular = specular
+        self.shininess = shininess
+        self.reflective = reflective
+        self.transparency = transparency
+        self.refractive_index = refractive_index
+
+    def __repr__(self):
+        return f"Materials(materials={len(self)})"
+
+    def __len__(self):
+        return len(self.color)
+
+    def __getitem__(self, index):
+        return Material(
+            Color(*self.color[index]),
+            *(getattr(self, name)[index].item() for name in self.fields[1:]),
+        )
+
+    def __setitem__(self, index, material):
+        self.color[index] = np.asarray(material.color).ravel()
+        for name in self.fields[1:]:
+            getattr(self, name)[index] = getattr(material, name)
+
+    @staticmethod
+    def of(materials):
+        materials = list(materials)
+
+        def _column(name):
+            values = [getattr(material, name) for material in materials]
+            return np.array(values, PRECISION.dtype)
+
+        return Materials(
+            _column("color").reshape(-1, 3),
+            *(_column(name) for name in Materials.fields[1:]),
+        )
+
+    def copy(self):
+        return Materials(*(getattr(self, name).copy() for name in self.fields))
+
+    def take(self, index, workspace=None):
+        # the materials of the objects in index, one row per hit. index is valid by
+        # construction, and mode="clip" spares np.take buffering the gather
+        workspace = FRESH if workspace is None else workspace
+        columns = []
+        for name in self.fields:
+            column = getattr(self, name)
+            out = workspace.take(
+                f"materials.{name}", (len(index), *column.shape[1:]), PRECISION.dtype
+            )
+            columns.append(np.take(column, index, axis=0, out=out, mode="clip"))
+        return Materials(*columns)
@@ -1 +1 @@
-from .matrix import Matrix, Rotation, Scaling, Shearing, Translation
+from .matrix import Matrix, Rotation, Scaling, Shearing, Translation, ViewTransform
@@ -1,11 +1,13 @@
 import numpy as np
 
+from src.precision import PRECISION
+
 
 class Matrix(np.ndarray):
     def __new__(cls, ndarray=None):
         if ndarray is None:
             ndarray = np.eye(4)
-        obj = np.asanyarray(ndarray).view(cls)
+        obj = np.asarray(ndarray, dtype=PRECISION.dtype).view(cls)
         return obj
 
     def __repr__(self):
@@ -77,3 +79,17 @@ class Shearing(Matrix):
         matrix[:3, :3] = [[1, xy, xz], [yx, 1, yz], [zx, zy, 1]]
         obj = super().__new__(cls, matrix)
         return obj
+
+
+class ViewTransform(Matrix):
+    def __new__(cls, eye, to, up):
+        forward = np.asarray((to - eye).normalize())[0, :3]
+        left = np.cross(forward, np.asarray(up.normalize())[0, :3])
+        true_up = np.cross(left, forward)
+
+        matrix = np.eye(4)
+        matrix[:3, :3] = [left, true_up, -forward]
+        matrix = matrix @ Translation(-eye.x.item(), -eye.y.item(), -eye.z.item())
+
+        obj = super().__new__(cls, matrix)
+        return obj
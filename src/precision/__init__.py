@@ -0,0 +1 @@
+from .precision import EPSILONS, PRECISION, Precision
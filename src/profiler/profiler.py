@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+
+class Stage:
+    def __init__(self, profiler, name, rays, args):
+        self.profiler = profiler
+        self.name = name
+        self.rays = rays
+        self.args = args
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        if self.profiler.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.base = self.peak = current
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        stack = self.profiler._stack()
+        stack.pop()
+
+        nbytes = 0
+        if self.profiler.trace_memory:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            nbytes = self.peak - self.base
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+
+        self.profiler._record(self, duration, nbytes)
+        return False
+
+
+class Profiler:
+    """
+    Profiler records wall time, calls, rays and temporary bytes of render stages.
+    Stages nest, e.g. frame > tile > world.intersect, and the whole run can be
+    exported as a Chrome trace. When disabled, stage returns one shared no-op
+    context manager, so instrumented code pays only for the call itself.
+    Temporary bytes come from tracemalloc peaks and are only tracked with
+    trace_memory, which is meant for single threaded runs.
+    """
+
+    _disabled = nullcontext()
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self._tracing = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.clear()
+
+    def __repr__(self):
+        return f"Profiler(enabled={self.enabled}, events={len(self.events)})"
+
+    def enable(self, trace_memory=False):
+        self.enabled = True
+        self.trace_memory = trace_memory
+        # only stop tracemalloc later if it is this profiler that started it
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        return self
+
+    def disable(self):
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+        self.enabled = False
+        self.trace_memory = False
+        return self
+
+    def clear(self):
+        self.events = []
+        self.origin = time.perf_counter()
+
+    def drain(self):
+        # hand out the events recorded so far and forget them, e.g. in a worker
+        with self._lock:
+            events, self.events = self.events, []
+        return events
+
+    def merge(self, events):
+        # add events recorded by another profiler, e.g. a worker process
+        with self._lock:
+            self.events.extend(events)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.disable()
+        return False
+
+    def stage(self, name, rays=0, **args):
+        if not self.enabled:
+            return self._disabled
+        return Stage(self, name, rays, args)
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _record(self, stage, duration, nbytes):
+        event = {
+            "name": stage.name,
+            "start": stage.start - self.origin,
+            "duration": duration,
+            "rays": stage.rays,
+            "bytes": nbytes,
+            "process": os.getpid(),
+            "thread": threading.get_ident(),
+            "depth": len(self._stack()),
+            "args": stage.args,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def summary(self):
+        # totals per stage name
+        stages = {}
+        for event in self.events:
+            total = stages.setdefault(
+                event["name"],
+                {"calls": 0, "time": 0.0, "rays": 0, "bytes": 0, "peak_bytes": 0},
+            )
+            total["calls"] += 1
+            total["time"] += event["duration"]
+            total["rays"] += event["rays"]
+            total["bytes"] += event["bytes"]
+            total["peak_bytes"] = max(total["peak_bytes"], event["bytes"])
+        return stages
+
+    def to_chrome_trace(self, path=None):
+        # complete ("X") events in microseconds, for chrome://tracing or Perfetto
+        trace = {
+            "traceEvents": [
+                {
+                    "name": event["name"],
+                    "ph": "X",
+                    "ts": event["start"] * 1e6,
+                    "dur": event["duration"] * 1e6,
+                    "pid": event["process"],
+                    "tid": event["thread"],
+                    "args": {
+                        "rays": event["rays"],
+                        "bytes": event["bytes"],
+                        **{k: repr(v) for k, v in event["args"].items()},
+                    },
+                }
+                for event in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(trace, f)
+        return trace
+
+
+# the profiler every instrumented stage reports to, disabled by default
+PROFILER = Profiler()
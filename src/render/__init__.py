@@ -0,0 +1,7 @@
+from .adaptive import AdaptiveRenderer
+from .animation import Animation, Keyframes
+from .incremental import IncrementalRenderer
+from .parallel import ProcessRenderer
+from .progressive import ProgressiveRenderer
+from .threaded import ThreadRenderer
+from .wavefront import WavefrontRenderer
@@ -0,0 +1,113 @@
+import time
+
+import numpy as np
+
+from src.canvas import Canvas
+from src.precision import PRECISION
+from src.profiler import PROFILER
+
+
+class AdaptiveRenderer:
+    """
+    AdaptiveRenderer anti-aliases only the pixels that need it.
+    A first pass shoots one ray through the center of every pixel and keeps its
+    color, object id and depth. Pixels differing from a neighbour by more than
+    threshold in color, by object id, or by more than depth_threshold in relative
+    depth are then re-rendered with samples stratified, jittered sub-samples,
+    all of them in batches of tile_size * tile_size rays.
+    A negative threshold refines every pixel, which is full supersampling.
+    """
+
+    def __init__(
+        self, samples=16, threshold=0.1, depth_threshold=0.05, tile_size=64, seed=0
+    ):
+        self.strata = int(round(np.sqrt(samples)))
+        if self.strata ** 2 != samples:
+            raise ValueError(f"samples must be a square number, got {samples}")
+        self.samples = samples
+        self.threshold = threshold
+        self.depth_threshold = depth_threshold
+        self.tile_size = tile_size
+        self.seed = seed
+        self.stats = {}
+
+    def __repr__(self):
+        return (
+            f"AdaptiveRenderer(samples={self.samples}, threshold={self.threshold}, "
+            f"depth_threshold={self.depth_threshold}, tile_size={self.tile_size}, "
+            f"seed={self.seed})"
+        )
+
+    def render(self, camera, world):
+        start = time.perf_counter()
+
+        # image-ordered buffers, the top row first
+        shape = (camera.vsize, camera.hsize)
+        colors = np.zeros((*shape, 3), dtype=PRECISION.dtype)
+        ids = np.full(shape, -1)
+        depths = np.full(shape, np.inf, dtype=PRECISION.dtype)
+
+        with PROFILER.stage("frame", camera.hsize * camera.vsize):
+            for tile in camera.tiles(self.tile_size):
+                xs, ys = camera.pixels(tile)
+                ray = camera.ray_for_pixels(xs, ys)
+                colors[ys, xs], ids[ys, xs], depths[ys, xs] = world.buffers_at(ray)
+
+            ys, xs = np.nonzero(self.edges(colors, ids, depths))
+            with PROFILER.stage("adaptive.refine", len(xs) * self.samples):
+                colors[ys, xs] = self.supersample(camera, world, xs, ys)
+
+        canvas = Canvas(camera.hsize, camera.vsize)
+        canvas[...] = colors[::-1]
+
+        elapsed = time.perf_counter() - start
+        pixels = camera.hsize * camera.vsize
+        self.stats = {
+            "pixels": pixels,
+            "refined": len(xs),
+            "refined_fraction": len(xs) / pixels,
+            "rays": pixels + len(xs) * self.samples,
+            "time": elapsed,
+        }
+        return canvas
+
+    def edges(self, colors, ids, depths):
+        # pixels that differ from their right or lower neighbour, and that neighbour
+        refine = np.zeros(ids.shape, dtype=bool)
+        for axis in (0, 1):
+            first = [slice(None)] * 2
+            second = [slice(None)] * 2
+            first[axis], second[axis] = slice(None, -1), slice(1, None)
+            first, second = tuple(first), tuple(second)
+
+            color = np.abs(colors[first] - colors[second]).max(axis=-1)
+            with np.errstate(invalid="ignore"):
+                near = np.minimum(depths[first], depths[second])
+                depth = np.abs(depths[first] - depths[second]) > (
+                    self.depth_threshold * near
+                )
+            differ = (color > self.threshold) | (ids[first] != ids[second]) | depth
+
+            refine[first] |= differ
+            refine[second] |= differ
+        return refine
+
+    def supersample(self, camera, world, xs, ys):
+        # mean color of samples stratified, jittered rays through each pixel
+        rng = np.random.RandomState(self.seed)
+        cells = np.arange(self.samples)
+        batch = max(1, self.tile_size ** 2 // self.samples)
+
+        colors = np.zeros((len(xs), 3), dtype=PRECISION.dtype)
+        for start in range(0, len(xs), batch):
+            stop = min(start + batch, len(xs))
+            pixel_xs = np.repeat(xs[start:stop], self.samples)
+            pixel_ys = np.repeat(ys[start:stop], self.samples)
+            jitter = rng.uniform(0, 1, (2, len(pixel_xs)))
+            dx = (np.tile(cells % self.strata, stop - start) + jitter[0]) / self.strata
+            dy = (np.tile(cells // self.strata, stop - start) + jitter[1]) / self.strata
+
+            ray = camera.ray_for_pixels(pixel_xs, pixel_ys, dx, dy)
+            samples = np.asarray(world.color_at(ray))
+            colors[start:stop] = samples.reshape(-1, self.samples, 3).mean(axis=1)
+        return colors
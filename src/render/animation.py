@@ -0,0 +1,133 @@
+import os
+import time
+from functools import reduce
+
+import numpy as np
+
+from src.canvas import Canvas
+from src.kernels import Workspace
+from src.profiler import PROFILER
+
+
+class Keyframes:
+    """
+    Keyframes interpolates the arguments of a transform such as Translation linearly
+    between key frames and holds the first and last keys outside of them.
+    keys maps a frame number to the arguments, e.g. {0: (0, 0, 0), 24: (0, 2, 0)}.
+    """
+
+    def __init__(self, transform, keys):
+        self.transform = transform
+        self.times = np.array(sorted(keys), dtype=float)
+        self.values = np.array([keys[key] for key in sorted(keys)], dtype=float)
+
+    def __repr__(self):
+        keys = dict(zip(self.times.tolist(), map(tuple, self.values.tolist())))
+        return f"Keyframes({self.transform.__name__}, {repr(keys)})"
+
+    def __call__(self, frame):
+        return self.transform(
+            *(np.interp(frame, self.times, column) for column in self.values.T)
+        )
+
+
+class Animation:
+    """
+    Animation renders a sequence of frames of one scene and streams them out.
+    tracks maps the index of a moving shape to a callable, e.g. Keyframes, or a list
+    of them, multiplied in order, that gives its transform at a frame. camera_track
+    does the same for the view transform.
+    Work that does not change between frames is done once: the rays of a static
+    camera, the inverses of static shapes and the canvas, which every frame
+    overwrites. Frames are written as soon as they are done, so memory does not
+    grow with their count.
+    """
+
+    def __init__(
+        self, camera, world, frames, tracks=None, camera_track=None, tile_size=64
+    ):
+        self.camera = camera
+        self.world = world
+        self.frames = frames
+        self.tracks = {} if tracks is None else tracks
+        self.camera_track = camera_track
+        self.tile_size = tile_size
+        self.stats = {}
+
+    def __repr__(self):
+        return (
+            f"Animation({repr(self.camera)}, {repr(self.world)}, {self.frames}, "
+            f"tracks={repr(self.tracks)}, camera_track={repr(self.camera_track)}, "
+            f"tile_size={self.tile_size})"
+        )
+
+    @staticmethod
+    def transform_at(track, frame):
+        if isinstance(track, (list, tuple)):
+            return reduce(lambda a, b: a @ b, (t(frame) for t in track))
+        return track(frame)
+
+    def camera_at(self, frame):
+        if self.camera_track is None:
+            return self.camera
+        return self.camera.set_transform(self.transform_at(self.camera_track, frame))
+
+    def world_at(self, frame):
+        changes = {
+            index: self.world.shapes[index].set_transform(
+                self.transform_at(track, frame)
+            )
+            for index, track in self.tracks.items()
+        }
+        return self.world.replace(changes)
+
+    def render(self):
+        # yields (frame, canvas); the canvas is reused, so copy it to keep it
+        start = time.perf_counter()
+        canvas = Canvas(self.camera.hsize, self.camera.vsize)
+        workspace = Workspace()
+
+        # stack the static inverses and materials once, frames only replace the
+        # moving ones and build their own acceleration structure
+        self.world.prepare(structure=False)
+
+        rays = None
+        if self.camera_track is None:
+            rays = [
+                self.camera.ray_for_tile(t) for t in self.camera.tiles(self.tile_size)
+            ]
+
+        for frame in range(self.frames):
+            camera, world = self.camera_at(frame), self.world_at(frame)
+            with PROFILER.stage("frame", camera.hsize * camera.vsize, frame=frame):
+                if rays is None:
+                    for tile in camera.tiles(self.tile_size):
+                        camera.render_tile(world, canvas, tile, workspace)
+                else:
+                    for ray, pixels in rays:
+                        canvas[pixels] = world.color_at(ray, workspace)
+
+            elapsed = time.perf_counter() - start
+            self.stats = {
+                "frames": frame + 1,
+                "time": elapsed,
+                "frames_per_second": (frame + 1) / elapsed if elapsed else np.inf,
+                "static_camera": rays is not None,
+            }
+            yield frame, canvas
+
+    def write(self, target, binary=True):
+        """
+        Stream every frame as PPM to target, either a pattern of numbered file names
+        such as "frames/{:04d}.ppm" or a binary file object such as a pipe.
+        Returns the paths written, or an empty list for a file object.
+        """
+        paths = []
+        for frame, canvas in self.render():
+            if isinstance(target, (str, os.PathLike)):
+                path = os.fspath(target).format(frame)
+                canvas.write_ppm(path, binary)
+                paths.append(path)
+            else:
+                canvas.write_ppm(target, binary)
+        return paths
@@ -0,0 +1,165 @@
+import time
+
+import numpy as np
+
+from src.canvas import Canvas
+from src.precision import PRECISION
+from src.profiler import PROFILER
+from src.world import World
+
+
+class IncrementalRenderer:
+    """
+    IncrementalRenderer keeps per-pixel object id, depth and shadow buffers of the
+    last frame, so that editing one shape only redoes the pixels it can change.
+    A new transform retraces the pixels inside the screen rectangles of the old and
+    new bounds, and re-shades the pixels whose shadow rays meet either of them.
+    A new material only re-shades the cached hit points of the shape.
+    """
+
+    def __init__(self, tile_size=64):
+        self.tile_size = tile_size
+        self.camera = None
+        self.world = None
+        self.stats = {}
+
+    def __repr__(self):
+        return f"IncrementalRenderer(tile_size={self.tile_size})"
+
+    def render(self, camera, world):
+        start = time.perf_counter()
+        self.camera, self.world = camera, world
+
+        # image-ordered buffers, the top row first
+        shape = (camera.vsize, camera.hsize)
+        self.colors = np.zeros((*shape, 3), dtype=PRECISION.dtype)
+        self.ids = np.full(shape, -1)
+        self.depths = np.full(shape, np.inf, dtype=PRECISION.dtype)
+        self.in_shadow = None
+
+        with PROFILER.stage("frame", camera.hsize * camera.vsize):
+            for tile in camera.tiles(self.tile_size):
+                self._trace(*camera.pixels(tile))
+
+        self.stats = {
+            "kind": "full",
+            "retraced": camera.hsize * camera.vsize,
+            "reshaded": 0,
+            "time": time.perf_counter() - start,
+        }
+        return self.canvas()
+
+    def update(self, index, shape):
+        # swap the shape at index for shape and bring the frame up to date
+        start = time.perf_counter()
+        old = self.world.shapes[index]
+        self.world = self.world.replace({index: shape})
+
+        with PROFILER.stage("incremental.update", index=index):
+            if np.array_equal(old.transform, shape.transform):
+                kind, retraced = "material", 0
+                ys, xs = np.nonzero(self.ids == index)
+                self._batched(self._shade, xs, ys, False)
+            else:
+                kind = "transform"
+                region = self.region(old.bounds) | self.region(shape.bounds)
+                ys, xs = np.nonzero(region)
+                retraced = len(xs)
+                self._batched(self._trace, xs, ys)
+
+                ys, xs = np.nonzero(~region & (self.ids >= 0))
+                edited = World([old, shape], self.world.light)
+                xs, ys = self._batched(self._shadowed_by, xs, ys, edited)
+                self._batched(self._shade, xs, ys, True)
+
+        self.stats = {
+            "kind": kind,
+            "retraced": retraced,
+            "reshaded": len(xs),
+            "time": time.perf_counter() - start,
+        }
+        return self.canvas()
+
+    def canvas(self):
+        canvas = Canvas(self.camera.hsize, self.camera.vsize)
+        canvas[...] = self.colors[::-1]
+        return canvas
+
+    def region(self, bounds):
+        # pixels covered by the screen rectangle of world-space bounds, plus a margin
+        camera = self.camera
+        lower, upper = bounds
+        corners = np.array(
+            [
+                [x, y, z, 1]
+                for x in (lower[0], upper[0])
+                for y in (lower[1], upper[1])
+                for z in (lower[2], upper[2])
+            ]
+        )
+        view = corners @ np.asarray(camera.transform).T
+        region = np.zeros((camera.vsize, camera.hsize), dtype=bool)
+
+        # a box reaching behind the camera can cover any pixel
+        depth = -view[:, 2]
+        if (depth <= 0).any():
+            region[...] = True
+            return region
+
+        xs = (camera.half_width - view[:, 0] / depth) / camera.pixel_size
+        ys = (camera.half_height - view[:, 1] / depth) / camera.pixel_size
+        left, right = int(np.floor(xs.min())) - 1, int(np.floor(xs.max())) + 2
+        top, bottom = int(np.floor(ys.min())) - 1, int(np.floor(ys.max())) + 2
+        region[max(top, 0) : max(bottom, 0), max(left, 0) : max(right, 0)] = True
+        return region
+
+    def _batched(self, function, xs, ys, *args):
+        # run function on tile_size^2 pixels at a time, joining what it returns
+        batch = self.tile_size ** 2
+        results = [
+            function(xs[start : start + batch], ys[start : start + batch], *args)
+            for start in range(0, len(xs), batch)
+        ]
+        if results and results[0] is not None:
+            return tuple(np.concatenate(parts) for parts in zip(*results))
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+
+    def _trace(self, xs, ys):
+        hit = self.world.intersect(self.camera.ray_for_pixels(xs, ys))
+        self.colors[ys, xs] = 0
+        self.ids[ys, xs] = -1
+        self.depths[ys, xs] = np.inf
+
+        xs, ys = xs[hit.mask], ys[hit.mask]
+        self.ids[ys, xs] = hit.index
+        self.depths[ys, xs] = hit.hit
+        self._shade(xs, ys, True)
+
+    def _surface(self, xs, ys):
+        # hit points, eyes and normals rebuilt from the id and depth buffers
+        ray = self.camera.ray_for_pixels(xs, ys)
+        points = ray.after(self.depths[ys, xs])
+        normals = self.world.normal_at(points, self.ids[ys, xs])
+        return points, -ray.direction, normals
+
+    def _shade(self, xs, ys, shadows):
+        if not len(xs):
+            return
+        points, eyes, normals = self._surface(xs, ys)
+        if shadows:
+            in_shadow = self.world.shadows(points, normals)
+            if self.in_shadow is None:
+                shape = (self.camera.vsize, self.camera.hsize, *in_shadow.shape[1:])
+                self.in_shadow = np.zeros(shape, dtype=bool)
+            self.in_shadow[ys, xs] = in_shadow
+
+        ids = self.ids[ys, xs]
+        self.colors[ys, xs] = self.world.shade_hit(
+            points, eyes, normals, ids, self.in_shadow[ys, xs]
+        )
+
+    def _shadowed_by(self, xs, ys, edited):
+        # pixels whose shadow rays meet the old or the new shape
+        points, _, normals = self._surface(xs, ys)
+        blocked = edited.shadows(points, normals).reshape(len(xs), -1).any(axis=1)
+        return xs[blocked], ys[blocked]
@@ -0,0 +1,95 @@
+import os
+import time
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from src.canvas import Canvas
+from src.kernels import Workspace
+from src.precision import PRECISION
+from src.profiler import PROFILER
+
+# per-process state of a worker, filled once by _init_worker
+_worker = {}
+
+
+def _init_worker(camera, world, name, dtype, origin):
+    PRECISION.set(dtype)
+    # a forked worker inherits the events of the parent, which already has them
+    PROFILER.disable()
+    PROFILER.clear()
+    if origin is not None:
+        # perf_counter is one clock for all processes, so the events line up
+        PROFILER.origin = origin
+        PROFILER.enable()
+    shm = shared_memory.SharedMemory(name=name)
+    _worker["shm"] = shm
+    _worker["camera"] = camera
+    _worker["world"] = world
+    _worker["canvas"] = Canvas(camera.hsize, camera.vsize, buffer=shm.buf, dtype=dtype)
+    _worker["workspace"] = Workspace()
+
+
+def _render_tile(tile):
+    # the pixels of the tile and the profiler events of rendering it
+    _worker["camera"].render_tile(
+        _worker["world"], _worker["canvas"], tile, _worker["workspace"]
+    )
+    return (tile[1] - tile[0]) * (tile[3] - tile[2]), PROFILER.drain()
+
+
+class ProcessRenderer:
+    """
+    ProcessRenderer splits the canvas into tiles and renders them on a process pool.
+    The scene is sent once to each worker, and workers write their tiles straight
+    into a canvas backed by shared memory, so no pixels are pickled back.
+    With PROFILER enabled, each tile's stage events come back with the tile and
+    are merged into the PROFILER of this process.
+    """
+
+    def __init__(self, workers=None, tile_size=64):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.tile_size = tile_size
+        self.stats = {}
+
+    def __repr__(self):
+        return f"ProcessRenderer(workers={self.workers}, tile_size={self.tile_size})"
+
+    def render(self, camera, world):
+        start = time.perf_counter()
+        tiles = list(camera.tiles(self.tile_size))
+
+        # workers render in the precision of this process
+        dtype = PRECISION.dtype
+        nbytes = camera.hsize * camera.vsize * 3 * dtype.itemsize
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        try:
+            shared = Canvas(camera.hsize, camera.vsize, buffer=shm.buf)
+            shared[...] = 0
+
+            origin = PROFILER.origin if PROFILER.enabled else None
+            initargs = (camera, world, shm.name, dtype, origin)
+            pixels = 0
+            with PROFILER.stage("frame", camera.hsize * camera.vsize):
+                with Pool(self.workers, _init_worker, initargs) as pool:
+                    for count, events in pool.imap_unordered(_render_tile, tiles):
+                        pixels += count
+                        PROFILER.merge(events)
+
+            canvas = Canvas(camera.hsize, camera.vsize)
+            canvas[...] = shared
+        finally:
+            # the view must be gone before the block can be closed
+            shared = None
+            shm.close()
+            shm.unlink()
+
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            "workers": self.workers,
+            "tiles": len(tiles),
+            "pixels": pixels,
+            "time": elapsed,
+            "pixels_per_second": pixels / elapsed if elapsed else np.inf,
+        }
+        return canvas
@@ -0,0 +1,122 @@
+import time
+
+import numpy as np
+
+from src.canvas import Canvas
+from src.precision import PRECISION
+from src.profiler import PROFILER
+
+
+class ProgressiveRenderer:
+    """
+    ProgressiveRenderer yields a frame after every pass, each one better than the last.
+    The first pass renders every start-th pixel of every start-th row and blows it
+    up; each following pass halves the step and only renders the pixels it adds.
+    Once every pixel has its center sample, passes add samples jittered rays per
+    pixel to running sums. When time_budget seconds are spent, the pass in flight
+    stops and the best frame so far is the last one yielded.
+    """
+
+    def __init__(
+        self, start=8, samples=4, passes=3, time_budget=None, tile_size=64, seed=0
+    ):
+        self.start = start
+        self.samples = samples
+        self.passes = passes
+        self.time_budget = time_budget
+        self.tile_size = tile_size
+        self.seed = seed
+        self.stats = {}
+
+    def __repr__(self):
+        return (
+            f"ProgressiveRenderer(start={self.start}, samples={self.samples}, "
+            f"passes={self.passes}, time_budget={self.time_budget}, "
+            f"tile_size={self.tile_size}, seed={self.seed})"
+        )
+
+    def render(self, camera, world):
+        frame = None
+        for frame in self.frames(camera, world):
+            pass
+        return frame
+
+    def frames(self, camera, world):
+        start = time.perf_counter()
+        deadline = np.inf if self.time_budget is None else start + self.time_budget
+        rng = np.random.RandomState(self.seed)
+        self.stats = {"passes": [], "rays": 0, "time": 0.0}
+
+        # image-ordered running sums of every pixel, the top row first
+        sums = np.zeros((camera.vsize, camera.hsize, 3), dtype=PRECISION.dtype)
+        counts = np.zeros((camera.vsize, camera.hsize))
+
+        step, previous = max(self.start, 1), None
+        while step >= 1:
+            xs, ys = self._added(camera, step, previous)
+            # the first, coarse frame is always made, whatever the budget
+            rays = self.stats["rays"]
+            until = np.inf if previous is None else deadline
+            if not self._shade(camera, world, xs, ys, 0.5, 0.5, sums, counts, until):
+                return
+            self._record("resolution", step, self.stats["rays"] - rays, start)
+
+            # every pixel shows the rendered pixel at the corner of its block
+            block = np.ix_(
+                np.arange(camera.vsize) // step * step,
+                np.arange(camera.hsize) // step * step,
+            )
+            yield self._canvas(camera, sums[block], counts[block])
+            step, previous = step // 2, step
+
+        ys, xs = np.mgrid[: camera.vsize, : camera.hsize]
+        xs = np.repeat(xs.ravel(), self.samples)
+        ys = np.repeat(ys.ravel(), self.samples)
+        for _ in range(self.passes):
+            dx, dy = rng.uniform(0, 1, (2, len(xs)))
+            rays = self.stats["rays"]
+            done = self._shade(camera, world, xs, ys, dx, dy, sums, counts, deadline)
+            self._record("samples", self.samples, self.stats["rays"] - rays, start)
+            yield self._canvas(camera, sums, counts)
+            if not done:
+                return
+
+    @staticmethod
+    def _added(camera, step, previous):
+        # pixels on the grid of this step that the previous step did not render
+        ys, xs = np.mgrid[0 : camera.vsize : step, 0 : camera.hsize : step]
+        xs, ys = xs.ravel(), ys.ravel()
+        if previous is not None:
+            new = (xs % previous != 0) | (ys % previous != 0)
+            xs, ys = xs[new], ys[new]
+        return xs, ys
+
+    def _shade(self, camera, world, xs, ys, dx, dy, sums, counts, deadline):
+        # add the colors of the rays through (xs + dx, ys + dy), a batch at a time;
+        # False when the deadline stopped it early
+        batch = self.tile_size ** 2
+        dx, dy = np.broadcast_to(dx, xs.shape), np.broadcast_to(dy, ys.shape)
+        with PROFILER.stage("progressive.pass", len(xs)):
+            for begin in range(0, len(xs), batch):
+                if time.perf_counter() >= deadline:
+                    return False
+                chunk = slice(begin, begin + batch)
+                ray = camera.ray_for_pixels(xs[chunk], ys[chunk], dx[chunk], dy[chunk])
+                colors = np.asarray(world.color_at(ray))
+                np.add.at(sums, (ys[chunk], xs[chunk]), colors)
+                np.add.at(counts, (ys[chunk], xs[chunk]), 1)
+                self.stats["rays"] += len(colors)
+        return True
+
+    def _record(self, kind, amount, rays, start):
+        self.stats["time"] = time.perf_counter() - start
+        self.stats["passes"].append(
+            {"kind": kind, "amount": amount, "rays": rays, "time": self.stats["time"]}
+        )
+
+    @staticmethod
+    def _canvas(camera, sums, counts):
+        canvas = Canvas(camera.hsize, camera.vsize)
+        with np.errstate(invalid="ignore"):
+            canvas[...] = np.nan_to_num(sums / counts[..., np.newaxis])[::-1]
+        return canvas
@@ -0,0 +1,73 @@
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.canvas import Canvas
+from src.kernels import Workspace
+from src.profiler import PROFILER
+
+
+class ThreadRenderer:
+    """
+    ThreadRenderer renders tiles on a thread pool sharing the scene in memory.
+    The heavy NumPy calls release the GIL, so threads overlap without pickling
+    anything. Tiles are pulled from one shared queue, so a thread stuck on an
+    expensive tile never leaves the others waiting for work.
+    """
+
+    def __init__(self, workers=None, tile_size=64):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.tile_size = tile_size
+        self.stats = {}
+
+    def __repr__(self):
+        return f"ThreadRenderer(workers={self.workers}, tile_size={self.tile_size})"
+
+    def render(self, camera, world):
+        start = time.perf_counter()
+        canvas = Canvas(camera.hsize, camera.vsize)
+
+        tiles = queue.SimpleQueue()
+        for tile in camera.tiles(self.tile_size):
+            tiles.put(tile)
+
+        # build what the threads share up front instead of racing for it
+        world.prepare()
+
+        def work(_):
+            # every thread reuses its own scratch arrays from tile to tile
+            workspace = Workspace()
+            busy, count, pixels = 0.0, 0, 0
+            while True:
+                try:
+                    tile = tiles.get_nowait()
+                except queue.Empty:
+                    return {"busy": busy, "tiles": count, "pixels": pixels}
+
+                tile_start = time.perf_counter()
+                camera.render_tile(world, canvas, tile, workspace)
+                busy += time.perf_counter() - tile_start
+                count += 1
+                pixels += (tile[1] - tile[0]) * (tile[3] - tile[2])
+
+        with PROFILER.stage("frame", camera.hsize * camera.vsize):
+            with ThreadPoolExecutor(self.workers) as executor:
+                threads = list(executor.map(work, range(self.workers)))
+
+        elapsed = time.perf_counter() - start
+        for thread in threads:
+            thread["idle"] = elapsed - thread["busy"]
+
+        pixels = sum(thread["pixels"] for thread in threads)
+        self.stats = {
+            "workers": self.workers,
+            "tiles": sum(thread["tiles"] for thread in threads),
+            "pixels": pixels,
+            "time": elapsed,
+            "pixels_per_second": pixels / elapsed if elapsed else np.inf,
+            "threads": threads,
+        }
+        return canvas
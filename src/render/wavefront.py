@@ -0,0 +1,186 @@
+import time
+
+import numpy as np
+
+from src.canvas import Canvas
+from src.grid import ColorGrid, PointGrid, VectorGrid
+from src.light import Ray
+from src.precision import PRECISION
+from src.profiler import PROFILER
+
+
+class WavefrontRenderer:
+    """
+    WavefrontRenderer traces reflection and refraction one bounce depth at a time.
+    Every depth intersects and shades only the rays still alive as one compacted
+    batch, and spawns the reflected and refracted rays of the next one, so the cost
+    follows the number of live rays rather than pixels times depth.
+    A ray carries the weight it adds to its pixel and is dropped once the weight
+    falls under min_weight or it has bounced max_depth times.
+    """
+
+    def __init__(self, max_depth=5, min_weight=1e-3, tile_size=64):
+        self.max_depth = max_depth
+        self.min_weight = min_weight
+        self.tile_size = tile_size
+        self.stats = {}
+
+    def __repr__(self):
+        return (
+            f"WavefrontRenderer(max_depth={self.max_depth}, "
+            f"min_weight={self.min_weight}, tile_size={self.tile_size})"
+        )
+
+    @staticmethod
+    def materials(world):
+        # (reflective, transparency, refractive_index) of every shape, by index
+        materials = world.materials
+        return np.stack(
+            [materials.reflective, materials.transparency, materials.refractive_index],
+            axis=-1,
+        )
+
+    def render(self, camera, world):
+        start = time.perf_counter()
+        canvas = Canvas(camera.hsize, camera.vsize)
+        table = self.materials(world)
+        live = np.zeros(self.max_depth + 1, dtype=int)
+
+        with PROFILER.stage("frame", camera.hsize * camera.vsize):
+            for tile in camera.tiles(self.tile_size):
+                top, bottom, left, right = tile
+                rays = (bottom - top) * (right - left)
+                with PROFILER.stage("tile", rays, tile=tile):
+                    ray, pixels = camera.ray_for_tile(tile)
+                    canvas[pixels] = self._trace(world, ray, table, live)
+
+        self._report(live, time.perf_counter() - start)
+        return canvas
+
+    def trace(self, world, ray):
+        start = time.perf_counter()
+        live = np.zeros(self.max_depth + 1, dtype=int)
+        colors = self._trace(world, ray, self.materials(world), live)
+        self._report(live, time.perf_counter() - start)
+        return colors
+
+    def _report(self, live, elapsed):
+        rays = int(live.sum())
+        self.stats = {
+            "live": live.tolist(),
+            "rays": rays,
+            "time": elapsed,
+            "rays_per_second": rays / elapsed if elapsed else np.inf,
+        }
+
+    def _trace(self, world, ray, table, live):
+        colors = np.zeros((len(ray.direction), 3), dtype=PRECISION.dtype)
+        origins = np.asarray(ray.origin)
+        directions = np.asarray(ray.direction)
+
+        # the state of every live ray: its pixel, weight and the medium it is in
+        pixels = np.arange(len(directions))
+        weights = np.ones(len(directions), dtype=PRECISION.dtype)
+        media = np.ones(len(directions), dtype=PRECISION.dtype)
+
+        for depth in range(self.max_depth + 1):
+            if not pixels.size:
+                break
+            live[depth] += len(pixels)
+
+            with PROFILER.stage("wavefront.depth", len(pixels), depth=depth):
+                wave = Ray(origins.view(PointGrid), directions.view(VectorGrid))
+                hit = world.intersect(wave)
+                if not hit.count:
+                    break
+
+                pixels, weights, media = (
+                    pixels[hit.mask],
+                    weights[hit.mask],
+                    media[hit.mask],
+                )
+                points = wave.after(hit.hit, hit.mask)
+                eyes = -wave.direction[hit.mask]
+                normals = world.normal_at(points, hit.index)
+
+                # a ray leaving a shape sees the normal flipped
+                inside = np.asarray(normals @ eyes).ravel() < 0
+                normals[inside] *= -1
+
+                surface = world.shade_hit(points, eyes, normals, hit.index)
+                np.add.at(colors, pixels, weights[:, np.newaxis] * surface)
+
+                if depth == self.max_depth:
+                    break
+                reflective, transparency, index = table[hit.index].T
+                origins, directions, pixels, weights, media = self._spawn(
+                    points,
+                    eyes,
+                    normals,
+                    inside,
+                    pixels,
+                    weights,
+                    media,
+                    reflective,
+                    transparency,
+                    index,
+                )
+
+        return ColorGrid(*colors.T)
+
+    def _spawn(
+        self,
+        points,
+        eyes,
+        normals,
+        inside,
+        pixels,
+        weights,
+        media,
+        reflective,
+        transparency,
+        index,
+    ):
+        # next wavefront: reflected and refracted rays heavy enough to matter
+        n1 = np.where(inside, index, media)
+        n2 = np.where(inside, 1.0, index)
+        ratio = n1 / n2
+        cos_i = np.asarray(eyes @ normals).ravel()
+        sin2_t = ratio ** 2 * (1 - cos_i ** 2)
+        total = sin2_t > 1
+        cos_t = np.sqrt(np.maximum(1 - sin2_t, 0))
+
+        # Schlick's Fresnel term splits light between both rays of a glassy mirror
+        fresnel = (reflective > 0) & (transparency > 0)
+        cos = np.where(n1 > n2, cos_t, cos_i)
+        r0 = ((n1 - n2) / (n1 + n2)) ** 2
+        reflectance = np.where(total, 1.0, r0 + (1 - r0) * (1 - cos) ** 5)
+        reflect_weight = weights * np.where(
+            fresnel, reflective * reflectance, reflective
+        )
+        refract_weight = weights * np.where(
+            fresnel, transparency * (1 - reflectance), transparency
+        )
+        refract_weight[total] = 0
+
+        reflected = (reflect_weight > 0) & (reflect_weight >= self.min_weight)
+        refracted = (refract_weight > 0) & (refract_weight >= self.min_weight)
+
+        normals, epsilon = np.asarray(normals), PRECISION.epsilon
+        over = np.asarray(points)[reflected] + normals[reflected] * epsilon
+        under = np.asarray(points)[refracted] - normals[refracted] * epsilon
+
+        eyes = np.asarray(eyes)
+        reflect_directions = 2 * cos_i[:, np.newaxis] * normals - eyes
+        refract_directions = (ratio * cos_i - cos_t)[:, np.newaxis] * normals
+        refract_directions -= ratio[:, np.newaxis] * eyes
+
+        return (
+            np.concatenate([over, under]),
+            np.concatenate(
+                [reflect_directions[reflected], refract_directions[refracted]]
+            ),
+            np.concatenate([pixels[reflected], pixels[refracted]]),
+            np.concatenate([reflect_weight[reflected], refract_weight[refracted]]),
+            np.concatenate([n1[reflected], n2[refracted]]),
+        )
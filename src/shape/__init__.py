@@ -1 +1,2 @@
 from .sphere import Sphere
+from .sphere_array import SphereArray
@@ -1,16 +1,109 @@
+import threading
+
 import numpy as np
 
 from src.grid import Point, VectorGrid
 from src.intersection import Intersection
+from src.kernels import intersect, intersect_pairs, inverse
 from src.material import Material
 from src.matrix import Matrix
+from src.precision import PRECISION
+from src.profiler import PROFILER
 
 
 class Sphere:
+    """
+    Sphere is a unit sphere at the origin placed in the world by transform.
+    Its inverse and inverse-transpose are computed once per transform and cached,
+    so replace the transform with set_transform rather than editing it in place.
+    A cached inverse in another dtype than PRECISION's is computed again.
+    """
+
+    # inverse cache counters shared by every sphere and thread, see cache_info
+    _cache_hits = 0
+    _cache_misses = 0
+    _cache_lock = threading.Lock()
+
     def __init__(self, transform=None, material=None):
         self.transform = Matrix() if transform is None else transform
         self.material = Material() if material is None else material
 
+    @property
+    def transform(self):
+        return self._transform
+
+    @transform.setter
+    def transform(self, transform):
+        self._transform = transform
+        self._inverse = None
+        self._inverse_transpose = None
+
+    @property
+    def inverse(self):
+        self._cached()
+        return self._inverse
+
+    @property
+    def inverse_transpose(self):
+        self._cached()
+        return self._inverse_transpose
+
+    def _cached(self):
+        # make sure the cache holds the inverse in the current precision
+        if self._stale():
+            Sphere._count(misses=1)
+            transform = np.asarray(self.transform, PRECISION.dtype)
+            self._cache(inverse(transform[np.newaxis])[0])
+        else:
+            Sphere._count(hits=1)
+
+    def _stale(self):
+        return self._inverse is None or self._inverse.dtype != PRECISION.dtype
+
+    def _cache(self, inverse):
+        self._inverse = Matrix(inverse)
+        self._inverse_transpose = Matrix(np.ascontiguousarray(self._inverse.T))
+
+    @staticmethod
+    def _count(hits=0, misses=0):
+        with Sphere._cache_lock:
+            Sphere._cache_hits += hits
+            Sphere._cache_misses += misses
+
+    @staticmethod
+    def inverse_stack(shapes):
+        # (K, 4, 4) inverses of shapes, the missing ones inverted in one batched call
+        # and cached, so every stack of the same shapes holds the same numbers.
+        # a SphereArray has them stacked already.
+        if hasattr(shapes, "inverses"):
+            return shapes.inverses
+        missing = [shape for shape in shapes if shape._stale()]
+        if missing:
+            transforms = np.stack([shape.transform for shape in missing])
+            transforms = transforms.astype(PRECISION.dtype, copy=False)
+            for shape, matrix in zip(missing, inverse(transforms)):
+                shape._cache(matrix)
+        Sphere._count(len(shapes) - len(missing), len(missing))
+        return np.stack([shape._inverse for shape in shapes])
+
+    @staticmethod
+    def transform_stack(shapes):
+        # (K, 4, 4) transforms of shapes, a SphereArray has them stacked already
+        if hasattr(shapes, "transforms"):
+            return shapes.transforms
+        return np.reshape([shape.transform for shape in shapes], (-1, 4, 4))
+
+    @staticmethod
+    def cache_info():
+        with Sphere._cache_lock:
+            return {"hits": Sphere._cache_hits, "misses": Sphere._cache_misses}
+
+    @staticmethod
+    def cache_clear():
+        with Sphere._cache_lock:
+            Sphere._cache_hits = 0
+            Sphere._cache_misses = 0
+
     def __repr__(self):
         return (
             f"Sphere(transform={repr(self.transform)}, material={repr(self.material)})"
@@ -20,17 +113,28 @@ class Sphere:
         return Sphere(transform, self.material)
 
     def set_material(self, material):
-        return Sphere(self.transform, material)
+        # the transform is unchanged, so is its cached inverse
+        sphere = Sphere(self.transform, material)
+        sphere._inverse = self._inverse
+        sphere._inverse_transpose = self._inverse_transpose
+        return sphere
 
     def normal_at(self, point):
-        obj_point = self.transform.inv @ point
-        obj_normal = obj_point - Point(0, 0, 0)
+        with PROFILER.stage("sphere.normal_at", len(point)):
+            obj_point = self.inverse @ point
+            obj_normal = obj_point - Point(0, 0, 0)
 
-        world_normal = VectorGrid(*(self.transform.inv.T @ obj_normal).T[:-1], False)
-        return world_normal.normalize()
+            world_normal = VectorGrid(
+                *(self.inverse_transpose @ obj_normal).T[:-1], False
+            )
+            return world_normal.normalize()
 
     def intersect(self, ray):
-        ray = ray.transform(self.transform.inv)
+        with PROFILER.stage("sphere.intersect", len(ray.direction)):
+            return self._intersect(ray)
+
+    def _intersect(self, ray):
+        ray = ray.transform(self.inverse)
         sphere_to_ray = ray.origin - Point(0, 0, 0)
         a = ray.direction @ ray.direction
 
@@ -48,3 +152,34 @@ class Sphere:
         res = Intersection(np.vstack([t1, t2]), mask, self)
 
         return res
+
+    @property
+    def bounds(self):
+        lower, upper = Sphere.bounds_stack(self.transform[np.newaxis])
+        return lower[0], upper[0]
+
+    @staticmethod
+    def bounds_stack(transforms):
+        # world-space axis-aligned bounds of unit spheres under (K, 4, 4) transforms.
+        # the half extent along an axis is the norm of that row of the linear part.
+        transforms = np.asarray(transforms)
+        centers = transforms[:, :3, 3]
+        half = np.sqrt((transforms[:, :3, :3] ** 2).sum(-1))
+        return centers - half, centers + half
+
+    @staticmethod
+    def intersect_stack(inverses, origin, direction):
+        # solve the quadratic for every (object, ray) pair at once.
+        # inverses is (K, 4, 4), origin is (1, 4) or (N, 4) and direction is (N, 4).
+        # t1 and t2 are (K, N) arrays holding nan where the ray misses the object.
+        return intersect(
+            np.asarray(inverses), np.asarray(origin), np.asarray(direction)
+        )
+
+    @staticmethod
+    def intersect_pairs(inverses, origins, directions):
+        # same as intersect_stack, but the i-th ray is only tested against the i-th
+        # inverse, so (P, 4, 4), (P, 4) and (P, 4) give t1 and t2 of shape (P,).
+        return intersect_pairs(
+            np.asarray(inverses), np.asarray(origins), np.asarray(directions)
+        )
@@ -0,0 +1,155 @@
+import numpy as np
+
+from src.kernels import inverse
+from src.material import Materials
+from src.matrix import Matrix
+from src.precision import PRECISION
+
+from .sphere import Sphere
+
+
+class SphereArray:
+    """
+    SphereArray holds many spheres as contiguous arrays instead of Sphere objects:
+    (K, 4, 4) transforms and inverses, (K, 3) colors and one (K,) array per scalar
+    of Material, all in the dtype of PRECISION. Every argument broadcasts over the
+    K spheres, and the inverses are computed in one batched call unless given.
+    Indexing with an integer gives a Sphere, slicing gives a SphereArray viewing the
+    same memory, and index arrays or masks give a copy, as they do in numpy.
+    World, BVH and UniformGrid take a SphereArray in place of a list of spheres.
+    """
+
+    # the Material attributes kept as one array each, in Material's order
+    scalars = (
+        "ambient",
+        "diffuse",
+        "specular",
+        "shininess",
+        "reflective",
+        "transparency",
+        "refractive_index",
+    )
+    fields = ("transforms", "inverses", "colors", *scalars)
+
+    def __init__(
+        self,
+        transforms,
+        colors=None,
+        ambient=0.1,
+        diffuse=0.9,
+        specular=0.9,
+        shininess=200.0,
+        reflective=0.0,
+        transparency=0.0,
+        refractive_index=1.0,
+        inverses=None,
+    ):
+        dtype = PRECISION.dtype
+        self.transforms = np.array(transforms, dtype=dtype)
+        if self.transforms.ndim != 3 or self.transforms.shape[1:] != (4, 4):
+            raise ValueError(
+                f"transforms must be (K, 4, 4), got {self.transforms.shape}"
+            )
+        count = len(self.transforms)
+
+        if inverses is None:
+            self.inverses = inverse(self.transforms, np.empty_like(self.transforms))
+        else:
+            self.inverses = np.array(
+                np.broadcast_to(inverses, (count, 4, 4)), dtype=dtype
+            )
+        colors = 1 if colors is None else colors
+        self.colors = np.array(np.broadcast_to(colors, (count, 3)), dtype=dtype)
+
+        values = (
+            ambient,
+            diffuse,
+            specular,
+            shininess,
+            reflective,
+            transparency,
+            refractive_index,
+        )
+        for name, value in zip(self.scalars, values):
+            setattr(self, name, np.array(np.broadcast_to(value, (count,)), dtype))
+
+    def __repr__(self):
+        return f"SphereArray(spheres={len(self)})"
+
+    def __len__(self):
+        return len(self.transforms)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.sphere(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.sphere(index)
+        spheres = SphereArray.__new__(SphereArray)
+        for name in self.fields:
+            setattr(spheres, name, getattr(self, name)[index])
+        return spheres
+
+    def __setitem__(self, index, sphere):
+        # write a Sphere into the row at index, with the inverse it has cached
+        self.transforms[index] = sphere.transform
+        self.inverses[index] = sphere.inverse
+        self.colors[index] = np.asarray(sphere.material.color).ravel()
+        for name in self.scalars:
+            getattr(self, name)[index] = getattr(sphere.material, name)
+
+    def __add__(self, other):
+        if not isinstance(other, SphereArray):
+            other = SphereArray.from_spheres(other)
+        return SphereArray.concatenate([self, other])
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.fields)
+
+    @property
+    def inverse_transposes(self):
+        return self.inverses.transpose(0, 2, 1)
+
+    @property
+    def materials(self):
+        # a Materials table viewing the colors and scalars, e.g. for World.shade_hit
+        return Materials(self.colors, *(getattr(self, name) for name in self.scalars))
+
+    def material(self, index):
+        return self.materials[index]
+
+    def sphere(self, index):
+        # the sphere gets copies, so changing it leaves the array alone
+        sphere = Sphere(Matrix(self.transforms[index].copy()), self.material(index))
+        sphere._cache(self.inverses[index].copy())
+        return sphere
+
+    def copy(self):
+        return self[np.arange(len(self))]
+
+    def to_spheres(self):
+        return list(self)
+
+    @staticmethod
+    def from_spheres(spheres):
+        spheres = list(spheres)
+        materials = [sphere.material for sphere in spheres]
+        return SphereArray(
+            np.reshape([sphere.transform for sphere in spheres], (-1, 4, 4)),
+            np.reshape([material.color for material in materials], (-1, 3)),
+            *(
+                [getattr(material, name) for material in materials]
+                for name in SphereArray.scalars
+            ),
+            inverses=Sphere.inverse_stack(spheres) if spheres else None,
+        )
+
+    @staticmethod
+    def concatenate(arrays):
+        spheres = SphereArray.__new__(SphereArray)
+        for name in SphereArray.fields:
+            fields = [getattr(array, name) for array in arrays]
+            setattr(spheres, name, np.concatenate(fields))
+        return spheres
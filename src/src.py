@@ -1,7 +1,22 @@
+from .camera import Camera
 from .canvas import Canvas
 from .grid import Color, ColorGrid, Point, PointGrid, Vector, VectorGrid
-from .intersection import Intersection
-from .light import Light, Ray
-from .material import Material
-from .matrix import Rotation, Scaling, Shearing, Translation
-from .shape import Sphere
+from .intersection import Hit, Intersection
+from .kernels import Workspace
+from .light import Light, LightSet, Ray
+from .material import Material, Materials
+from .matrix import Rotation, Scaling, Shearing, Translation, ViewTransform
+from .precision import PRECISION, Precision
+from .profiler import PROFILER, Profiler
+from .render import (
+    AdaptiveRenderer,
+    Animation,
+    IncrementalRenderer,
+    Keyframes,
+    ProcessRenderer,
+    ProgressiveRenderer,
+    ThreadRenderer,
+    WavefrontRenderer,
+)
+from .shape import Sphere, SphereArray
+from .world import BVH, UniformGrid, World
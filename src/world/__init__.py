@@ -0,0 +1,3 @@
+from .bvh import BVH
+from .uniform_grid import UniformGrid
+from .world import World
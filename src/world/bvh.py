@@ -0,0 +1,174 @@
+import time
+
+import numpy as np
+
+from src.intersection import Hit
+from src.precision import PRECISION
+from src.shape import Sphere, SphereArray
+
+from .world import World
+
+
+class BVH:
+    """
+    BVH is a binary tree of axis-aligned boxes around the world-space bounds of shapes.
+    Rays walk the tree in packets: each node only tests the rays still active in it,
+    and a ray leaves the packet once its box is missed or lies behind its nearest hit.
+    """
+
+    def __init__(self, shapes, leaf_size=4):
+        start = time.perf_counter()
+
+        self.shapes = shapes if isinstance(shapes, SphereArray) else list(shapes)
+        self.leaf_size = leaf_size
+        self.inverses = Sphere.inverse_stack(self.shapes)
+
+        lower, upper = Sphere.bounds_stack(Sphere.transform_stack(self.shapes))
+        # pad the boxes so that grazing hits found by the quadratic are never culled
+        self.lower, self.upper = self._build(lower - 1e-6, upper + 1e-6)
+
+        self.build_time = time.perf_counter() - start
+        self.stats = {}
+
+    def __repr__(self):
+        return f"BVH(shapes={len(self.shapes)}, nodes={self.node_count})"
+
+    @property
+    def node_count(self):
+        return len(self.left)
+
+    def _build(self, lower, upper):
+        centers = (lower + upper) / 2
+        order = np.arange(len(centers))
+
+        nodes_lower, nodes_upper = [], []
+        left, right, first, count = [], [], [], []
+
+        stack = [(None, None, 0, len(order))]
+        while stack:
+            parent, children, begin, end = stack.pop()
+            node = len(left)
+            if parent is not None:
+                children[parent] = node
+
+            members = order[begin:end]
+            nodes_lower.append(lower[members].min(axis=0))
+            nodes_upper.append(upper[members].max(axis=0))
+            left.append(-1)
+            right.append(-1)
+            first.append(begin)
+            count.append(end - begin)
+
+            extent = np.ptp(centers[members], axis=0)
+            if end - begin <= self.leaf_size or not extent.any():
+                # sorted leaves keep the lowest object index first on ties, like World
+                order[begin:end] = np.sort(members)
+                continue
+
+            axis = extent.argmax()
+            middle = (end - begin) // 2
+            split = np.argpartition(centers[members, axis], middle)
+            order[begin:end] = members[split]
+
+            stack.append((node, right, begin + middle, end))
+            stack.append((node, left, begin, begin + middle))
+
+        self.order = order
+        self.left = np.array(left)
+        self.right = np.array(right)
+        self.first = np.array(first)
+        self.count = np.array(count)
+        return np.array(nodes_lower), np.array(nodes_upper)
+
+    @staticmethod
+    def _arrays(ray):
+        direction = np.asarray(ray.direction)
+        origin = np.broadcast_to(np.asarray(ray.origin), direction.shape)
+        with np.errstate(divide="ignore"):
+            inv_direction = 1 / direction[:, :3]
+        return origin, direction, inv_direction
+
+    def intersect(self, ray):
+        start = time.perf_counter()
+        origin, direction, inv_direction = self._arrays(ray)
+
+        ts = np.full(len(direction), np.inf, dtype=PRECISION.dtype)
+        index = np.full(len(direction), -1)
+        visited = 0
+
+        stack = [(0, np.arange(len(direction)))]
+        while stack:
+            node, rays = stack.pop()
+            visited += 1
+
+            near, far = self._slab(node, origin[rays, :3], inv_direction[rays])
+            rays = rays[(near <= far) & (far >= 0) & (near <= ts[rays])]
+            if not rays.size:
+                continue
+
+            if self.left[node] != -1:
+                stack.append((self.right[node], rays))
+                stack.append((self.left[node], rays))
+                continue
+
+            members = self.order[self.first[node] : self.first[node] + self.count[node]]
+            t1, t2 = Sphere.intersect_stack(
+                self.inverses[members], origin[rays], direction[rays]
+            )
+            leaf_ts, leaf_index = World.nearest(t1, t2)
+            leaf_index = members[leaf_index]
+
+            closer = (leaf_ts < ts[rays]) | (
+                (leaf_ts == ts[rays]) & (leaf_index < index[rays])
+            )
+            ts[rays[closer]] = leaf_ts[closer]
+            index[rays[closer]] = leaf_index[closer]
+
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            "rays": len(direction),
+            "nodes_visited": visited,
+            "time": elapsed,
+            "rays_per_second": len(direction) / elapsed if elapsed else np.inf,
+        }
+
+        mask = np.isfinite(ts)
+        return Hit(ts[mask], mask, index[mask], self.shapes)
+
+    def occluded(self, ray, max_t=1):
+        # any-hit traversal: a ray leaves the packet once something blocks it
+        origin, direction, inv_direction = self._arrays(ray)
+        occluded = np.zeros(len(direction), dtype=bool)
+
+        stack = [(0, np.arange(len(direction)))]
+        while stack:
+            node, rays = stack.pop()
+            rays = rays[~occluded[rays]]
+            if not rays.size:
+                continue
+
+            near, far = self._slab(node, origin[rays, :3], inv_direction[rays])
+            rays = rays[(near <= far) & (far >= 0) & (near < max_t)]
+            if not rays.size:
+                continue
+
+            if self.left[node] != -1:
+                stack.append((self.right[node], rays))
+                stack.append((self.left[node], rays))
+                continue
+
+            members = self.order[self.first[node] : self.first[node] + self.count[node]]
+            t1, t2 = Sphere.intersect_stack(
+                self.inverses[members], origin[rays], direction[rays]
+            )
+            occluded[rays[World.blocked(t1, t2, max_t)]] = True
+
+        return occluded
+
+    def _slab(self, node, origin, inv_direction):
+        with np.errstate(invalid="ignore"):
+            t0 = (self.lower[node] - origin) * inv_direction
+            t1 = (self.upper[node] - origin) * inv_direction
+        near = np.fmax.reduce(np.fmin(t0, t1), axis=1)
+        far = np.fmin.reduce(np.fmax(t0, t1), axis=1)
+        return near, far
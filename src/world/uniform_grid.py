@@ -0,0 +1,196 @@
+import time
+
+import numpy as np
+
+from src.intersection import Hit
+from src.precision import PRECISION
+from src.shape import Sphere, SphereArray
+
+from .world import World
+
+
+class UniformGrid:
+    """
+    UniformGrid bins the shapes into equally sized voxels over their world-space bounds.
+    Rays march through the cells together with a vectorized 3D-DDA,
+    and a ray stops as soon as its nearest hit lies before the next cell boundary.
+    Building is a handful of array operations, so it can be redone every frame.
+    """
+
+    def __init__(self, shapes, density=2.0, max_resolution=128):
+        start = time.perf_counter()
+
+        self.shapes = shapes if isinstance(shapes, SphereArray) else list(shapes)
+        self.inverses = Sphere.inverse_stack(self.shapes)
+
+        lower, upper = Sphere.bounds_stack(Sphere.transform_stack(self.shapes))
+        lower, upper = lower - 1e-6, upper + 1e-6
+        self.lower, self.upper = lower.min(axis=0), upper.max(axis=0)
+
+        # about density shapes per cell, with cells as close to cubes as possible
+        extent = self.upper - self.lower
+        volume = np.prod(extent)
+        cells_per_unit = (density * len(self.shapes) / volume) ** (1 / 3)
+        self.resolution = np.clip(
+            np.floor(extent * cells_per_unit), 1, max_resolution
+        ).astype(int)
+        self.cell_size = extent / self.resolution
+
+        self._bin(lower, upper)
+        self.build_time = time.perf_counter() - start
+        self.stats = {}
+
+    def __repr__(self):
+        return (
+            f"UniformGrid(shapes={len(self.shapes)}, "
+            f"resolution={tuple(self.resolution.tolist())})"
+        )
+
+    @property
+    def cell_count(self):
+        return int(np.prod(self.resolution))
+
+    def _cell_of(self, points):
+        cells = np.floor((points - self.lower) / self.cell_size).astype(int)
+        return np.clip(cells, 0, self.resolution - 1)
+
+    def _flat(self, cells):
+        ry, rz = self.resolution[1], self.resolution[2]
+        return (cells[..., 0] * ry + cells[..., 1]) * rz + cells[..., 2]
+
+    def _bin(self, lower, upper):
+        first, last = self._cell_of(lower), self._cell_of(upper)
+        spans = last - first + 1
+        counts = np.prod(spans, axis=1)
+
+        # one (cell, shape) pair for every cell overlapped by the bounds of a shape
+        shapes = np.repeat(np.arange(len(self.shapes)), counts)
+        offsets = self._offsets(counts)
+        sy, sz = spans[shapes, 1], spans[shapes, 2]
+        local = np.stack([offsets // (sy * sz), offsets // sz % sy, offsets % sz], -1)
+        cells = self._flat(first[shapes] + local)
+
+        # the stable sort keeps lower shape indices first in every cell, like World
+        order = np.argsort(cells, kind="stable")
+        self.cell_shapes = shapes[order]
+        self.cell_counts = np.bincount(cells, minlength=self.cell_count)
+        self.cell_starts = np.cumsum(self.cell_counts) - self.cell_counts
+
+    @staticmethod
+    def _offsets(counts):
+        # 0, 1, ..., count - 1 for every count, concatenated
+        return np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    def intersect(self, ray):
+        start = time.perf_counter()
+
+        direction = np.asarray(ray.direction)
+        origin = np.broadcast_to(np.asarray(ray.origin), direction.shape)
+        rays, cells, step, t_max, t_delta, t_exit = self._start(origin, direction)
+
+        ts = np.full(len(direction), np.inf, dtype=PRECISION.dtype)
+        index = np.full(len(direction), len(self.shapes))
+
+        steps = 0
+        while rays.size:
+            steps += 1
+            self._test_cells(rays, self._flat(cells), origin, direction, ts, index)
+            t_next, inside = self._advance(cells, step, t_max, t_delta)
+
+            alive = (ts[rays] > t_next) & inside & (t_next <= t_exit[rays])
+            rays, cells = rays[alive], cells[alive]
+            step, t_max, t_delta = step[alive], t_max[alive], t_delta[alive]
+
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            "rays": len(direction),
+            "steps": steps,
+            "time": elapsed,
+            "rays_per_second": len(direction) / elapsed if elapsed else np.inf,
+        }
+
+        mask = np.isfinite(ts)
+        return Hit(ts[mask], mask, index[mask], self.shapes)
+
+    def occluded(self, ray, max_t=1):
+        # any-hit march: a ray stops at its first blocker or once past max_t
+        direction = np.asarray(ray.direction)
+        origin = np.broadcast_to(np.asarray(ray.origin), direction.shape)
+        rays, cells, step, t_max, t_delta, t_exit = self._start(origin, direction)
+        occluded = np.zeros(len(direction), dtype=bool)
+
+        while rays.size:
+            flat = self._flat(cells)
+            counts = self.cell_counts[flat]
+            pair_rays = np.repeat(rays, counts)
+            pair_shapes = self.cell_shapes[
+                np.repeat(self.cell_starts[flat], counts) + self._offsets(counts)
+            ]
+            t1, t2 = Sphere.intersect_pairs(
+                self.inverses[pair_shapes], origin[pair_rays], direction[pair_rays]
+            )
+            occluded[pair_rays[World.blocked(t1[None], t2[None], max_t)]] = True
+
+            t_next, inside = self._advance(cells, step, t_max, t_delta)
+            alive = ~occluded[rays] & inside & (t_next <= t_exit[rays])
+            alive &= t_next < max_t
+            rays, cells = rays[alive], cells[alive]
+            step, t_max, t_delta = step[alive], t_max[alive], t_delta[alive]
+
+        return occluded
+
+    def _start(self, origin, direction):
+        # rays entering the grid, their first cell and the DDA state
+        o, d = origin[:, :3], direction[:, :3]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv_d = 1 / d
+            t0 = (self.lower - o) * inv_d
+            t1 = (self.upper - o) * inv_d
+        t_enter = np.maximum(np.fmax.reduce(np.fmin(t0, t1), axis=1), 0)
+        t_exit = np.fmin.reduce(np.fmax(t0, t1), axis=1)
+        rays = np.flatnonzero(t_enter <= t_exit)
+
+        cells = self._cell_of(o[rays] + d[rays] * t_enter[rays, np.newaxis])
+        step = np.sign(d[rays]).astype(int)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            boundary = self.lower + (cells + (step > 0)) * self.cell_size
+            t_max = np.where(step != 0, (boundary - o[rays]) * inv_d[rays], np.inf)
+            t_delta = np.where(step != 0, self.cell_size * np.abs(inv_d[rays]), np.inf)
+        return rays, cells, step, t_max, t_delta, t_exit
+
+    def _advance(self, cells, step, t_max, t_delta):
+        # step every ray into its next cell in place, returning where it enters
+        t_next = t_max.min(axis=1)
+        axis = t_max.argmin(axis=1)
+        lanes = np.arange(len(cells))
+        cells[lanes, axis] += step[lanes, axis]
+        t_max[lanes, axis] += t_delta[lanes, axis]
+        inside = (cells[lanes, axis] >= 0) & (
+            cells[lanes, axis] < self.resolution[axis]
+        )
+        return t_next, inside
+
+    def _test_cells(self, rays, cells, origin, direction, ts, index):
+        # test every ray against every shape binned in its current cell
+        counts = self.cell_counts[cells]
+        if not counts.any():
+            return
+
+        pair_rays = np.repeat(rays, counts)
+        offsets = self._offsets(counts)
+        pair_shapes = self.cell_shapes[
+            np.repeat(self.cell_starts[cells], counts) + offsets
+        ]
+
+        t1, t2 = Sphere.intersect_pairs(
+            self.inverses[pair_shapes], origin[pair_rays], direction[pair_rays]
+        )
+        pair_ts = np.where(t1 >= 0, t1, t2)
+        pair_ts[~(pair_ts >= 0)] = np.inf
+
+        previous = ts[rays]
+        np.minimum.at(ts, pair_rays, pair_ts)
+        index[rays[ts[rays] < previous]] = len(self.shapes)
+
+        nearest = np.isfinite(pair_ts) & (pair_ts == ts[pair_rays])
+        np.minimum.at(index, pair_rays[nearest], pair_shapes[nearest])
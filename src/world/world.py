@@ -0,0 +1,316 @@
+import numpy as np
+
+from src import kernels
+from src.grid import ColorGrid, VectorGrid
+from src.intersection import Hit
+from src.kernels import FRESH
+from src.light import LightSet, Ray
+from src.material import Materials
+from src.precision import PRECISION
+from src.profiler import PROFILER
+from src.shape import Sphere, SphereArray
+
+
+class World:
+    """
+    World holds the shapes of a scene and the light, or LightSet, shining on them.
+    Rays are intersected against chunk_size shapes per vectorized pass, which bounds
+    the (shapes, rays) temporaries, or through an acceleration structure such as BVH
+    when accelerator is given. Shadow rays only need any hit, so they also drop out
+    as soon as one of them blocks the light.
+    The per-tile work runs on plain ndarrays through src.kernels, the grids and
+    colors it takes and returns keep their types. Given a Workspace, the methods on
+    that path take every temporary and result from it, and their results are only
+    valid until the next call with the same workspace.
+    """
+
+    chunk_size = 64
+
+    def __init__(self, shapes=None, light=None, accelerator=None):
+        if shapes is None:
+            shapes = []
+        # a SphereArray is kept as it is, so its rows are never turned into objects
+        self.shapes = shapes if isinstance(shapes, SphereArray) else list(shapes)
+        self.light = light
+        self.accelerator = accelerator
+        self._structure = None
+        self._inverses = None
+        self._materials = None
+
+    def __repr__(self):
+        return (
+            f"World(shapes={repr(self.shapes)}, light={repr(self.light)}, "
+            f"accelerator={repr(self.accelerator)})"
+        )
+
+    def __len__(self):
+        return len(self.shapes)
+
+    def add(self, shape):
+        return World(self.shapes + [shape], self.light, self.accelerator)
+
+    def set_light(self, light):
+        return World(self.shapes, light, self.accelerator)
+
+    def set_accelerator(self, accelerator):
+        return World(self.shapes, self.light, accelerator)
+
+    def replace(self, changes):
+        # swap shapes by index, keeping the stacked inverses and materials of the
+        # others. a SphereArray copy holds both already.
+        shapes = self.shapes.copy()
+        for index, shape in changes.items():
+            shapes[index] = shape
+        world = World(shapes, self.light, self.accelerator)
+        if isinstance(shapes, SphereArray):
+            return world
+
+        if self._inverses is not None:
+            world._inverses = self._inverses.copy()
+            for index, shape in changes.items():
+                world._inverses[index] = shape.inverse
+        if self._materials is not None:
+            world._materials = self._materials.copy()
+            for index, shape in changes.items():
+                world._materials[index] = shape.material
+        return world
+
+    def prepare(self, structure=True):
+        # build the stacked inverses, the material table and, unless structure is
+        # False, the acceleration structure now instead of on first use, e.g. before
+        # threads share the world or before frames replace some of its shapes
+        if self._inverses is None and len(self.shapes):
+            self._inverses = Sphere.inverse_stack(self.shapes)
+        if self._materials is None:
+            self._materials = self._material_table()
+        if structure and self._structure is None and self.accelerator is not None:
+            self._structure = self.accelerator(self.shapes)
+        return self
+
+    @property
+    def structure(self):
+        # the acceleration structure is built on first use
+        if self._structure is None and self.accelerator is not None:
+            self._structure = self.accelerator(self.shapes)
+        return self._structure
+
+    @property
+    def inverses(self):
+        if self._inverses is None:
+            self._inverses = Sphere.inverse_stack(self.shapes)
+        return self._inverses
+
+    @property
+    def materials(self):
+        # the table shade_hit gathers every hit's material from, by shape index
+        if self._materials is None:
+            self._materials = self._material_table()
+        return self._materials
+
+    def _material_table(self):
+        if isinstance(self.shapes, SphereArray):
+            return self.shapes.materials
+        return Materials.of(shape.material for shape in self.shapes)
+
+    def intersect(self, ray, workspace=None):
+        with PROFILER.stage("world.intersect", len(ray.direction)):
+            return self._intersect(ray, FRESH if workspace is None else workspace)
+
+    def _intersect(self, ray, workspace):
+        if not self.shapes:
+            mask = np.zeros(len(ray.direction), dtype=bool)
+            return Hit(np.empty(0), mask, np.empty(0, dtype=int), self.shapes)
+
+        if self.structure is not None:
+            return self.structure.intersect(ray)
+
+        # chunk_size shapes at a time, keeping the nearest hit so far
+        origin, direction = np.asarray(ray.origin), np.asarray(ray.direction)
+        for start in range(0, len(self.shapes), self.chunk_size):
+            inverses = self.inverses[start : start + self.chunk_size]
+            t1, t2 = kernels.intersect(inverses, origin, direction, None, workspace)
+            if not start:
+                ts, index = kernels.nearest(t1, t2, None, workspace)
+                continue
+
+            chunk = (
+                workspace.take("world.chunk_ts", ts.shape, ts.dtype),
+                workspace.take("world.chunk_index", index.shape, index.dtype),
+            )
+            chunk_ts, chunk_index = kernels.nearest(t1, t2, chunk, workspace)
+            closer = workspace.take("world.closer", ts.shape, bool)
+            np.less(chunk_ts, ts, out=closer)
+            np.copyto(ts, chunk_ts, where=closer)
+            np.copyto(index, np.add(chunk_index, start, out=chunk_index), where=closer)
+
+        mask = np.isfinite(ts, out=workspace.take("world.mask", ts.shape, bool))
+        count = np.count_nonzero(mask)
+        return Hit(
+            workspace.compress("world.hits", mask, ts, count),
+            mask,
+            workspace.compress("world.index", mask, index, count),
+            self.shapes,
+        )
+
+    @staticmethod
+    def nearest(t1, t2):
+        # pick the smallest non-negative t over the object axis of (K, N) arrays.
+        # rays without any such t get inf.
+        return kernels.nearest(t1, t2)
+
+    @staticmethod
+    def blocked(t1, t2, max_t, workspace=None):
+        # whether any t of (K, N) arrays lies in [0, max_t), for each of the N rays
+        workspace = FRESH if workspace is None else workspace
+        inside = workspace.take("blocked.inside", t1.shape, bool)
+        second = workspace.take("blocked.second", t1.shape, bool)
+        scratch = workspace.take("blocked.scratch", t1.shape, bool)
+
+        np.greater_equal(t1, 0, out=inside)
+        inside &= np.less(t1, max_t, out=scratch)
+        np.greater_equal(t2, 0, out=second)
+        second &= np.less(t2, max_t, out=scratch)
+        inside |= second
+        return inside.any(axis=0, out=workspace.take("blocked.any", t1.shape[1:], bool))
+
+    def occluded(self, ray, max_t=1, workspace=None):
+        with PROFILER.stage("world.occluded", len(ray.direction)):
+            workspace = FRESH if workspace is None else workspace
+            return self._occluded(ray, max_t, workspace)
+
+    def _occluded(self, ray, max_t, workspace):
+        if not self.shapes:
+            return np.zeros(len(ray.direction), dtype=bool)
+
+        if self.structure is not None:
+            return self.structure.occluded(ray, max_t)
+
+        origin, direction = np.asarray(ray.origin), np.asarray(ray.direction)
+        occluded = workspace.take("world.occluded", (len(direction),), bool)
+
+        # the first chunk sees every ray, later ones only those still unblocked
+        rays = None
+        for start in range(0, len(self.shapes), self.chunk_size):
+            inverses = self.inverses[start : start + self.chunk_size]
+            if rays is None:
+                t1, t2 = kernels.intersect(inverses, origin, direction, None, workspace)
+                np.copyto(occluded, self.blocked(t1, t2, max_t, workspace))
+                if start + self.chunk_size < len(self.shapes):
+                    rays = np.flatnonzero(~occluded)
+            else:
+                origins = origin if len(origin) == 1 else origin[rays]
+                t1, t2 = kernels.intersect(
+                    inverses, origins, direction[rays], None, workspace
+                )
+                blocked = self.blocked(t1, t2, max_t, workspace)
+                occluded[rays[blocked]] = True
+                rays = rays[~blocked]
+            if rays is not None and not rays.size:
+                break
+
+        return occluded
+
+    def is_shadowed(self, points, lights=None, workspace=None):
+        # shadow rays run from the points to their light, so the light sits at t = 1.
+        # with a LightSet, lights picks the light of every point. without lights, a
+        # LightSet gives a (points, lights) mask of every point against every light.
+        workspace = FRESH if workspace is None else workspace
+        points = np.asarray(points)
+        if lights is None and isinstance(self.light, LightSet):
+            count = len(self.light)
+            shadowed = self.is_shadowed(
+                np.repeat(points, count, axis=0),
+                np.tile(np.arange(count), len(points)),
+                workspace,
+            )
+            return shadowed.reshape(len(points), count)
+
+        if lights is None:
+            positions = np.asarray(self.light.position)
+        else:
+            positions = np.asarray(self.light.positions)[lights]
+        directions = workspace.take("world.to_light", points.shape, points.dtype)
+        np.subtract(positions, points, out=directions)
+        return self.occluded(Ray(points, directions), 1, workspace)
+
+    def normal_at(self, points, index, workspace=None):
+        # world-space normals of many shapes at once, index picks each point's shape
+        with PROFILER.stage("world.normal_at", len(index)):
+            normals = kernels.normals(
+                self.inverses, index, np.asarray(points), None, workspace
+            )
+            return normals.view(VectorGrid)
+
+    def shadows(self, points, normals, workspace=None):
+        # only points facing the light can be in shadow, so only they cast shadow rays
+        # a LightSet gives (points, lights) masks, one shadow ray per facing pair
+        workspace = FRESH if workspace is None else workspace
+        points, normals = np.asarray(points), np.asarray(normals)
+        facing = self.light.facing(points, normals, workspace)
+        in_shadow = workspace.take("world.in_shadow", facing.shape, bool)
+        in_shadow[...] = False
+        if facing.ndim == 2:
+            rows, lights = np.nonzero(facing)
+            over_points, offsets = points[rows], normals[rows]
+        else:
+            count, lights = np.count_nonzero(facing), None
+            over_points = workspace.compress("world.over_points", facing, points, count)
+            offsets = workspace.compress("world.offsets", facing, normals, count)
+        if len(over_points):
+            # shadow rays start off the surface so that it does not shadow itself
+            offsets *= PRECISION.epsilon
+            over_points += offsets
+            in_shadow[facing] = self.is_shadowed(over_points, lights, workspace)
+        return in_shadow
+
+    def shade_hit(
+        self, points, eyes, normals, index, in_shadow=None, out=None, workspace=None
+    ):
+        workspace = FRESH if workspace is None else workspace
+        points, eyes, normals = (np.asarray(a) for a in (points, eyes, normals))
+        if in_shadow is None:
+            in_shadow = self.shadows(points, normals, workspace)
+
+        if out is None:
+            out = workspace.take("shade_hit.colors", (len(index), 3), PRECISION.dtype)
+        # every hit gets its shape's material, so one call shades them all.
+        # a table of one material broadcasts as it is, like a single Material
+        materials = self.materials
+        if len(materials) > 1:
+            materials = materials.take(index, workspace)
+        self.light.get_color(
+            materials, points, eyes, normals, in_shadow, out, workspace
+        )
+        return out.view(ColorGrid)
+
+    def color_at(self, ray, workspace=None):
+        return self.buffers_at(ray, workspace)[0]
+
+    def buffers_at(self, ray, workspace=None):
+        # color, index of the shape hit (-1 on a miss) and hit distance of every ray
+        workspace = FRESH if workspace is None else workspace
+        origin, direction = np.asarray(ray.origin), np.asarray(ray.direction)
+        colors = workspace.take("world.colors", (len(direction), 3), PRECISION.dtype)
+        ids = workspace.take("world.ids", (len(direction),), int)
+        depths = workspace.take("world.depths", (len(direction),), PRECISION.dtype)
+        colors[...], ids[...], depths[...] = 0, -1, np.inf
+        hit = self.intersect(ray, workspace)
+        if not hit.count:
+            return colors.view(ColorGrid), ids, depths
+
+        # rays either share one origin or have one each
+        if len(origin) > 1:
+            origin = workspace.compress("world.origins", hit.mask, origin, hit.count)
+        direction = workspace.compress("world.directions", hit.mask, direction)
+        points = kernels.after(origin, direction, hit.hit, None, workspace)
+        with PROFILER.stage("world.normal_at", len(hit.index)):
+            normals = kernels.normals(self.inverses, hit.index, points, None, workspace)
+        # the hit directions are not needed past this point, so they become the eyes
+        eyes = np.negative(direction, out=direction)
+
+        colors[hit.mask] = self.shade_hit(
+            points, eyes, normals, hit.index, workspace=workspace
+        )
+        ids[hit.mask] = hit.index
+        depths[hit.mask] = hit.hit
+        return colors.view(ColorGrid), ids, depths
@@ -0,0 +1,43 @@
+import numpy as np
+
+from src.camera import Camera
+from src.grid import Color, Point, Vector, VectorGrid
+from src.light import Light, Ray
+from src.material import Material
+from src.matrix import Rotation, Scaling, Translation, ViewTransform
+from src.shape import Sphere
+from src.world import World
+
+
+def default_world():
+    light = Light(Point(-10, 10, -10), Color(1, 1, 1))
+    s1 = Sphere(material=Material(Color(0.8, 1.0, 0.6), diffuse=0.7, specular=0.2))
+    s2 = Sphere(Scaling(0.5, 0.5, 0.5))
+    return World([s1, s2], light)
+
+
+def random_spheres(count, seed=0):
+    rng = np.random.RandomState(seed)
+    return [
+        Sphere(
+            Translation(*rng.uniform(-5, 5, 3))
+            @ Rotation(*rng.uniform(0, np.pi, 3))
+            @ Scaling(*rng.uniform(0.1, 0.8, 3))
+        )
+        for _ in range(count)
+    ]
+
+
+def camera_rays(resolution):
+    xs = np.linspace(-0.5, 0.5, resolution)
+    return Ray(Point(0, 0, -15), VectorGrid(xs, xs, 1).normalize())
+
+
+def scene(hsize=23, vsize=17):
+    light = Light(Point(-10, 10, -10), Color(1, 1, 1))
+    shapes = [
+        Sphere(Translation(-1, 0, 0), Material(Color(0.8, 1.0, 0.6))),
+        Sphere(Translation(1, 0, 0) @ Scaling(0.5, 0.5, 0.5)),
+    ]
+    transform = ViewTransform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+    return Camera(hsize, vsize, np.pi / 2, transform), World(shapes, light)
@@ -0,0 +1,78 @@
+import numpy as np
+
+from src.grid import Point, PointGrid, Vector
+from src.light import Ray
+from src.matrix import Translation
+from src.shape import Sphere
+from src.world import BVH, World
+from tests.helpers import camera_rays, random_spheres
+
+
+def test_bvh_leaves_hold_every_shape_once():
+    bvh = BVH(random_spheres(50), leaf_size=4)
+    leaves = bvh.left == -1
+    assert bvh.count[leaves].sum() == 50
+    assert bvh.count[leaves].max() <= 4
+    assert sorted(bvh.order.tolist()) == list(range(50))
+
+
+def test_bvh_root_bounds_contain_every_shape():
+    shapes = random_spheres(30)
+    bvh = BVH(shapes)
+    for shape in shapes:
+        lower, upper = shape.bounds
+        assert np.all(bvh.lower[0] <= lower) and np.all(upper <= bvh.upper[0])
+
+
+def test_bvh_reports_build_and_traversal_stats():
+    bvh = BVH(random_spheres(20))
+    assert bvh.build_time > 0
+    assert bvh.node_count == len(bvh.lower)
+
+    bvh.intersect(camera_rays(8))
+    assert bvh.stats["rays"] == 64
+    assert bvh.stats["rays_per_second"] > 0
+
+
+def test_bvh_matches_brute_force_world():
+    shapes = random_spheres(200)
+    ray = camera_rays(40)
+    expected = World(shapes).intersect(ray)
+    hit = BVH(shapes).intersect(ray)
+    assert np.array_equal(hit.mask, expected.mask)
+    assert np.array_equal(hit.hit, expected.hit)
+    assert np.array_equal(hit.index, expected.index)
+
+
+def test_bvh_matches_sphere_intersect():
+    shapes = random_spheres(40)
+    ray = camera_rays(30)
+    hit = BVH(shapes).intersect(ray)
+
+    expected = np.full(len(ray.direction), np.inf)
+    for shape in shapes:
+        xs = shape.intersect(ray)
+        ts = np.full(len(ray.direction), np.inf)
+        ts[xs.mask] = xs.hit
+        expected = np.minimum(expected, ts)
+
+    assert np.array_equal(hit.mask, np.isfinite(expected))
+    assert np.allclose(hit, expected[hit.mask])
+
+
+def test_world_intersects_through_accelerator():
+    w = World([Sphere(), Sphere(Translation(0, 0, 3))], accelerator=BVH)
+    hit = w.intersect(Ray(Point(0, 0, -5), Vector(0, 0, 1)))
+    assert isinstance(w.structure, BVH)
+    assert hit == [4]
+    assert hit.index.tolist() == [0]
+
+
+def test_bvh_occluded_matches_brute_force_world():
+    shapes = random_spheres(200)
+    rng = np.random.RandomState(1)
+    points = PointGrid(*rng.uniform(-6, 6, (3, 500)), False)
+    ray = Ray(points, Point(8, 9, -10) - points)
+    expected = World(shapes).occluded(ray)
+    assert expected.any() and not expected.all()
+    assert np.array_equal(BVH(shapes).occluded(ray), expected)
@@ -0,0 +1,103 @@
+import numpy as np
+
+from src.camera import Camera
+from src.canvas import Canvas
+from src.grid import Color, Point, Vector
+from src.light import Light
+from src.matrix import Matrix, Rotation, Translation, ViewTransform
+from src.shape import Sphere
+from src.world import World
+from tests.helpers import default_world
+
+
+def test_constructing_camera():
+    c = Camera(160, 120, np.pi / 2)
+    assert c.hsize == 160
+    assert c.vsize == 120
+    assert c.field_of_view == np.pi / 2
+    assert c.transform == Matrix()
+
+
+def test_pixel_size_for_horizontal_canvas():
+    c = Camera(200, 125, np.pi / 2)
+    assert np.isclose(c.pixel_size, 0.01)
+
+
+def test_pixel_size_for_vertical_canvas():
+    c = Camera(125, 200, np.pi / 2)
+    assert np.isclose(c.pixel_size, 0.01)
+
+
+def test_constructing_ray_through_center_of_canvas():
+    c = Camera(201, 101, np.pi / 2)
+    r = c.ray_for_pixels(np.array([100]), np.array([50]))
+    assert r.origin == Point(0, 0, 0)
+    assert r.direction == Vector(0, 0, -1)
+
+
+def test_constructing_ray_through_corner_of_canvas():
+    c = Camera(201, 101, np.pi / 2)
+    r = c.ray_for_pixels(np.array([0]), np.array([0]))
+    assert r.origin == Point(0, 0, 0)
+    assert np.allclose(r.direction, Vector(0.66519, 0.33259, -0.66851), 1e-4, 1e-4)
+
+
+def test_constructing_ray_when_camera_is_transformed():
+    c = Camera(201, 101, np.pi / 2, Rotation(0, np.pi / 4, 0) @ Translation(0, -2, 5))
+    r = c.ray_for_pixels(np.array([100]), np.array([50]))
+    assert r.origin == Point(0, 2, -5)
+    assert r.direction == Vector(2 ** 0.5 / 2, 0, -(2 ** 0.5) / 2)
+
+
+def test_tiles_cover_every_pixel_exactly_once():
+    c = Camera(13, 7, np.pi / 2)
+    seen = np.zeros((7, 13), dtype=int)
+    for ray, pixels in c.rays(tile_size=4):
+        assert len(ray.direction) == len(pixels[0]) <= 16
+        np.add.at(seen, pixels, 1)
+    assert np.all(seen == 1)
+
+
+def test_canvas_tile_views_the_pixels_of_the_tile():
+    c = Camera(13, 7, np.pi / 2)
+    canvas = Canvas(13, 7)
+    for tile in c.tiles(tile_size=4):
+        view = c.canvas_tile(canvas, tile)
+        xs, ys = c.pixels(tile)
+        view[...] = np.arange(len(xs)).reshape(*view.shape[:2], 1)
+        assert np.array_equal(
+            canvas[c.to_canvas_index(xs, ys)][:, 0], np.arange(len(xs))
+        )
+
+
+def test_tiles_are_generated_lazily():
+    c = Camera(4000, 4000, np.pi / 2)
+    ray, pixels = next(c.rays(tile_size=8))
+    assert len(ray.direction) == 64
+
+
+def test_rendering_world_with_camera():
+    w = default_world()
+    transform = ViewTransform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+    c = Camera(11, 11, np.pi / 2, transform)
+    image = c.render(w, tile_size=4)
+    assert np.allclose(image[5, 5], [0.38066, 0.47583, 0.2855], 1e-4, 1e-4)
+
+
+def test_rendered_canvas_keeps_top_row_last():
+    w = World([Sphere(Translation(0, 1, 0))], Light(Point(0, 0, -10), Color(1, 1, 1)))
+    transform = ViewTransform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+    image = Camera(9, 9, np.pi / 3, transform).render(w)
+    assert np.any(image[5:] > 0)
+    assert np.all(image[:4] == 0)
+
+
+def test_render_into_memmap_canvas(tmp_path):
+    w = default_world()
+    c = Camera(11, 11, np.pi / 2).set_transform(
+        ViewTransform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+    )
+    canvas = Canvas.memmap(tmp_path / "image.raw", 11, 11)
+    image = c.render(w, tile_size=4, canvas=canvas)
+    assert image is canvas
+    assert np.allclose(image, c.render(w), atol=1e-6)
@@ -1,3 +1,8 @@
+import io
+import struct
+import textwrap
+import zlib
+
 import numpy as np
 
 from src.canvas import Canvas
@@ -59,3 +64,113 @@ def test_ppm_files_are_terminated_by_a_newline_character():
     c = Canvas(5, 3)
     ppm = c.to_ppm()
     assert ppm[-1] == "\n"
+
+
+def test_canvas_backed_by_buffer():
+    buffer = bytearray(5 * 3 * 3 * 8)
+    c = Canvas(5, 3, buffer=buffer)
+    c[1, 2] = Color(1, 0.5, 0)
+    pixels = np.frombuffer(buffer).reshape(3, 5, 3)
+    assert pixels[1, 2].tolist() == [1, 0.5, 0]
+    assert pixels.sum() == 1.5
+
+
+def test_writing_binary_ppm():
+    c = Canvas(2, 2)
+    c[0, 0] = Color(1, 0, 0)
+    c[1, 1] = Color(0, 0.5, 1)
+    buffer = io.BytesIO()
+    c.write_ppm(buffer)
+    assert buffer.getvalue() == (
+        b"P6\n2 2\n255\n" + bytes([0, 0, 0, 0, 128, 255, 255, 0, 0, 0, 0, 0])
+    )
+
+
+def test_writing_ppm_to_path(tmp_path):
+    c = Canvas(4, 3)
+    c[...] = Color(0.2, 0.4, 0.6)
+    path = tmp_path / "image.ppm"
+    c.write_ppm(path)
+    data = path.read_bytes()
+    assert data.startswith(b"P6\n4 3\n255\n")
+    assert len(data) == len(b"P6\n4 3\n255\n") + 4 * 3 * 3
+
+
+def test_streaming_plain_ppm_matches_to_ppm():
+    rng = np.random.RandomState(0)
+    c = Canvas(37, 11)
+    c[...] = rng.uniform(-0.2, 1.2, c.shape)
+    buffer = io.BytesIO()
+    c.write_ppm(buffer, binary=False, chunk_rows=3)
+    assert buffer.getvalue().decode() == c.to_ppm()
+
+
+def test_plain_ppm_lines_wrap_like_textwrap():
+    rng = np.random.RandomState(1)
+    c = Canvas(50, 4)
+    c[...] = rng.choice([0, 0.01, 0.3, 1], c.shape)
+    lines = c.to_ppm().splitlines()[3:]
+    values = np.ceil((np.flipud(c) * 255).clip(0, 255)).astype(int).astype(str)
+    expected = []
+    for row in values.reshape(4, -1):
+        expected.extend(textwrap.wrap(" ".join(row)))
+    assert lines == expected
+    assert max(map(len, lines)) <= 70
+
+
+def read_png(data):
+    # the header fields and decompressed scanlines of a PNG
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    position, chunks = 8, []
+    while position < len(data):
+        (length,) = struct.unpack(">I", data[position : position + 4])
+        kind = data[position + 4 : position + 8]
+        body = data[position + 8 : position + 8 + length]
+        (crc,) = struct.unpack(
+            ">I", data[position + 8 + length : position + 12 + length]
+        )
+        assert crc == zlib.crc32(kind + body)
+        chunks.append((kind, body))
+        position += 12 + length
+    assert chunks[0][0] == b"IHDR" and chunks[-1] == (b"IEND", b"")
+    header = struct.unpack(">IIBBBBB", chunks[0][1])
+    pixels = zlib.decompress(b"".join(body for kind, body in chunks if kind == b"IDAT"))
+    return header, pixels
+
+
+def test_writing_png_streams_rows_from_the_top():
+    rng = np.random.RandomState(2)
+    c = Canvas(7, 5)
+    c[...] = rng.uniform(-0.2, 1.2, c.shape)
+    buffer = io.BytesIO()
+    c.write_png(buffer, chunk_rows=2)
+
+    header, pixels = read_png(buffer.getvalue())
+    assert header == (7, 5, 8, 2, 0, 0, 0)
+    lines = np.frombuffer(pixels, dtype=np.uint8).reshape(5, 1 + 7 * 3)
+    assert not lines[:, 0].any()
+    expected = np.ceil((np.flipud(c) * 255).clip(0, 255)).astype(np.uint8)
+    assert np.array_equal(lines[:, 1:].reshape(5, 7, 3), expected)
+
+
+def test_canvas_of_lower_precision():
+    c = Canvas(4, 3, dtype=np.float16)
+    c[0, 0] = Color(1, 0.5, 0)
+    assert c.dtype == np.float16
+    assert c.write_ppm(io.BytesIO()) is None
+
+
+def test_memmap_canvas_writes_pixels_to_file(tmp_path):
+    path = tmp_path / "canvas.raw"
+    c = Canvas.memmap(path, 6, 4)
+    assert c.shape == (4, 6, 3) and c.dtype == np.float32
+    assert path.stat().st_size == 6 * 4 * 3 * 4
+
+    c[1, 2] = Color(1, 0.5, 0)
+    c.flush()
+    reopened = Canvas.memmap(path, 6, 4, mode="r+")
+    assert reopened[1, 2].tolist() == [1, 0.5, 0]
+
+    in_memory = Canvas(6, 4)
+    in_memory[...] = reopened
+    assert reopened.to_ppm() == in_memory.to_ppm()
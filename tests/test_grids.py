@@ -143,3 +143,25 @@ def test_reflecting_vector():
     r = v.reflect(n)
     expected = [[1, 1, 0, 0], [1, 0, 0, 0]]
     assert r == expected
+
+
+def test_mesh_has_same_order_as_cartesian_product():
+    from itertools import product
+
+    xs, ys, zs, ws = [1, 2, 3], [0.5, -0.5], [7], [0, 1]
+    expected = np.array(list(product(xs, ys, zs, ws)))
+    mesh = Grid.mesh(xs, ys, zs, ws)
+    assert mesh.shape == (12, 4)
+    assert np.array_equal(mesh, expected)
+    assert mesh.dtype == expected.dtype
+
+
+def test_mesh_accepts_generators():
+    expected = Grid.mesh([0, 1, 2], [3, 4], [5], [1])
+    mesh = Grid.mesh((x for x in range(3)), iter([3, 4]), [5], [1])
+    assert np.array_equal(mesh, expected)
+    assert PointGrid((x for x in range(3)), [0], [0]) == PointGrid([0, 1, 2], 0, 0)
+
+
+def test_mesh_keeps_integer_dtype():
+    assert Grid.mesh([1, 2], [3], [4], [0]).dtype == np.array([1]).dtype
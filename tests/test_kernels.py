@@ -0,0 +1,175 @@
+import numpy as np
+import pytest
+
+from src import kernels
+from src.camera import Camera
+from src.canvas import Canvas
+from src.grid import Color, Point, PointGrid, Vector, VectorGrid
+from src.kernels import Workspace
+from src.light import Light, Ray
+from src.material import Material
+from src.matrix import Rotation, Scaling, Translation
+from src.shape import Sphere
+from src.world import World
+
+
+def spheres():
+    return [
+        Sphere(Translation(0, 0, 3) @ Scaling(2, 1, 1)),
+        Sphere(Translation(1, 1, 6) @ Rotation(0.3, 0.2, 0.1)),
+    ]
+
+
+def test_intersect_matches_sphere_intersect():
+    shapes = spheres()
+    ray = Ray(Point(0, 0, -5), VectorGrid([-0.2, 0, 0.2], [0, 0.1], 1))
+    inverses = np.stack([shape.inverse for shape in shapes])
+    t1, t2 = kernels.intersect(
+        inverses, np.asarray(ray.origin), np.asarray(ray.direction)
+    )
+    for k, shape in enumerate(shapes):
+        xs = shape.intersect(ray)
+        assert np.allclose(t1[k, xs.mask], np.asarray(xs)[:, 0])
+        assert np.allclose(t2[k, xs.mask], np.asarray(xs)[:, 1])
+        assert np.isnan(t1[k, ~xs.mask]).all()
+
+
+def test_intersect_pairs_matches_intersect():
+    inverses = np.stack([shape.inverse for shape in spheres()])
+    origins = np.asarray(PointGrid([0, 0.5], [0, 0], [-5, -4], False))
+    directions = np.asarray(VectorGrid([0, 0.1], [0.1, 0.2], [1, 1], False))
+    t1, t2 = kernels.intersect(inverses, origins, directions)
+    p1, p2 = kernels.intersect_pairs(inverses, origins, directions)
+    assert np.array_equal(p1, np.diag(t1), equal_nan=True)
+    assert np.array_equal(p2, np.diag(t2), equal_nan=True)
+
+
+def test_kernels_return_plain_ndarrays():
+    world = World(spheres(), Light(Point(-10, 10, -10), Color(1, 1, 1)))
+    points = np.asarray(PointGrid([0, 0.1], [0, 0], [2, 2], False))
+    normals = kernels.normals(world.inverses, np.array([0, 0]), points)
+    colors = kernels.phong(
+        Material(),
+        np.asarray(world.light.position),
+        np.asarray(world.light.intensity),
+        points,
+        -normals,
+        normals,
+    )
+    assert type(normals) is np.ndarray
+    assert type(colors) is np.ndarray
+    assert colors.shape == (2, 3)
+
+
+def test_phong_matches_light_get_color():
+    light = Light(Point(0, 0, -10), Color(1, 1, 1))
+    points = PointGrid([0, 0.3], [0, 0], [0, 0], False)
+    eyes = VectorGrid([0, 0], [0, np.sqrt(2) / 2], [-1, -np.sqrt(2) / 2], False)
+    normals = VectorGrid([0, 0], [0, 0], [-1, -1], False)
+    in_shadow = np.array([False, True])
+    colors = kernels.phong(
+        Material(),
+        np.asarray(light.position),
+        np.asarray(light.intensity),
+        np.asarray(points),
+        np.asarray(eyes),
+        np.asarray(normals),
+        in_shadow,
+    )
+    assert np.allclose(colors[0], 1.9)
+    assert np.allclose(colors[1], 0.1)
+    assert np.allclose(
+        colors, light.get_color(Material(), points, eyes, normals, in_shadow)
+    )
+
+
+def test_world_normals_keep_their_type():
+    world = World(spheres())
+    normals = world.normal_at(PointGrid([2], [0], [3], False), np.array([0]))
+    assert isinstance(normals, VectorGrid)
+    assert normals == Vector(1, 0, 0)
+
+
+def test_workspace_reuses_and_grows_buffers():
+    workspace = Workspace()
+    first = workspace.take("a", (4, 3))
+    again = workspace.take("a", (2, 3))
+    assert np.shares_memory(first, again)
+    assert workspace.allocations == 1
+
+    larger = workspace.take("a", (8, 3))
+    assert not np.shares_memory(first, larger)
+    assert workspace.take("b", (2,), bool).dtype == bool
+    assert workspace.allocations == 3
+    assert len(workspace) == 2
+
+
+def test_kernels_write_to_out_and_workspace():
+    inverses = np.stack([shape.inverse for shape in spheres()])
+    origin = np.asarray(Point(0, 0, -5))
+    directions = np.asarray(VectorGrid([-0.2, 0, 0.2], [0, 0.1], 1))
+    expected = kernels.intersect(inverses, origin, directions)
+
+    out = np.empty((2, 6)), np.empty((2, 6))
+    workspace = Workspace()
+    t1, t2 = kernels.intersect(inverses, origin, directions, out, workspace)
+    assert t1 is out[0] and t2 is out[1]
+    assert np.array_equal(t1, expected[0], equal_nan=True)
+
+    kernels.intersect(inverses, origin, directions, workspace=workspace)
+    allocations = workspace.allocations
+    t1, _ = kernels.intersect(inverses, origin, directions, workspace=workspace)
+    assert workspace.allocations == allocations
+    assert np.array_equal(t1, expected[0], equal_nan=True)
+
+
+def test_render_with_workspace_matches_and_stops_allocating():
+    light = Light(Point(-10, 10, -10), Color(1, 1, 1))
+    camera, world = Camera(20, 10, np.pi / 3), World(spheres(), light)
+    canvas = Canvas(20, 10)
+    expected = Canvas(20, 10)
+    workspace = Workspace()
+    for tile in camera.tiles(8):
+        camera.render_tile(world, canvas, tile, workspace)
+        camera.render_tile(world, expected, tile)
+    assert np.array_equal(canvas, expected)
+
+    allocations = workspace.allocations
+    for tile in camera.tiles(8):
+        camera.render_tile(world, canvas, tile, workspace)
+    assert workspace.allocations == allocations
+
+
+def test_inverse_matches_linalg_and_rejects_singular_matrices():
+    rng = np.random.RandomState(0)
+    matrices = np.stack(
+        [
+            Translation(*rng.uniform(-5, 5, 3))
+            @ Rotation(*rng.uniform(0, np.pi, 3))
+            @ Scaling(*rng.uniform(0.1, 2, 3))
+            for _ in range(10)
+        ]
+    )
+    assert np.allclose(kernels.inverse(matrices), np.linalg.inv(matrices))
+    inverses = kernels.inverse(matrices.astype(np.float32))
+    assert inverses.dtype == np.float32
+    assert np.allclose(inverses, np.linalg.inv(matrices), atol=1e-4)
+    assert kernels.inverse(np.eye(4, dtype=int)[np.newaxis]).dtype == np.float64
+
+    singular = np.stack([np.eye(4), np.diag([1, 0, 1, 1])])
+    with pytest.raises(np.linalg.LinAlgError):
+        kernels.inverse(singular)
+
+
+def test_transform_gives_planes_of_each_ray_transform():
+    ray = Ray(Point(0, 0, -1), VectorGrid(5, [10, 20], 1))
+    matrices = [Translation(3, 4, 5), Scaling(2, 3, 4), Rotation(0.1, 0.2, 0.3)]
+    stack = np.stack(matrices)
+    origins = kernels.transform(stack, np.asarray(ray.origin))
+    directions = kernels.transform(stack, np.asarray(ray.direction))
+    assert origins.shape == (3, 3, 1)
+    assert directions.shape == (3, 3, 2)
+    for k, matrix in enumerate(matrices):
+        moved = ray.transform(matrix)
+        assert np.allclose(origins[:, k].T, np.asarray(moved.origin)[:, :3])
+        assert np.allclose(directions[:, k].T, np.asarray(moved.direction)[:, :3])
@@ -1,7 +1,11 @@
 import numpy as np
 
-from src.grid import Color, Point
-from src.light import Light
+from src.grid import Color, Point, PointGrid, VectorGrid
+from src.kernels import Workspace
+from src.light import Light, LightSet
+from src.material import Material, Materials
+
+m = Material()
 
 
 def test_point_light_has_position_and_intensity():
@@ -10,3 +14,92 @@ def test_point_light_has_position_and_intensity():
     light = Light(position, intensity)
     assert light.position == position
     assert light.intensity == intensity
+
+
+def random_lights(count, seed=0):
+    rng = np.random.RandomState(seed)
+    return [
+        Light(Point(*rng.uniform(-10, 10, 3)), Color(*rng.uniform(0, 1, 3)))
+        for _ in range(count)
+    ]
+
+
+def surface(count, seed=1):
+    rng = np.random.RandomState(seed)
+    points = PointGrid(*rng.uniform(-1, 1, (3, count)), False)
+    normals = VectorGrid(*rng.normal(size=(3, count)), False).normalize()
+    eyes = VectorGrid(*rng.normal(size=(3, count)), False).normalize()
+    return points, eyes, normals
+
+
+def test_light_set_stores_lights_as_arrays():
+    lights = random_lights(3)
+    light_set = LightSet.of(lights)
+    assert len(light_set) == 3
+    assert light_set.positions == np.vstack([light.position for light in lights])
+    assert light_set.intensities == np.vstack([light.intensity for light in lights])
+
+
+def test_light_set_shades_like_the_sum_of_its_lights():
+    lights = random_lights(40)
+    points, eyes, normals = surface(100)
+    expected = sum(light.get_color(m, points, eyes, normals) for light in lights)
+    assert LightSet.of(lights).get_color(m, points, eyes, normals) == expected
+
+
+def test_light_set_result_does_not_depend_on_chunk_size():
+    light_set = LightSet.of(random_lights(10))
+    points, eyes, normals = surface(50)
+    expected = light_set.get_color(m, points, eyes, normals)
+    light_set.chunk_size = 3
+    assert light_set.get_color(m, points, eyes, normals) == expected
+
+
+def test_light_set_facing_and_shadow_mask():
+    lights = random_lights(5)
+    points, eyes, normals = surface(30)
+    light_set = LightSet.of(lights)
+
+    facing = light_set.facing(points, normals)
+    assert facing.shape == (30, 5)
+    for k, light in enumerate(lights):
+        assert np.array_equal(facing[:, k], light.facing(points, normals))
+
+    in_shadow = np.zeros((30, 5), dtype=bool)
+    in_shadow[:, 1:] = True
+    expected = lights[0].get_color(m, points, eyes, normals) + sum(
+        light.get_color(m, points, eyes, normals, np.ones(30, dtype=bool))
+        for light in lights[1:]
+    )
+    assert light_set.get_color(m, points, eyes, normals, in_shadow) == expected
+
+
+def test_light_set_shades_a_material_per_point():
+    light_set = LightSet.of(random_lights(5))
+    points, eyes, normals = surface(20)
+    materials = [m, Material(Color(0.2, 0.4, 1), ambient=0.5, shininess=3)]
+    index = np.arange(20) % 2
+    colors = light_set.get_color(
+        Materials.of(materials).take(index), points, eyes, normals
+    )
+    for k, material in enumerate(materials):
+        selected = index == k
+        expected = light_set.get_color(
+            material, points[selected], eyes[selected], normals[selected]
+        )
+        assert colors[selected] == expected
+
+
+def test_light_set_reuses_a_workspace_and_writes_into_out():
+    light_set = LightSet.of(random_lights(10))
+    points, eyes, normals = surface(50)
+    expected = light_set.get_color(m, points, eyes, normals)
+
+    workspace = Workspace()
+    light_set.get_color(m, points, eyes, normals, workspace=workspace)
+    allocations = workspace.allocations
+    out = np.empty((50, 3))
+    colors = light_set.get_color(m, points, eyes, normals, None, out, workspace)
+    assert workspace.allocations == allocations
+    assert np.shares_memory(colors, out)
+    assert colors == expected
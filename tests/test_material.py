@@ -1,6 +1,8 @@
-from src.grid import Color, Point, Vector
+import numpy as np
+
+from src.grid import Color, Point, PointGrid, Vector, VectorGrid
 from src.light import Light
-from src.material import Material
+from src.material import Material, Materials
 
 m = Material()
 position = Point(0, 0, 0)
@@ -52,3 +54,43 @@ def test_ligthing_with_light_behind_surface():
     light = Light(Point(0, 0, 10), Color(1, 1, 1))
     result = light.get_color(m, position, eyev, normalv)
     assert result == Color(0.1, 0.1, 0.1)
+
+
+def test_lighting_with_surface_in_shadow():
+    eyev = Vector(0, 0, -1)
+    normalv = Vector(0, 0, -1)
+    light = Light(Point(0, 0, -10), Color(1, 1, 1))
+    result = light.get_color(m, position, eyev, normalv, np.array([True]))
+    assert result == Color(0.1, 0.1, 0.1)
+
+
+def test_default_material_is_opaque_and_matte():
+    assert m.reflective == 0.0
+    assert m.transparency == 0.0
+    assert m.refractive_index == 1.0
+
+
+def test_materials_table_gathers_rows_by_object_id():
+    materials = Materials.of([Material(), Material(Color(1, 0, 0), shininess=10)])
+    assert len(materials) == 2
+    assert materials[1] == Material(Color(1, 0, 0), shininess=10)
+
+    rows = materials.take(np.array([1, 1, 0]))
+    assert np.array_equal(rows.color, [[1, 0, 0], [1, 0, 0], [1, 1, 1]])
+    assert np.array_equal(rows.shininess, [10, 10, 200])
+
+    materials[0] = Material(ambient=1)
+    assert materials[0] == Material(ambient=1)
+
+
+def test_lighting_with_a_material_per_point():
+    first, second = Material(), Material(Color(1, 0.5, 0), ambient=0.3, shininess=5)
+    points = PointGrid([0, 0.5], [0, 0], [0, 0], False)
+    eyes = VectorGrid([0, 0], [0, 2 ** 0.5 / 2], [-1, -(2 ** 0.5) / 2], False)
+    normals = VectorGrid([0, 0], [0, 0], [-1, -1], False)
+    light = Light(Point(0, 10, -10), Color(1, 1, 1))
+
+    materials = Materials.of([first, second]).take(np.array([0, 1]))
+    result = light.get_color(materials, points, eyes, normals)
+    assert result[0] == light.get_color(first, points[:1], eyes[:1], normals[:1])
+    assert result[1] == light.get_color(second, points[1:], eyes[1:], normals[1:])
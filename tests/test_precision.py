@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from src.canvas import Canvas
+from src.grid import Color, ColorGrid, Point, PointGrid, Vector, VectorGrid
+from src.matrix import Matrix, Rotation, Scaling, Translation
+from src.precision import PRECISION
+from src.render import ProcessRenderer
+from src.world import BVH, UniformGrid
+from tests.helpers import scene
+
+
+def test_default_precision_is_float64():
+    assert PRECISION.dtype == np.float64
+    assert Point(1, 2, 3).dtype == np.float64
+    assert Canvas(2, 2).dtype == np.float64
+
+
+def test_constructors_respect_precision():
+    with PRECISION.using(np.float32):
+        arrays = [
+            Point(1, 2, 3),
+            Vector(1, 2, 3),
+            PointGrid([0, 1], [0, 1], [0, 1]),
+            VectorGrid([0, 1], [0, 1], [0, 1], False),
+            Color(1, 0.5, 0),
+            ColorGrid([1, 0], [0, 1], [0, 0]),
+            Matrix(),
+            Translation(1, 2, 3),
+            Rotation(0.1, 0.2, 0.3),
+            Scaling(1, 2, 3),
+            Canvas(2, 2),
+        ]
+        assert all(array.dtype == np.float32 for array in arrays)
+        assert PRECISION.epsilon > 1e-5
+    assert PRECISION.dtype == np.float64
+    assert PRECISION.epsilon == 1e-5
+
+
+def test_precision_rejects_other_dtypes():
+    with pytest.raises(ValueError):
+        PRECISION.set(np.float16)
+    assert PRECISION.dtype == np.float64
+
+
+def test_float32_render_does_not_upcast_and_is_close_to_float64():
+    camera, world = scene()
+    expected = camera.render(world)
+    with PRECISION.using(np.float32):
+        camera, world = scene()
+        ray, _ = camera.ray_for_tile((0, 8, 0, 8))
+        assert world.intersect(ray).dtype == np.float32
+        for accelerator in (BVH, UniformGrid):
+            assert world.set_accelerator(accelerator).intersect(ray).dtype == np.float32
+        image = camera.render(world)
+    assert image.dtype == np.float32
+    error = np.abs(image - expected)
+    assert error.mean() < 1e-3
+    assert np.quantile(error, 0.99) < 1e-2
+
+
+def test_process_renderer_keeps_precision():
+    with PRECISION.using(np.float32):
+        camera, world = scene()
+        image = ProcessRenderer(workers=1, tile_size=16).render(camera, world)
+        assert image.dtype == np.float32
+        assert np.array_equal(image, camera.render(world))
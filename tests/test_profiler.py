@@ -0,0 +1,105 @@
+import json
+import tracemalloc
+
+import numpy as np
+
+from src.profiler import PROFILER, Profiler
+from src.render import ProcessRenderer, ThreadRenderer
+from tests.helpers import scene
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.stage("intersect", 10):
+        pass
+    assert profiler.events == []
+
+
+def test_stage_records_time_calls_and_rays():
+    profiler = Profiler().enable()
+    for _ in range(3):
+        with profiler.stage("intersect", 10):
+            pass
+    summary = profiler.summary()
+    assert summary["intersect"]["calls"] == 3
+    assert summary["intersect"]["rays"] == 30
+    assert summary["intersect"]["time"] >= 0
+
+
+def test_stage_records_temporary_bytes():
+    profiler = Profiler().enable(trace_memory=True)
+    with profiler.stage("outer"):
+        with profiler.stage("inner"):
+            temporary = np.ones(100000)
+            del temporary
+    profiler.disable()
+    summary = profiler.summary()
+    assert summary["inner"]["bytes"] >= 800000
+    assert summary["outer"]["bytes"] >= summary["inner"]["bytes"]
+
+
+def test_disable_leaves_tracing_started_by_the_caller_running():
+    tracemalloc.start()
+    try:
+        Profiler().enable(trace_memory=True).disable()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    Profiler().enable(trace_memory=True).disable()
+    assert not tracemalloc.is_tracing()
+
+
+def test_rendering_reports_every_stage_per_frame_and_tile():
+    camera, world = scene(16, 8)
+    PROFILER.clear()
+    with PROFILER.enable():
+        camera.render(world, tile_size=8)
+    summary = PROFILER.summary()
+    PROFILER.clear()
+
+    assert summary["frame"]["calls"] == 1
+    assert summary["frame"]["rays"] == 128
+    assert summary["tile"]["calls"] == 2
+    for name in ["camera.rays", "world.intersect", "light.get_color", "canvas.write"]:
+        assert summary[name]["calls"] == 2
+    assert not PROFILER.enabled
+
+
+def test_profiler_works_across_threads():
+    camera, world = scene(16, 8)
+    PROFILER.clear()
+    with PROFILER.enable():
+        ThreadRenderer(workers=2, tile_size=4).render(camera, world)
+    summary = PROFILER.summary()
+    PROFILER.clear()
+    assert summary["tile"]["calls"] == 8
+    assert summary["tile"]["rays"] == 128
+
+
+def test_profiler_collects_events_of_worker_processes():
+    camera, world = scene(16, 8)
+    PROFILER.clear()
+    with PROFILER.enable():
+        ProcessRenderer(workers=2, tile_size=4).render(camera, world)
+    summary = PROFILER.summary()
+    PROFILER.clear()
+    assert summary["frame"]["calls"] == 1
+    assert summary["tile"]["calls"] == 8
+    assert summary["tile"]["rays"] == 128
+    assert summary["world.intersect"]["calls"] == 8
+
+
+def test_exporting_chrome_trace(tmp_path):
+    profiler = Profiler().enable()
+    with profiler.stage("frame", 4):
+        with profiler.stage("tile", 4, tile=(0, 2, 0, 2)):
+            pass
+    path = tmp_path / "trace.json"
+    profiler.to_chrome_trace(path)
+
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [event["name"] for event in events] == ["tile", "frame"]
+    assert all(event["ph"] == "X" for event in events)
+    assert events[0]["args"]["tile"] == "(0, 2, 0, 2)"
+    assert events[1]["dur"] >= events[0]["dur"]
@@ -0,0 +1,334 @@
+import io
+import os
+
+import numpy as np
+
+from src.camera import Camera
+from src.grid import Color, Point, Vector
+from src.light import Light, Ray
+from src.material import Material
+from src.matrix import Rotation, Scaling, Translation, ViewTransform
+from src.profiler import PROFILER
+from src.render import (
+    AdaptiveRenderer,
+    Animation,
+    IncrementalRenderer,
+    Keyframes,
+    ProcessRenderer,
+    ProgressiveRenderer,
+    ThreadRenderer,
+    WavefrontRenderer,
+)
+from src.shape import Sphere
+from src.world import World
+from tests.helpers import scene
+
+
+def test_process_renderer_matches_serial_render():
+    camera, world = scene()
+    renderer = ProcessRenderer(workers=2, tile_size=5)
+    image = renderer.render(camera, world)
+    assert image.shape == (17, 23, 3)
+    assert np.array_equal(image, camera.render(world))
+
+
+def test_process_renderer_reports_stats():
+    camera, world = scene()
+    renderer = ProcessRenderer(workers=1, tile_size=8)
+    renderer.render(camera, world)
+    assert renderer.stats["tiles"] == 9
+    assert renderer.stats["pixels"] == 23 * 17
+    assert renderer.stats["workers"] == 1
+
+
+def test_thread_renderer_matches_serial_render():
+    camera, world = scene()
+    renderer = ThreadRenderer(workers=3, tile_size=4)
+    image = renderer.render(camera, world)
+    assert np.array_equal(image, camera.render(world))
+
+
+def test_thread_renderer_reports_busy_and_idle_time_per_thread():
+    camera, world = scene()
+    renderer = ThreadRenderer(workers=2, tile_size=8)
+    renderer.render(camera, world)
+    threads = renderer.stats["threads"]
+    assert len(threads) == 2
+    assert sum(thread["tiles"] for thread in threads) == 9
+    for thread in threads:
+        assert thread["busy"] >= 0 and thread["idle"] >= 0
+        assert np.isclose(thread["busy"] + thread["idle"], renderer.stats["time"])
+
+
+def test_wavefront_without_bounces_matches_serial_render():
+    camera, world = scene()
+    renderer = WavefrontRenderer(max_depth=0, tile_size=8)
+    assert np.array_equal(renderer.render(camera, world), camera.render(world))
+    assert renderer.stats["live"] == [23 * 17]
+
+
+def test_wavefront_adds_reflected_color():
+    mirror = Sphere(material=Material(reflective=0.5))
+    behind = Sphere(Translation(0, 0, -10), Material(Color(0.2, 0.4, 0.9)))
+    world = World([mirror, behind], Light(Point(-10, 10, -10), Color(1, 1, 1)))
+    r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+    reflected = Ray(Point(0, 0, -1.00001), Vector(0, 0, -1))
+
+    expected = world.color_at(r) + 0.5 * world.color_at(reflected)
+    assert np.allclose(WavefrontRenderer().trace(world, r), expected, atol=1e-4)
+
+
+def test_wavefront_drops_rays_under_min_weight_or_past_max_depth():
+    mirrors = [
+        Sphere(Translation(0, 0, -2), Material(reflective=0.5)),
+        Sphere(Translation(0, 0, 2), Material(reflective=0.5)),
+    ]
+    world = World(mirrors, Light(Point(-10, 10, -10), Color(1, 1, 1)))
+    r = Ray(Point(0, 0, 0), Vector(0, 0, 1))
+
+    renderer = WavefrontRenderer(max_depth=10, min_weight=0.1)
+    renderer.trace(world, r)
+    assert renderer.stats["live"] == [1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0]
+
+    renderer = WavefrontRenderer(max_depth=2, min_weight=0)
+    renderer.trace(world, r)
+    assert renderer.stats["live"] == [1, 1, 1]
+
+
+def test_wavefront_sees_through_clear_glass():
+    glass = Sphere(material=Material(ambient=0, diffuse=0, specular=0, transparency=1))
+    target = Sphere(Translation(0, 0, 10), Material(Color(0.2, 0.4, 0.9)))
+    light = Light(Point(0, 10, 0), Color(1, 1, 1))
+    r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+
+    expected = World([target], light).color_at(r)
+    colors = WavefrontRenderer().trace(World([glass, target], light), r)
+    assert np.allclose(colors, expected, atol=1e-4)
+
+
+def test_wavefront_stops_refraction_under_total_internal_reflection():
+    glass = Sphere(material=Material(transparency=1, refractive_index=1.5))
+    world = World([glass], Light(Point(-10, 10, -10), Color(1, 1, 1)))
+    r = Ray(Point(0, 0, np.sqrt(2) / 2), Vector(0, 1, 0))
+
+    renderer = WavefrontRenderer()
+    renderer.trace(world, r)
+    assert renderer.stats["live"][:2] == [1, 0]
+
+
+def test_wavefront_splits_glassy_mirror_with_fresnel():
+    glass = Sphere(
+        material=Material(reflective=1, transparency=1, refractive_index=1.5)
+    )
+    world = World([glass], Light(Point(-10, 10, -10), Color(1, 1, 1)))
+    r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+
+    # head on, 4% of the light is reflected and 96% refracted
+    renderer = WavefrontRenderer(max_depth=1, min_weight=0.05)
+    renderer.trace(world, r)
+    assert renderer.stats["live"] == [1, 1]
+
+    renderer = WavefrontRenderer(max_depth=1, min_weight=0.03)
+    renderer.trace(world, r)
+    assert renderer.stats["live"] == [1, 2]
+
+
+def test_adaptive_renderer_refines_only_edges():
+    camera, world = scene()
+    renderer = AdaptiveRenderer(samples=4, tile_size=8)
+    renderer.render(camera, world)
+    assert 0 < renderer.stats["refined_fraction"] < 0.5
+    assert renderer.stats["rays"] == 23 * 17 + renderer.stats["refined"] * 4
+
+
+def test_adaptive_renderer_matches_full_supersampling():
+    camera, world = scene()
+    camera = Camera(60, 40, np.pi / 2, camera.transform)
+    adaptive = AdaptiveRenderer(samples=16).render(camera, world)
+
+    full = AdaptiveRenderer(samples=16, threshold=-1)
+    expected = full.render(camera, world)
+    assert full.stats["refined_fraction"] == 1
+    error = np.abs(adaptive - expected).max(axis=-1)
+    assert error.mean() < 0.005
+    assert np.quantile(error, 0.99) < 0.05
+
+
+def test_adaptive_edges_compare_color_id_and_depth():
+    renderer = AdaptiveRenderer(threshold=0.1, depth_threshold=0.05)
+    colors = np.zeros((3, 4, 3))
+    ids = np.zeros((3, 4), dtype=int)
+    depths = np.full((3, 4), 5.0)
+    assert not renderer.edges(colors, ids, depths).any()
+
+    colors[0, 0] = 0.5
+    ids[2, 3] = 1
+    depths[1, 1] = 6
+    assert renderer.edges(colors, ids, depths).tolist() == [
+        [True, True, False, False],
+        [True, True, True, True],
+        [False, True, True, True],
+    ]
+
+
+def test_world_buffers_at_hold_id_and_depth():
+    _, world = scene()
+    r = Ray(Point(-1, 0, -5), Vector(0, 0, 1))
+    colors, ids, depths = world.buffers_at(r)
+    assert colors == world.color_at(r)
+    assert ids.tolist() == [0] and np.allclose(depths, [4])
+
+
+def test_progressive_frames_refine_to_the_serial_render():
+    camera, world = scene()
+    renderer = ProgressiveRenderer(start=4, samples=2, passes=2, tile_size=8)
+    frames = list(renderer.frames(camera, world))
+    kinds = [(p["kind"], p["amount"]) for p in renderer.stats["passes"]]
+    assert kinds == [
+        ("resolution", 4),
+        ("resolution", 2),
+        ("resolution", 1),
+        ("samples", 2),
+        ("samples", 2),
+    ]
+    assert len(frames) == 5
+    assert all(frame.shape == (17, 23, 3) for frame in frames)
+
+    # each resolution pass only renders the pixels it adds
+    assert sum(p["rays"] for p in renderer.stats["passes"][:3]) == 23 * 17
+    assert np.array_equal(frames[2], camera.render(world))
+    assert renderer.stats["rays"] == 23 * 17 * 5
+
+
+def test_progressive_first_frame_is_upscaled_coarse_render():
+    camera, world = scene()
+    first = next(ProgressiveRenderer(start=4).frames(camera, world))
+    expected = camera.render(world)[::-1][::4, ::4]
+    upscaled = expected.repeat(4, axis=0).repeat(4, axis=1)[:17, :23]
+    assert np.array_equal(first[::-1], upscaled)
+
+
+def test_progressive_stops_at_time_budget_with_best_frame():
+    camera, world = scene()
+    renderer = ProgressiveRenderer(start=4, passes=100, time_budget=0)
+    frame = renderer.render(camera, world)
+    assert frame.shape == (17, 23, 3)
+    assert [p["kind"] for p in renderer.stats["passes"]] == ["resolution"]
+
+
+def shadow_scene():
+    light = Light(Point(-10, 10, -10), Color(1, 1, 1))
+    shapes = [
+        Sphere(Translation(0, -101, 0) @ Scaling(100, 100, 100)),
+        Sphere(Translation(-1, 0, 0), Material(Color(0.8, 1.0, 0.6))),
+        Sphere(Translation(1.5, -0.5, 0) @ Scaling(0.5, 0.5, 0.5)),
+    ]
+    transform = ViewTransform(Point(0, 1, -6), Point(0, 0, 0), Vector(0, 1, 0))
+    return Camera(40, 30, np.pi / 3, transform), World(shapes, light)
+
+
+def test_incremental_render_matches_serial_render():
+    camera, world = shadow_scene()
+    renderer = IncrementalRenderer(tile_size=16)
+    assert np.array_equal(renderer.render(camera, world), camera.render(world))
+
+
+def test_incremental_transform_edit_retraces_dirty_region_and_shadows():
+    camera, world = shadow_scene()
+    renderer = IncrementalRenderer(tile_size=16)
+    renderer.render(camera, world)
+
+    moved = world.shapes[1].set_transform(Translation(-1.2, 0.3, 0))
+    image = renderer.update(1, moved)
+    expected = camera.render(
+        World([*world.shapes[:1], moved, world.shapes[2]], world.light)
+    )
+    assert np.allclose(image, expected)
+    assert renderer.stats["kind"] == "transform"
+    assert 0 < renderer.stats["retraced"] < 40 * 30 / 2
+    assert renderer.stats["reshaded"] > 0
+
+
+def test_incremental_material_edit_only_reshades():
+    camera, world = shadow_scene()
+    renderer = IncrementalRenderer(tile_size=16)
+    renderer.render(camera, world)
+
+    painted = world.shapes[2].set_material(Material(Color(0.1, 0.2, 1)))
+    with PROFILER.enable():
+        image = renderer.update(2, painted)
+    names = {event["name"] for event in PROFILER.events}
+    PROFILER.clear()
+
+    expected = camera.render(World([*world.shapes[:2], painted], world.light))
+    assert np.allclose(image, expected)
+    assert renderer.stats["kind"] == "material"
+    assert renderer.stats["retraced"] == 0
+    assert renderer.stats["reshaded"] == (renderer.ids == 2).sum() > 0
+    assert "world.intersect" not in names and "world.occluded" not in names
+
+
+def test_incremental_region_covers_projected_bounds():
+    camera, world = shadow_scene()
+    renderer = IncrementalRenderer()
+    renderer.render(camera, world)
+    region = renderer.region(world.shapes[2].bounds)
+    assert region[renderer.ids == 2].all()
+    assert not region[:, :20].any()
+
+
+def test_keyframes_interpolate_transform_arguments():
+    track = Keyframes(Translation, {0: (0, 0, 0), 10: (0, 2, 4)})
+    assert track(5) == Translation(0, 1, 2)
+    assert track(-3) == Translation(0, 0, 0)
+    assert track(20) == Translation(0, 2, 4)
+
+
+def test_animation_frames_match_single_renders():
+    camera, world = scene()
+    tracks = {
+        1: [
+            Keyframes(Translation, {0: (1, 0, 0), 2: (1, 1, 0)}),
+            Keyframes(Scaling, {0: (0.5, 0.5, 0.5), 2: (0.3, 0.3, 0.3)}),
+        ]
+    }
+    animation = Animation(camera, world, 3, tracks, tile_size=8)
+    for frame, canvas in animation.render():
+        moved = world.shapes[1].set_transform(
+            Translation(1, frame / 2, 0) @ Scaling(*[0.5 - 0.1 * frame] * 3)
+        )
+        expected = camera.render(World([world.shapes[0], moved], world.light))
+        assert np.allclose(canvas, expected)
+    assert animation.stats["frames"] == 3
+    assert animation.stats["static_camera"]
+
+
+def test_animation_with_camera_track_and_static_shapes():
+    camera, world = scene()
+
+    def view(angle):
+        eye = Rotation(0, angle, 0) @ Point(0, 0, -5)
+        return ViewTransform(eye, Point(0, 0, 0), Vector(0, 1, 0))
+
+    turntable = Keyframes(view, {0: (0,), 4: (np.pi / 2,)})
+    animation = Animation(camera, world, 2, camera_track=turntable, tile_size=8)
+    frames = [canvas.copy() for _, canvas in animation.render()]
+    assert not animation.stats["static_camera"]
+    assert np.allclose(frames[1], camera.set_transform(view(np.pi / 8)).render(world))
+
+
+def test_animation_streams_numbered_files_and_pipes(tmp_path):
+    camera, world = scene()
+    tracks = {0: Keyframes(Translation, {0: (-1, 0, 0), 1: (-1, 0.5, 0)})}
+    animation = Animation(camera, world, 2, tracks)
+
+    paths = animation.write(str(tmp_path / "frame_{:03d}.ppm"))
+    assert [os.path.basename(path) for path in paths] == [
+        "frame_000.ppm",
+        "frame_001.ppm",
+    ]
+
+    pipe = io.BytesIO()
+    animation.write(pipe)
+    expected = b"".join(open(path, "rb").read() for path in paths)
+    assert pipe.getvalue() == expected
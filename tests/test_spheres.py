@@ -1,10 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
-from src.grid import Point, Vector
+from src.grid import Color, Point, PointGrid, Vector, VectorGrid
 from src.light import Ray
 from src.material import Material
 from src.matrix import Rotation, Scaling, Translation
+from src.precision import PRECISION
+from src.shape import SphereArray
 from src.shape.sphere import Sphere
+from src.world import BVH, World
 
 
 def test_ray_intersects_sphere_at_two_points():
@@ -142,3 +147,148 @@ def test_sphere_may_be_assigned_material():
     m = Material(ambient=1)
     s = s.set_material(m)
     assert s.material == m
+
+
+def test_bounds_of_transformed_sphere():
+    s = Sphere(Translation(1, 2, 3) @ Scaling(2, 3, 4))
+    lower, upper = s.bounds
+    assert np.allclose(lower, [-1, -1, -1])
+    assert np.allclose(upper, [3, 5, 7])
+
+
+def test_bounds_of_rotated_sphere():
+    s = Sphere(Rotation(0, 0, np.pi / 4) @ Scaling(2, 1, 1))
+    lower, upper = s.bounds
+    half = (2.5) ** 0.5
+    assert np.allclose(lower, [-half, -half, -1])
+    assert np.allclose(upper, [half, half, 1])
+
+
+def test_sphere_caches_inverse_of_transform():
+    s = Sphere(Translation(2, 3, 4))
+    Sphere.cache_clear()
+    assert s.inverse == Translation(-2, -3, -4)
+    assert s.inverse_transpose == Translation(-2, -3, -4).T
+    s.normal_at(Point(2, 3, 5))
+    assert Sphere.cache_info() == {"hits": 3, "misses": 1}
+
+
+def test_setting_transform_invalidates_cached_inverse():
+    s = Sphere(Translation(2, 3, 4))
+    s.inverse
+    s2 = s.set_transform(Scaling(2, 2, 2))
+    Sphere.cache_clear()
+    assert s2.inverse == Scaling(0.5, 0.5, 0.5)
+    assert Sphere.cache_info()["misses"] == 1
+
+    s.transform = Scaling(4, 4, 4)
+    assert s.inverse == Scaling(0.25, 0.25, 0.25)
+    assert Sphere.cache_info()["misses"] == 2
+
+
+def test_setting_material_keeps_cached_inverse():
+    s = Sphere(Translation(2, 3, 4))
+    s.inverse
+    Sphere.cache_clear()
+    s.set_material(Material(ambient=1)).inverse
+    assert Sphere.cache_info() == {"hits": 1, "misses": 0}
+
+
+def test_inverse_stack_inverts_missing_inverses_at_once():
+    cached = Sphere(Translation(2, 3, 4))
+    cached.inverse
+    shapes = [cached, Sphere(Scaling(2, 2, 2)), Sphere(Rotation(0.3, 0, 0))]
+    Sphere.cache_clear()
+    inverses = Sphere.inverse_stack(shapes)
+    assert Sphere.cache_info() == {"hits": 1, "misses": 2}
+    assert np.allclose(inverses, [np.linalg.inv(s.transform) for s in shapes])
+    assert np.array_equal(inverses[1], shapes[1].inverse)
+
+
+def test_sphere_array_round_trips_a_list_of_spheres():
+    shapes = [
+        Sphere(Translation(2, 3, 4), Material(Color(1, 0, 0), shininess=10)),
+        Sphere(Rotation(0.3, 0.2, 0) @ Scaling(2, 1, 1)),
+    ]
+    spheres = SphereArray.from_spheres(shapes)
+    assert len(spheres) == 2
+    assert np.array_equal(spheres.inverses, Sphere.inverse_stack(shapes))
+    assert np.array_equal(spheres.shininess, [10, 200])
+
+    for shape, sphere in zip(shapes, spheres.to_spheres()):
+        assert sphere.transform == shape.transform
+        assert sphere.material == shape.material
+        assert np.array_equal(sphere.inverse, shape.inverse)
+
+
+def test_sphere_array_broadcasts_and_slices_without_copies():
+    transforms = np.stack([Translation(x, 0, 0) for x in range(6)])
+    spheres = SphereArray(transforms, Color(1, 0.5, 0), diffuse=np.linspace(0, 1, 6))
+    assert np.array_equal(spheres.colors, np.tile([1, 0.5, 0], (6, 1)))
+    assert np.allclose(spheres.inverses[:, 0, 3], -np.arange(6))
+
+    part = spheres[2:4]
+    assert len(part) == 2
+    assert np.shares_memory(part.transforms, spheres.transforms)
+    assert np.shares_memory(part.diffuse, spheres.diffuse)
+    assert not np.shares_memory(spheres[[2, 3]].transforms, spheres.transforms)
+
+    part[0] = Sphere(Scaling(2, 2, 2), Material(ambient=1))
+    assert spheres[2].transform == Scaling(2, 2, 2)
+    assert spheres[2].material == Material(ambient=1)
+    assert spheres[2].inverse == Scaling(0.5, 0.5, 0.5)
+
+
+def test_world_of_sphere_array_matches_world_of_spheres():
+    shapes = [
+        Sphere(Translation(0, 0, 3) @ Scaling(2, 1, 1)),
+        Sphere(Translation(1, 1, 6), Material(Color(0.2, 0.4, 1), specular=0.1)),
+    ]
+    spheres = SphereArray.from_spheres(shapes)
+    ray = Ray(Point(0, 0, -5), VectorGrid([-0.2, 0, 0.2], [0, 0.1, 0.2], 1))
+    for accelerator in (None, BVH):
+        world = World(spheres, accelerator=accelerator)
+        assert world.shapes is spheres
+        assert world.intersect(ray) == World(shapes, None, accelerator).intersect(ray)
+
+    points = PointGrid([2, 1], [0, 1], [3, 4], False)
+    world = World(spheres).replace({1: shapes[1].set_transform(Translation(1, 1, 5))})
+    assert isinstance(world.shapes, SphereArray)
+    assert world.normal_at(points, np.array([0, 1])) == VectorGrid(
+        [1, 0], [0, 0], [0, -1], False
+    )
+    assert spheres[1].transform == Translation(1, 1, 6)
+
+
+def test_sphere_array_is_made_in_the_dtype_of_precision():
+    with PRECISION.using(np.float32):
+        spheres = SphereArray(np.stack([Translation(1, 2, 3), Scaling(2, 2, 2)]))
+        world = World(spheres)
+        assert world.inverses.dtype == np.float32
+    for name in SphereArray.fields:
+        assert getattr(spheres, name).dtype == np.float32
+
+
+def test_cache_counters_add_up_across_threads():
+    s = Sphere(Translation(2, 3, 4))
+    s.inverse
+    Sphere.cache_clear()
+
+    def read(_):
+        return [(s.inverse, s.inverse_transpose) for _ in range(2000)]
+
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(read, range(4)))
+    assert Sphere.cache_info() == {"hits": 16000, "misses": 0}
+
+
+def test_cached_inverse_follows_precision():
+    s = Sphere(Translation(2, 3, 4))
+    assert s.inverse.dtype == np.float64
+    Sphere.cache_clear()
+    with PRECISION.using(np.float32):
+        assert s.inverse.dtype == np.float32
+        assert s.inverse_transpose.dtype == np.float32
+        assert Sphere.inverse_stack([s, Sphere(Scaling(2, 2, 2))]).dtype == np.float32
+    assert Sphere.cache_info() == {"hits": 2, "misses": 2}
+    assert s.inverse.dtype == np.float64
@@ -1,7 +1,7 @@
 import numpy as np
 
 from src.grid import Point, PointGrid, Vector
-from src.matrix import Rotation, Scaling, Shearing, Translation
+from src.matrix import Rotation, Scaling, Shearing, Translation, ViewTransform
 
 
 def test_multiplying_by_translation_matrix():
@@ -144,3 +144,29 @@ def test_chained_transformations_must_be_applied_in_reverse_order():
     assert T @ pg == PointGrid(
         [15, 15, 60, 60], [-15, -15, -15, -15], [17, 22, 17, 22], False
     )
+
+
+def test_transformation_matrix_for_default_orientation():
+    t = ViewTransform(Point(0, 0, 0), Point(0, 0, -1), Vector(0, 1, 0))
+    assert t == np.eye(4)
+
+
+def test_view_transformation_matrix_looking_in_positive_z_direction():
+    t = ViewTransform(Point(0, 0, 0), Point(0, 0, 1), Vector(0, 1, 0))
+    assert t == Scaling(-1, 1, -1)
+
+
+def test_view_transformation_moves_world():
+    t = ViewTransform(Point(0, 0, 8), Point(0, 0, 0), Vector(0, 1, 0))
+    assert t == Translation(0, 0, -8)
+
+
+def test_arbitrary_view_transformation():
+    t = ViewTransform(Point(1, 3, 2), Point(4, -2, 8), Vector(1, 1, 0))
+    expected = [
+        [-0.50709, 0.50709, 0.67612, -2.36643],
+        [0.76772, 0.60609, 0.12122, -2.82843],
+        [-0.35857, 0.59761, -0.71714, 0.00000],
+        [0.00000, 0.00000, 0.00000, 1.00000],
+    ]
+    assert np.allclose(t, expected, 1e-4, 1e-4)
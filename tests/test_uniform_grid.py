@@ -0,0 +1,75 @@
+import numpy as np
+
+from src.grid import Point, PointGrid, Vector, VectorGrid
+from src.light import Ray
+from src.matrix import Translation
+from src.shape import Sphere
+from src.world import UniformGrid, World
+from tests.helpers import camera_rays, random_spheres
+
+
+def test_grid_bins_every_overlapped_cell():
+    shapes = [Sphere(Translation(-3, 0, 0)), Sphere(Translation(3, 0, 0))]
+    grid = UniformGrid(shapes, density=8)
+    assert grid.cell_counts.sum() >= 2
+    assert set(grid.cell_shapes.tolist()) == {0, 1}
+    assert len(grid.cell_counts) == grid.cell_count
+
+
+def test_grid_resolution_grows_with_shape_count():
+    small = UniformGrid(random_spheres(10))
+    large = UniformGrid(random_spheres(1000))
+    assert np.all(small.resolution <= large.resolution)
+    assert large.build_time > 0
+
+
+def test_grid_matches_brute_force_world():
+    shapes = random_spheres(200)
+    ray = camera_rays(40)
+    expected = World(shapes).intersect(ray)
+    hit = UniformGrid(shapes).intersect(ray)
+    assert np.array_equal(hit.mask, expected.mask)
+    assert np.array_equal(hit.hit, expected.hit)
+    assert np.array_equal(hit.index, expected.index)
+
+
+def test_grid_handles_rays_starting_inside_and_axis_aligned():
+    shapes = random_spheres(50, seed=3)
+    ray = Ray(
+        PointGrid([-1, 0, 1], [-1, 0, 1], 0),
+        VectorGrid(
+            [1, 0, 0, 0, 0, -1], [0, 1, 0, 0, -1, 0], [0, 0, 1, -1, 0, 0], False
+        ),
+    )
+    ray = Ray(np.repeat(ray.origin, 6, axis=0), np.tile(ray.direction, (9, 1)))
+    expected = World(shapes).intersect(ray)
+    hit = UniformGrid(shapes).intersect(ray)
+    assert np.array_equal(hit.mask, expected.mask)
+    assert np.allclose(hit.hit, expected.hit)
+    assert np.array_equal(hit.index, expected.index)
+
+
+def test_grid_stops_rays_early():
+    shapes = [Sphere(Translation(0, 0, z)) for z in range(0, 40, 4)]
+    grid = UniformGrid(shapes)
+    hit = grid.intersect(Ray(Point(0, 0, -5), Vector(0, 0, 1)))
+    assert hit == [4]
+    assert grid.stats["steps"] < grid.resolution[2]
+
+
+def test_world_selects_uniform_grid():
+    w = World([Sphere(), Sphere(Translation(0, 0, 3))], accelerator=UniformGrid)
+    hit = w.intersect(Ray(Point(0, 0, -5), Vector(0, 0, 1)))
+    assert isinstance(w.structure, UniformGrid)
+    assert hit == [4]
+    assert hit.index.tolist() == [0]
+
+
+def test_uniform_grid_occluded_matches_brute_force_world():
+    shapes = random_spheres(200)
+    rng = np.random.RandomState(1)
+    points = PointGrid(*rng.uniform(-6, 6, (3, 500)), False)
+    ray = Ray(points, Point(8, 9, -10) - points)
+    expected = World(shapes).occluded(ray)
+    assert expected.any() and not expected.all()
+    assert np.array_equal(UniformGrid(shapes).occluded(ray), expected)
@@ -0,0 +1,230 @@
+import numpy as np
+
+from src.grid import Color, Point, PointGrid, Vector, VectorGrid
+from src.light import Light, LightSet, Ray
+from src.material import Material
+from src.matrix import Scaling, Translation
+from src.shape import Sphere
+from src.world import BVH, World
+from tests.helpers import default_world
+
+
+def test_creating_world():
+    w = World()
+    assert len(w) == 0
+    assert w.light is None
+
+
+def test_default_world():
+    w = default_world()
+    assert len(w) == 2
+    assert w.light.position == Point(-10, 10, -10)
+    assert np.allclose(w.shapes[1].transform, Scaling(0.5, 0.5, 0.5))
+
+
+def test_intersect_world_with_ray():
+    w = default_world()
+    r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+    hit = w.intersect(r)
+    assert hit.count == 1
+    assert hit == [4]
+    assert hit.index.tolist() == [0]
+
+
+def test_intersect_empty_world():
+    r = Ray(Point(0, 0, -5), VectorGrid([0, 1], 0, 1))
+    hit = World().intersect(r)
+    assert hit.count == 0
+    assert hit.mask.tolist() == [False, False]
+
+
+def test_hit_ignores_intersections_behind_ray():
+    w = World([Sphere(), Sphere(Translation(0, 0, -10))])
+    r = Ray(Point(0, 0, 0), Vector(0, 0, 1))
+    hit = w.intersect(r)
+    assert hit == [1]
+    assert hit.index.tolist() == [0]
+
+
+def test_world_hit_mask_marks_rays_that_miss():
+    w = World([Sphere(Translation(-2, 0, 0)), Sphere(Translation(2, 0, 0))])
+    r = Ray(PointGrid([-2, 0, 2], 0, -5), Vector(0, 0, 1))
+    hit = w.intersect(r)
+    assert hit.mask.tolist() == [True, False, True]
+    assert hit == [4, 4]
+    assert hit.index.tolist() == [0, 1]
+
+
+def test_world_intersection_matches_nearest_hit_of_each_sphere():
+    rng = np.random.RandomState(0)
+    shapes = [
+        Sphere(Translation(*rng.uniform(-3, 3, 3)) @ Scaling(*rng.uniform(0.2, 1, 3)))
+        for _ in range(20)
+    ]
+    w = World(shapes)
+    r = Ray(
+        Point(0, 0, -10),
+        VectorGrid(np.linspace(-0.4, 0.4, 30), np.linspace(-0.4, 0.4, 30), 1),
+    )
+    hit = w.intersect(r)
+
+    expected = np.full(len(r.direction), np.inf)
+    for shape in shapes:
+        xs = shape.intersect(r)
+        ts = np.full(len(r.direction), np.inf)
+        ts[xs.mask] = xs.hit
+        expected = np.minimum(expected, ts)
+
+    assert np.array_equal(hit.mask, np.isfinite(expected))
+    assert np.allclose(hit, expected[hit.mask])
+
+
+def test_intersect_in_chunks_matches_one_pass():
+    rng = np.random.RandomState(1)
+    shapes = [
+        Sphere(Translation(*rng.uniform(-3, 3, 3)) @ Scaling(*rng.uniform(0.2, 1, 3)))
+        for _ in range(20)
+    ]
+    r = Ray(Point(0, 0, -10), VectorGrid(np.linspace(-0.4, 0.4, 20), [0, 0.1], 1))
+    expected = World(shapes).intersect(r)
+    w = World(shapes)
+    w.chunk_size = 3
+    hit = w.intersect(r)
+    assert np.array_equal(hit.mask, expected.mask)
+    assert np.array_equal(hit.hit, expected.hit)
+    assert np.array_equal(hit.index, expected.index)
+
+
+def test_color_when_ray_misses():
+    w = default_world()
+    r = Ray(Point(0, 0, -5), Vector(0, 1, 0))
+    assert w.color_at(r) == Color(0, 0, 0)
+
+
+def test_color_when_ray_hits():
+    w = default_world()
+    r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+    assert np.allclose(w.color_at(r), [[0.38066, 0.47583, 0.2855]], 1e-4, 1e-4)
+
+
+def test_color_with_intersection_behind_ray():
+    outer = Sphere(material=Material(Color(0.8, 1.0, 0.6), ambient=1))
+    inner = Sphere(Scaling(0.5, 0.5, 0.5), Material(Color(0.2, 0.4, 0.6), ambient=1))
+    w = World([outer, inner], Light(Point(-10, 10, -10), Color(1, 1, 1)))
+    r = Ray(Point(0, 0, 0.75), Vector(0, 0, -1))
+    assert np.allclose(w.color_at(r), [inner.material.color])
+
+
+def test_normal_at_many_shapes():
+    w = World([Sphere(), Sphere(Translation(0, 1, 0))])
+    points = PointGrid([1, 0], [0, 1.70711], [0, -0.70711], False)
+    normals = w.normal_at(points, np.array([0, 1]))
+    assert normals == [[1, 0, 0, 0], [0, 0.70711, -0.70711, 0]]
+
+
+def test_no_shadow_when_nothing_is_collinear_with_point_and_light():
+    w = default_world()
+    assert not w.is_shadowed(PointGrid([0], [10], [0], False)).any()
+
+
+def test_shadow_when_object_is_between_point_and_light():
+    w = default_world()
+    assert w.is_shadowed(PointGrid([10], [-10], [10], False)).all()
+
+
+def test_no_shadow_when_object_is_behind_light_or_point():
+    w = default_world()
+    points = PointGrid([-20, -2], [20, 2], [-20, -2], False)
+    assert not w.is_shadowed(points).any()
+
+
+def test_shade_hit_given_intersection_in_shadow():
+    w = World(
+        [Sphere(), Sphere(Translation(0, 0, 10))],
+        Light(Point(0, 0, -10), Color(1, 1, 1)),
+    )
+    r = Ray(Point(0, 0, 5), Vector(0, 0, 1))
+    assert np.allclose(w.color_at(r), [[0.1, 0.1, 0.1]])
+
+
+def test_occluded_stops_at_max_t():
+    w = World([Sphere(Translation(0, 0, 5))])
+    r = Ray(Point(0, 0, 0), VectorGrid([0, 0], [0, 0], [1, 10], False))
+    assert w.occluded(r, 1).tolist() == [False, True]
+
+
+def test_world_with_light_set_casts_shadow_rays_per_light():
+    shapes = [Sphere(), Sphere(Translation(0, 0, 10))]
+    lights = [
+        Light(Point(0, 0, -10), Color(1, 1, 1)),
+        Light(Point(0, 10, 5), Color(0.5, 0.5, 0.5)),
+    ]
+    r = Ray(Point(0, 0, 5), VectorGrid([0, 0.1], [0, 0.1], [1, 1], False))
+    expected = sum(World(shapes, light).color_at(r) for light in lights)
+    assert np.allclose(World(shapes, LightSet.of(lights)).color_at(r), expected)
+
+
+def test_is_shadowed_checks_every_light_of_a_light_set():
+    shapes = [Sphere(), Sphere(Translation(0, 0, 10))]
+    lights = [
+        Light(Point(0, 0, -10), Color(1, 1, 1)),
+        Light(Point(0, 10, 5), Color(0.5, 0.5, 0.5)),
+    ]
+    points = PointGrid([0, 0, 0], [0, 0, 2], [5, -5, 5], False)
+    shadowed = World(shapes, LightSet.of(lights)).is_shadowed(points)
+    assert shadowed.shape == (3, 2)
+    for k, light in enumerate(lights):
+        expected = World(shapes, light).is_shadowed(points)
+        assert np.array_equal(shadowed[:, k], expected)
+    assert shadowed.any() and not shadowed.all()
+
+
+def test_replace_keeps_inverses_of_unchanged_shapes():
+    w = default_world().prepare()
+    moved = w.shapes[1].set_transform(Translation(0, 1, 0))
+    replaced = w.replace({1: moved})
+    assert replaced.shapes == [w.shapes[0], moved]
+    assert np.array_equal(replaced.inverses[0], w.inverses[0])
+    assert np.allclose(replaced.inverses[1], moved.inverse)
+    assert w.shapes[1] is not moved
+
+
+def test_shade_hit_shades_many_materials_in_one_pass():
+    shapes = [
+        Sphere(Translation(x, 0, 0), Material(Color(x / 4, 0.5, 1), shininess=10 + x))
+        for x in range(-2, 3)
+    ]
+    w = World(shapes, Light(Point(-10, 10, -10), Color(1, 1, 1)))
+    r = Ray(Point(0, 0, -5), VectorGrid(np.linspace(-0.45, 0.45, 9), 0, 1))
+    colors, ids, _ = w.buffers_at(r)
+    assert len(np.unique(ids[ids >= 0])) > 2
+
+    for k, shape in enumerate(shapes):
+        hits = ids == k
+        if hits.any():
+            alone = World([shape], w.light).color_at(r)
+            assert np.allclose(colors[hits], alone[hits])
+
+    table = w.prepare().materials
+    assert w.materials is table
+    replaced = w.replace({0: shapes[0].set_material(Material(ambient=1))})
+    assert replaced.materials[0] == Material(ambient=1)
+    assert w.materials[0] == shapes[0].material
+
+
+def test_prepare_builds_what_rendering_uses():
+    r = Ray(Point(0, 0, -5), VectorGrid([-0.2, 0, 0.2], [0, 0.1], 1))
+    expected = default_world().set_accelerator(BVH).intersect(r)
+
+    w = default_world().set_accelerator(BVH)
+    assert w.prepare() is w
+    Sphere.cache_clear()
+    assert w.intersect(r) == expected
+    assert w.normal_at(Point(0, 0, -1), np.array([0])) == Vector(0, 0, -1)
+    # neither the inverses nor the structure are stacked again
+    assert Sphere.cache_info() == {"hits": 0, "misses": 0}
+
+    w = default_world().set_accelerator(BVH).prepare(structure=False)
+    Sphere.cache_clear()
+    assert w.intersect(r) == expected
+    assert Sphere.cache_info()["misses"] == 0